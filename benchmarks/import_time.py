@@ -0,0 +1,65 @@
+"""Import time budget check for ``from fanucpy import Robot``.
+
+Runs the import in fresh interpreters and compares the median time
+above a bare interpreter start with the budget. Exits with status 1 if
+the budget is exceeded or a heavy dependency is loaded eagerly.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 30] [--runs 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("numpy", "scipy", "cv2")
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+IMPORT_CODE = "from fanucpy import Robot"
+CHECK_CODE = (
+    "import sys; from fanucpy import Robot; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def run(code, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, PYTHONDONTWRITEBYTECODE="0")
+    # warm up bytecode caches
+    run(IMPORT_CODE, env)
+
+    base = statistics.median(run("pass", env) for _ in range(args.runs))
+    full = statistics.median(run(IMPORT_CODE, env) for _ in range(args.runs))
+    cost_ms = (full - base) * 1e3
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", CHECK_CODE],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+    print(f"interpreter start: {base * 1e3:.1f} ms")
+    print(f"'{IMPORT_CODE}': {cost_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    ok = cost_ms <= args.budget_ms
+    if loaded:
+        print(f"heavy modules loaded eagerly: {loaded}")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,25 @@ import numpy as np
 from cv2 import cv2
 
 from fanucpy import RobotApp
-from fanucpy.calibration import Calibration
+from fanucpy.calibration import Camera, load_calib_data
 
 
 class ArucoTrackingApp(RobotApp):
-    def __init__(self, cam, camera_matrix, dist_coeffs, marker_length) -> None:
+    def __init__(self, cam, marker_length) -> None:
         super().__init__()
-        self.configure(
-            cam=cam,
-            camera_matrix=camera_matrix,
-            dist_coeffs=dist_coeffs,
-            marker_length=marker_length,
-        )
+        self.configure(cam=cam, marker_length=marker_length)
 
-    def configure(self, cam, camera_matrix, dist_coeffs, marker_length):
+    def configure(self, cam, marker_length):
+        # frames are rectified by the camera, use zero distortion
         self.cam = cam
-        self.camera_matrix = camera_matrix
-        self.dist_coeffs = dist_coeffs
+        self.dist_coeffs = cam.zero_dist_coeffs
         self.marker_length = marker_length
 
     def _main(self):
         print("Press [q] to exit.")
         while True:
             _, frame = self.cam.read()
+            self.camera_matrix = self.cam.rect_camera_matrix(frame.shape[1::-1])
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             aruco_dict = cv2.aruco.Dictionary_get(cv2.aruco.DICT_7X7_50)
             parameters = cv2.aruco.DetectorParameters_create()
@@ -65,16 +61,14 @@ class ArucoTrackingApp(RobotApp):
 
 if __name__ == "__main__":
     # get calibration data
-    calib = Calibration()
-    fp = "../../test_data/calib_data/calib_data_robot.pkl"
-    calib_data = calib.load_calib_data(fp)
+    fp = "../../test_data/calib_data/calib_data_robot"
+    calib_data = load_calib_data(fp)
 
-    cam = cv2.VideoCapture(0)
-    app = ArucoTrackingApp(
-        cam=cam,
+    cam = Camera(
         camera_matrix=calib_data["camera_matrix"],
         dist_coeffs=calib_data["dist_coeffs"],
-        marker_length=120,
+        capture=cv2.VideoCapture(0),
     )
+    app = ArucoTrackingApp(cam=cam, marker_length=120)
     status, message, result = app.run()
     print(status, message)
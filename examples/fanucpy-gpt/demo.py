@@ -1,7 +1,7 @@
 import json
-import subprocess
 
 import openai
+from executor import CodeExecutor
 
 # open reference code
 with open("reference.py") as f:
@@ -14,6 +14,18 @@ messages = [
     {"role": "user", "content": "This is a reference code: " + ref_code},
 ]
 
+# warm interpreter with a connected robot, same settings as reference.py
+executor = CodeExecutor(
+    dict(
+        robot_model="Fanuc",
+        host="192.168.0.109",
+        port=18735,
+        ee_DO_type="RDO",
+        ee_DO_num=7,
+    ),
+    timeout=120,
+).start()
+
 
 while True:
     cmd = input("Provide a command: ")
@@ -37,21 +49,23 @@ while True:
     messages.append(msg)
 
     if "fanucpy" in chat_out:
-        # write to a python file
-        with open("generated_code.py", "w") as f:
-            code = chat_out.split("```")
-            if len(code) > 1:
-                code = code[1]
-            else:
-                code = code[0]
-            code = code.strip("python")
-            f.write(code)
+        code = chat_out.split("```")
+        if len(code) > 1:
+            code = code[1]
+        else:
+            code = code[0]
+        code = code.strip("python")
 
         # run code in physical robot
-        output = subprocess.check_output(["python", "generated_code.py"])
-        print(output)
-        msg = {"role": "assistant", "content": "generated output " + str(output)}
+        result = executor.run(code, stream=lambda out: print(out, end=""))
+        output = result.output
+        if result.error is not None:
+            print(result.error)
+            output += result.error
+        msg = {"role": "assistant", "content": "generated output " + output}
         messages.append(msg)
 
     with open("messages.json", "w") as f:
         json.dump(messages, f)
+
+executor.close()
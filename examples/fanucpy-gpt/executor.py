@@ -0,0 +1,171 @@
+"""Warm executor for generated robot code.
+
+A worker process keeps the interpreter, fanucpy and a connected Robot
+alive between snippets. Generated code creating its own Robot gets the
+already connected one, so a snippet costs neither interpreter startup
+nor a new handshake with MAPPDK_SERVER. Every snippet runs in a fresh
+namespace. A snippet exceeding its timeout is stopped by restarting
+the worker.
+"""
+import multiprocessing as mp
+import sys
+import time
+import traceback
+from collections import namedtuple
+
+ExecResult = namedtuple("ExecResult", ["output", "error", "elapsed"])
+
+
+class _SessionRobot:
+    """Connected robot whose connect and disconnect do nothing."""
+
+    def __init__(self, robot):
+        self._robot = robot
+
+    def connect(self):
+        return self._robot.SUCCESS_CODE, "success"
+
+    def disconnect(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._robot, name)
+
+
+class _PipeWriter:
+    """File object sending writes to the parent process."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def write(self, text):
+        if text:
+            self.conn.send(("out", text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _worker(conn, robot_kwargs):
+    try:
+        import fanucpy
+        import fanucpy.robot
+
+        robot = fanucpy.Robot(**robot_kwargs)
+        robot.connect()
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+
+    session = _SessionRobot(robot)
+    fanucpy.Robot = fanucpy.robot.Robot = lambda *args, **kwargs: session
+    conn.send(("ready", None))
+
+    while True:
+        code = conn.recv()
+        if code is None:
+            break
+        sys.stdout = sys.stderr = _PipeWriter(conn)
+        error = None
+        try:
+            exec(compile(code, "<generated>", "exec"), {"__name__": "__main__"})
+        except BaseException:
+            error = traceback.format_exc()
+        finally:
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        conn.send(("done", error))
+
+    robot.disconnect()
+
+
+class CodeExecutor:
+    """Runs code snippets against a warm, connected robot."""
+
+    def __init__(self, robot_kwargs: dict, timeout: float = 60.0):
+        """
+        Args:
+            robot_kwargs (dict): Robot arguments, e.g. robot_model, host,
+                port, ee_DO_type and ee_DO_num.
+            timeout (float): Default snippet timeout in seconds.
+        """
+        self.robot_kwargs = robot_kwargs
+        self.timeout = timeout
+        self._conn = None
+        self._process = None
+
+    def start(self):
+        parent, child = mp.Pipe()
+        self._process = mp.Process(
+            target=_worker, args=(child, self.robot_kwargs), daemon=True
+        )
+        self._process.start()
+        self._conn = parent
+        kind, payload = self._conn.recv()
+        if kind != "ready":
+            self._process.join()
+            raise RuntimeError(f"Executor failed to start:\n{payload}")
+        return self
+
+    def close(self):
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._conn.send(None)
+            self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = self._conn = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, code: str, timeout: float = None, stream=None) -> ExecResult:
+        """Runs a snippet.
+
+        Args:
+            code (str): Python code.
+            timeout (float, optional): Seconds before the snippet is
+                stopped. Defaults to the executor timeout.
+            stream (callable, optional): Called with every chunk of
+                output as it is printed.
+
+        Returns:
+            ExecResult: Output, error traceback or None, and elapsed
+                seconds.
+        """
+        if self._process is None or not self._process.is_alive():
+            self.start()
+        timeout = self.timeout if timeout is None else timeout
+        t_start = time.perf_counter()
+        deadline = t_start + timeout
+        chunks = []
+
+        self._conn.send(code)
+        while True:
+            if not self._conn.poll(max(0.0, deadline - time.perf_counter())):
+                # the worker cannot be interrupted safely, restart it
+                self._process.terminate()
+                self._process.join()
+                self._process = None
+                self.start()
+                error = f"TimeoutError: snippet exceeded {timeout} s"
+                break
+            try:
+                kind, payload = self._conn.recv()
+            except EOFError:
+                self._process.join()
+                self._process = None
+                error = "RuntimeError: executor process exited"
+                break
+            if kind == "out":
+                chunks.append(payload)
+                if stream is not None:
+                    stream(payload)
+            else:
+                error = payload
+                break
+        return ExecResult("".join(chunks), error, time.perf_counter() - t_start)
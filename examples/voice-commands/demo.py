@@ -1,5 +1,6 @@
 import json
-import subprocess
+import os
+import sys
 import tkinter
 import tkinter.messagebox
 import wave
@@ -8,6 +9,9 @@ import openai
 import pyaudio
 from PIL import Image, ImageTk
 
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "fanucpy-gpt"))
+from executor import CodeExecutor  # noqa: E402
+
 
 class FanucVoiceCommand:
     def __init__(
@@ -23,6 +27,19 @@ class FanucVoiceCommand:
         with open("initial-messages.json") as f:
             self.messages = json.load(f)
 
+        # warm interpreter with a connected robot, same settings as the
+        # reference code in initial-messages.json
+        self.executor = CodeExecutor(
+            dict(
+                robot_model="Fanuc",
+                host="192.168.125.5",
+                port=18735,
+                ee_DO_type="RDO",
+                ee_DO_num=7,
+            ),
+            timeout=120,
+        ).start()
+
         # Start Tkinter and set Title
         self.main = tkinter.Tk()
         self.collections = []
@@ -122,28 +139,30 @@ class FanucVoiceCommand:
         self.messages.append(msg)
 
         if "fanucpy" in chat_out:
-            # write to a python file
+            # extract the code block
+            code = chat_out.split("```")
+            if len(code) > 1:
+                code = code[1]
+            else:
+                code = code[0]
+            code = code.strip("python")
+
+            # run code in physical robot
+            print("I am running the code.")
             try:
-                with open("generated_code.py", "w") as f:
-                    code = chat_out.split("```")
-                    if len(code) > 1:
-                        code = code[1]
-                    else:
-                        code = code[0]
-                    code = code.strip("python")
-                    f.write(code)
-
-                # run code in physical robot
-                print("I am running the code.")
-                output = subprocess.check_output(["python3.8", "generated_code.py"])
-                print(output)
-                msg = {
-                    "role": "assistant",
-                    "content": "generated output " + str(output),
-                }
-                self.messages.append(msg)
+                result = self.executor.run(code, stream=lambda out: print(out, end=""))
+                output = result.output
+                if result.error is not None:
+                    print(result.error)
+                    output += result.error
             except Exception as e:
                 print(e)
+                output = str(e)
+            msg = {
+                "role": "assistant",
+                "content": "generated output " + output,
+            }
+            self.messages.append(msg)
 
         with open("messages.json", "w") as f:
             json.dump(self.messages, f)
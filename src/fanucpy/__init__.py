@@ -1,2 +1,51 @@
-from fanucpy.robot import Robot
-from fanucpy.robotapp import RobotApp
+"""Python package for FANUC industrial robots.
+
+Submodules and their dependencies are imported on first use, so that
+``from fanucpy import Robot`` does not pay for NumPy, SciPy or OpenCV.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fanucpy.robot import Robot
+    from fanucpy.robotapp import RobotApp
+
+_ATTRS = {
+    "Robot": "fanucpy.robot",
+    "RobotApp": "fanucpy.robotapp",
+}
+_SUBMODULES = {
+    "calibration",
+    "cli",
+    "collision",
+    "engine",
+    "frames",
+    "iowatch",
+    "motion",
+    "multicam",
+    "robot",
+    "robotapp",
+    "sequencing",
+    "shared",
+    "simulator",
+    "teach",
+    "transformations",
+    "tuning",
+}
+
+__all__ = list(_ATTRS)
+
+
+def __getattr__(name):
+    if name in _ATTRS:
+        value = getattr(importlib.import_module(_ATTRS[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f"fanucpy.{name}")
+    else:
+        raise AttributeError(f"module 'fanucpy' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRS) | _SUBMODULES)
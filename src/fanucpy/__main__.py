@@ -0,0 +1,3 @@
+from fanucpy.cli import main
+
+raise SystemExit(main())
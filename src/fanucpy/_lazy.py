@@ -0,0 +1,35 @@
+"""Deferred imports of heavy dependencies such as SciPy and OpenCV."""
+import importlib
+
+
+class LazyImport:
+    """Proxy that imports a module, or a module attribute, on first use.
+
+    Example:
+        cv2 = LazyImport("cv2")
+        Rotation = LazyImport("scipy.spatial.transform", "Rotation")
+    """
+
+    def __init__(self, module: str, attr: str = None):
+        self._module = module
+        self._attr = attr
+        self._obj = None
+
+    def _resolve(self):
+        if self._obj is None:
+            obj = importlib.import_module(self._module)
+            if self._attr is not None:
+                obj = getattr(obj, self._attr)
+            self._obj = obj
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        name = self._module + (f".{self._attr}" if self._attr else "")
+        state = "loaded" if self._obj is not None else "not loaded"
+        return f"<lazy {name} ({state})>"
@@ -1,21 +1,301 @@
+import json
 import os
 import pickle
+import time
+from collections import namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import numpy as np
-from cv2 import cv2
 
+from fanucpy._lazy import LazyImport
+from fanucpy.transformations import xyzrpw_to_H
 
-def save_calib_data(calib_data: object, calib_data_path: str):
-    """Saves calibration data."""
-    with open(calib_data_path, "wb") as f:
-        pickle.dump(calib_data, f)
+cv2 = LazyImport("cv2")
+Rotation = LazyImport("scipy.spatial.transform", "Rotation")
 
+CALIB_SCHEMA_VERSION = 1
+CALIB_MANIFEST = "manifest.json"
 
-def load_calib_data(calib_data_path: str):
-    """Loads calibration data."""
-    with open(calib_data_path, "rb") as f:
+# calibration data groups, bulky per-sample arrays are memory-mapped on access
+INTRINSICS_KEYS = ("camera_matrix", "dist_coeffs", "rmse", "image_size")
+HAND_EYE_KEYS = (
+    "R_cam2gripper",
+    "t_cam2gripper",
+    "R_cam2base",
+    "t_cam2base",
+    "H_cam2gripper",
+    "H_cam2base",
+)
+SAMPLES_GROUP = "samples"
+
+
+def _calib_group(key):
+    """Returns storage group of a calibration data key."""
+    if key in INTRINSICS_KEYS:
+        return "intrinsics"
+    if key in HAND_EYE_KEYS:
+        return "hand_eye"
+    return SAMPLES_GROUP
+
+
+def _rt_pairs(val):
+    """Stacks a sequence of (R, t) pairs, e.g. target poses of
+    collect_eye_hand_data, into (N, 3, 3) and (N, 3) arrays.
+
+    Returns None if val is not such a sequence.
+    """
+    if not isinstance(val, (list, tuple)) or not val:
+        return None
+    if not all(isinstance(p, (list, tuple)) and len(p) == 2 for p in val):
+        return None
+    try:
+        R = np.stack([np.asarray(p[0], dtype=np.float64) for p in val])
+        t = np.stack([np.asarray(p[1], dtype=np.float64).reshape(3) for p in val])
+    except ValueError:
+        return None
+    if R.shape[1:] != (3, 3):
+        return None
+    return R, t
+
+
+def _save_array(calib_data_path, group, name, arr):
+    fname = os.path.join(group, f"{name}.npy")
+    os.makedirs(os.path.join(calib_data_path, group), exist_ok=True)
+    np.save(os.path.join(calib_data_path, fname), arr)
+    return fname
+
+
+def save_calib_data(calib_data: dict, calib_data_path: str):
+    """Saves calibration data to a versioned calibration store.
+
+    The store is a directory with a JSON manifest and one ``.npy`` file
+    per array. Intrinsics, hand-eye transforms and per-sample data are
+    kept in separate groups. Scalars and strings are kept in the
+    manifest itself. Sequences of (R, t) pairs are stored as stacked
+    rotation and translation arrays and loaded as lists of pairs.
+
+    Args:
+        calib_data (dict): Calibration data, e.g. ``camera_matrix``,
+            ``dist_coeffs``, hand-eye results and raw samples.
+        calib_data_path (str): Calibration store directory.
+    """
+    arrays, meta = {}, {}
+    for key, val in calib_data.items():
+        if isinstance(val, (bool, int, float, str)) or val is None:
+            meta[key] = val
+            continue
+        group = _calib_group(key)
+        pairs = _rt_pairs(val)
+        if pairs is not None:
+            R, t = pairs
+            arrays[key] = {
+                "files": [
+                    _save_array(calib_data_path, group, f"{key}_R", R),
+                    _save_array(calib_data_path, group, f"{key}_t", t),
+                ],
+                "group": group,
+                "shape": [len(R)],
+                "dtype": "rt_pairs",
+            }
+            continue
+        try:
+            arr = np.asarray(val)
+        except ValueError:
+            arr = np.empty(0, dtype=object)
+        if arr.dtype == object:
+            raise ValueError(f"Cannot store ragged calibration data: {key}")
+        arrays[key] = {
+            "file": _save_array(calib_data_path, group, key, arr),
+            "group": group,
+            "shape": list(arr.shape),
+            "dtype": arr.dtype.str,
+        }
+
+    manifest = {"version": CALIB_SCHEMA_VERSION, "arrays": arrays, "meta": meta}
+    with open(os.path.join(calib_data_path, CALIB_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_calib_manifest(calib_data_path: str) -> dict:
+    """Reads calibration store manifest without loading any arrays."""
+    with open(os.path.join(calib_data_path, CALIB_MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("version", 0) > CALIB_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported calibration data version: {manifest['version']}")
+    return manifest
+
+
+class CalibData(Mapping):
+    """Read-only, lazily loaded calibration data.
+
+    Arrays are loaded on first access and cached. Arrays of the samples
+    group are memory-mapped, so reading intrinsics never touches them.
+    Arrays whose shape or dtype differ from the manifest raise
+    ValueError.
+    """
+
+    def __init__(self, calib_data_path: str):
+        self.path = calib_data_path
+        self.manifest = read_calib_manifest(calib_data_path)
+        self._arrays = self.manifest["arrays"]
+        self._meta = self.manifest["meta"]
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key in self._meta:
+            return self._meta[key]
+        if key not in self._cache:
+            entry = self._arrays[key]
+            mmap_mode = "r" if entry["group"] == SAMPLES_GROUP else None
+            if "files" in entry:
+                R, t = (
+                    np.load(os.path.join(self.path, f), mmap_mode=mmap_mode)
+                    for f in entry["files"]
+                )
+                if len(R) != len(t) or [len(R)] != entry["shape"]:
+                    raise ValueError(f"Calibration data does not match manifest: {key}")
+                self._cache[key] = list(zip(R, t))
+            else:
+                arr = np.load(
+                    os.path.join(self.path, entry["file"]), mmap_mode=mmap_mode
+                )
+                if list(arr.shape) != entry["shape"] or arr.dtype.str != entry["dtype"]:
+                    raise ValueError(f"Calibration data does not match manifest: {key}")
+                self._cache[key] = arr
+        return self._cache[key]
+
+    def __iter__(self):
+        yield from self._arrays
+        yield from self._meta
+
+    def __len__(self):
+        return len(self._arrays) + len(self._meta)
+
+    def group(self, name: str) -> dict:
+        """Loads all entries of a group: intrinsics, hand_eye or samples."""
+        return {k: self[k] for k, v in self._arrays.items() if v["group"] == name}
+
+
+def load_calib_data(calib_data_path: str) -> CalibData:
+    """Loads calibration data lazily from a calibration store."""
+    return CalibData(calib_data_path)
+
+
+def convert_pickle_calib_data(pickle_path: str, calib_data_path: str):
+    """Converts legacy pickled calibration data to a calibration store.
+
+    Only use with trusted files, unpickling can execute arbitrary code.
+    """
+    with open(pickle_path, "rb") as f:
         calib_data = pickle.load(f)
-    return calib_data
+    save_calib_data(calib_data, calib_data_path)
+
+
+class Camera:
+    """Camera with cached undistortion maps.
+
+    Rectification maps are computed once per frame resolution and
+    recomputed when camera_matrix or dist_coeffs are assigned. Frames
+    are rectified with remap into a reused output buffer, so downstream
+    detection can use rect_camera_matrix with zero distortion
+    coefficients.
+    """
+
+    def __init__(
+        self,
+        camera_matrix,
+        dist_coeffs,
+        capture=None,
+        alpha=0.0,
+        interpolation=None,
+    ):
+        """
+        Args:
+            camera_matrix: 3x3 camera matrix.
+            dist_coeffs: Distortion coefficients.
+            capture (optional): Video capture object used by read().
+            alpha (float): Free scaling parameter of
+                getOptimalNewCameraMatrix. 0 keeps only valid pixels,
+                1 keeps all source pixels. Defaults to 0.
+            interpolation (int, optional): Remap interpolation flag.
+                Defaults to cv2.INTER_LINEAR.
+        """
+        self._maps = {}
+        self._buffers = {}
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.capture = capture
+        self.alpha = alpha
+        self.interpolation = (
+            cv2.INTER_LINEAR if interpolation is None else interpolation
+        )
+        self.zero_dist_coeffs = np.zeros(5)
+
+    @property
+    def camera_matrix(self):
+        return self._camera_matrix
+
+    @camera_matrix.setter
+    def camera_matrix(self, camera_matrix):
+        self._camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self._maps.clear()
+
+    @property
+    def dist_coeffs(self):
+        return self._dist_coeffs
+
+    @dist_coeffs.setter
+    def dist_coeffs(self, dist_coeffs):
+        self._dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self._maps.clear()
+
+    def _get_maps(self, size):
+        """Returns cached maps and new camera matrix for (width, height)."""
+        if size not in self._maps:
+            new_camera_matrix, _ = cv2.getOptimalNewCameraMatrix(
+                self.camera_matrix, self.dist_coeffs, size, self.alpha, size
+            )
+            map1, map2 = cv2.initUndistortRectifyMap(
+                self.camera_matrix,
+                self.dist_coeffs,
+                None,
+                new_camera_matrix,
+                size,
+                cv2.CV_16SC2,
+            )
+            self._maps[size] = (map1, map2, new_camera_matrix)
+        return self._maps[size]
+
+    def rect_camera_matrix(self, size):
+        """Camera matrix of rectified frames of size (width, height)."""
+        return self._get_maps(tuple(size))[2]
+
+    def rectify(self, frame):
+        """Rectifies frame.
+
+        The returned array is reused by the next call with a frame of
+        the same shape. Copy it to keep it.
+        """
+        size = (frame.shape[1], frame.shape[0])
+        map1, map2, _ = self._get_maps(size)
+        key = (frame.shape, frame.dtype.str)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = np.empty_like(frame)
+        return cv2.remap(frame, map1, map2, self.interpolation, dst=buf)
+
+    def read(self):
+        """Reads and rectifies a frame from the capture object."""
+        ret, frame = self.capture.read()
+        if not ret:
+            return ret, frame
+        return ret, self.rectify(frame)
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
 
 
 def draw_axis(img, corners, imgpts, thickness=5):
@@ -67,46 +347,322 @@ def collect_checker_board_images(camera, save_dir):
     cv2.destroyAllWindows()
 
 
-def calibrate_camera_checkerboard(images, cols, rows, square_size, verbose=True):
-    """Calibrates camera to get camera matrix and distortion coefficients."""
+# cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, spelled out to keep
+# OpenCV from loading at import time
+SUBPIX_CRITERIA = (3, 30, 0.001)
 
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
 
-    # prepare object points
+@lru_cache(maxsize=None)
+def checkerboard_geometry(cols, rows, square_size):
+    """Returns read-only checkerboard object points and axis points."""
     objp = np.zeros((cols * rows, 3), np.float32)
     objp[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2)
     objp = objp * square_size
 
-    # arrays to store object points and image points from all the images
-    objpoints = []
-    imgpoints = []
+    axis = np.float32(
+        [[3 * square_size, 0, 0], [0, 3 * square_size, 0], [0, 0, -3 * square_size]]
+    ).reshape(-1, 3)
+
+    objp.flags.writeable = False
+    axis.flags.writeable = False
+    return objp, axis
+
+
+def find_checkerboard_corners(images, cols, rows, verbose=False):
+    """Finds refined checkerboard corners in calibration images.
 
-    for img in images:
+    Args:
+        images: BGR images.
+        cols (int): Inner corners per row.
+        rows (int): Inner corners per column.
+        verbose (bool): Show detections. Defaults to False.
+
+    Returns:
+        tuple: Corners of the images where the board was found, as a
+            list of (cols * rows, 1, 2) arrays, indices of these images
+            and image size (width, height).
+    """
+    imgpoints, used, image_size = [], [], None
+    for i, img in enumerate(images):
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        image_size = gray.shape[::-1]
 
         ret, corners = cv2.findChessboardCorners(gray, (cols, rows), None)
 
         if ret:
-            objpoints.append(objp)
-
-            corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+            corners = cv2.cornerSubPix(
+                gray, corners, (11, 11), (-1, -1), SUBPIX_CRITERIA
+            )
             imgpoints.append(corners)
+            used.append(i)
 
-            out_img = img.copy()
             if verbose:
+                out_img = img.copy()
                 cv2.drawChessboardCorners(out_img, (cols, rows), corners, ret)
                 cv2.imshow("Calibration", out_img)
                 cv2.waitKey(0)
 
-    cv2.destroyAllWindows()
+    if verbose:
+        cv2.destroyAllWindows()
+    return imgpoints, np.array(used, dtype=np.int64), image_size
+
+
+def calibrate_camera_checkerboard(images, cols, rows, square_size, verbose=True):
+    """Calibrates camera to get camera matrix and distortion coefficients."""
+    imgpoints, _, image_size = find_checkerboard_corners(images, cols, rows, verbose)
+    objp, _ = checkerboard_geometry(cols, rows, square_size)
 
     rmse, camera_matrix, dist_coeffs, _, _ = cv2.calibrateCamera(
-        objpoints, imgpoints, gray.shape[::-1], None, None
+        [objp] * len(imgpoints), imgpoints, image_size, None, None
     )
 
     return rmse, camera_matrix, dist_coeffs
 
 
+CameraCalibration = namedtuple(
+    "CameraCalibration",
+    [
+        "rmse",
+        "camera_matrix",
+        "dist_coeffs",
+        "rvecs",
+        "tvecs",
+        "image_rmse",
+        "corner_errors",
+        "used",
+    ],
+)
+
+
+def project_points(objpoints, rvecs, tvecs, camera_matrix, dist_coeffs):
+    """Projects object points of many views at once.
+
+    Vectorized equivalent of cv2.projectPoints per view for up to 12
+    distortion coefficients (radial, tangential, rational and thin
+    prism).
+
+    Args:
+        objpoints: (N, M, 3) object points per view.
+        rvecs: (N, 3) Rodrigues rotation vectors.
+        tvecs: (N, 3) translations.
+        camera_matrix: 3x3 camera matrix.
+        dist_coeffs: Distortion coefficients.
+
+    Returns:
+        np.ndarray: (N, M, 2) image points.
+    """
+    objpoints = np.asarray(objpoints, dtype=np.float64).reshape(len(rvecs), -1, 3)
+    R = Rotation.from_rotvec(
+        np.asarray(rvecs, dtype=np.float64).reshape(-1, 3)
+    ).as_matrix()
+    t = np.asarray(tvecs, dtype=np.float64).reshape(-1, 1, 3)
+    d = np.zeros(12)
+    dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+    if len(dist_coeffs) > 12:
+        raise ValueError("Tilted sensor models are not supported.")
+    d[: len(dist_coeffs)] = dist_coeffs
+    k1, k2, p1, p2, k3, k4, k5, k6, s1, s2, s3, s4 = d
+
+    cam = objpoints @ R.transpose(0, 2, 1) + t
+    x = cam[..., 0] / cam[..., 2]
+    y = cam[..., 1] / cam[..., 2]
+    r2 = x * x + y * y
+    r4 = r2 * r2
+    radial = (1 + k1 * r2 + k2 * r4 + k3 * r4 * r2) / (
+        1 + k4 * r2 + k5 * r4 + k6 * r4 * r2
+    )
+    xd = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x) + s1 * r2 + s2 * r4
+    yd = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y + s3 * r2 + s4 * r4
+
+    K = np.asarray(camera_matrix, dtype=np.float64)
+    u = K[0, 0] * xd + K[0, 1] * yd + K[0, 2]
+    v = K[1, 1] * yd + K[1, 2]
+    return np.stack([u, v], axis=-1)
+
+
+def reprojection_errors(objpoints, imgpoints, rvecs, tvecs, camera_matrix, dist_coeffs):
+    """Per-corner and per-image reprojection errors.
+
+    Args:
+        objpoints: (N, M, 3) object points per view.
+        imgpoints: (N, M, 2) detected corners per view.
+        rvecs, tvecs: Poses of the views.
+        camera_matrix, dist_coeffs: Intrinsics.
+
+    Returns:
+        tuple: (N, M) corner errors in pixels and (N,) per-image RMSE.
+    """
+    projected = project_points(objpoints, rvecs, tvecs, camera_matrix, dist_coeffs)
+    imgpoints = np.asarray(imgpoints, dtype=np.float64).reshape(projected.shape)
+    errors = np.linalg.norm(projected - imgpoints, axis=-1)
+    return errors, np.sqrt(np.mean(errors**2, axis=1))
+
+
+def calibrate_camera(
+    objpoints,
+    imgpoints,
+    image_size,
+    camera_matrix=None,
+    dist_coeffs=None,
+    flags=0,
+    used=None,
+):
+    """Calibrates a camera and reports reprojection errors.
+
+    Args:
+        objpoints: (N, M, 3) object points per view.
+        imgpoints: (N, M, 1, 2) or (N, M, 2) detected corners per view.
+        image_size: (width, height).
+        camera_matrix, dist_coeffs (optional): Initial intrinsics, used
+            with cv2.CALIB_USE_INTRINSIC_GUESS.
+        flags (int): cv2.calibrateCamera flags. Defaults to 0.
+        used (optional): Indices of the views in the original dataset.
+            Defaults to all views.
+
+    Returns:
+        CameraCalibration: Overall RMSE, intrinsics, view poses, per-
+            image RMSE, (N, M) corner errors and dataset indices.
+    """
+    objpoints = np.asarray(objpoints, dtype=np.float32)
+    imgpoints = np.asarray(imgpoints, dtype=np.float32).reshape(
+        len(objpoints), -1, 1, 2
+    )
+    rmse, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(
+        list(objpoints),
+        list(imgpoints),
+        tuple(image_size),
+        None if camera_matrix is None else np.array(camera_matrix, dtype=np.float64),
+        None if dist_coeffs is None else np.array(dist_coeffs, dtype=np.float64),
+        flags=flags,
+    )
+    rvecs = np.asarray(rvecs).reshape(-1, 3)
+    tvecs = np.asarray(tvecs).reshape(-1, 3)
+    corner_errors, image_rmse = reprojection_errors(
+        objpoints, imgpoints, rvecs, tvecs, camera_matrix, dist_coeffs
+    )
+    return CameraCalibration(
+        rmse=rmse,
+        camera_matrix=camera_matrix,
+        dist_coeffs=dist_coeffs,
+        rvecs=rvecs,
+        tvecs=tvecs,
+        image_rmse=image_rmse,
+        corner_errors=corner_errors,
+        used=np.arange(len(objpoints)) if used is None else np.asarray(used),
+    )
+
+
+def calibrate_camera_pruned(
+    objpoints,
+    imgpoints,
+    image_size,
+    flags=0,
+    min_images=10,
+    n_candidates=4,
+    min_improvement=0.01,
+    target_rmse=None,
+    n_jobs=None,
+):
+    """Calibrates a camera, dropping the images that hurt the result.
+
+    In every round the n_candidates images with the largest reprojection
+    error are dropped one at a time and the remaining images are
+    recalibrated in parallel, starting from the current intrinsics. The
+    best candidate is removed for good. Stops when the relative RMSE
+    improvement falls below min_improvement, target_rmse is reached or
+    min_images are left.
+
+    Args:
+        objpoints, imgpoints, image_size: See calibrate_camera.
+        flags (int): cv2.calibrateCamera flags. Defaults to 0.
+        min_images (int): Minimum number of kept images. Defaults to 10.
+        n_candidates (int): Images tried per round. Defaults to 4.
+        min_improvement (float): Minimum relative RMSE improvement per
+            round. Defaults to 0.01.
+        target_rmse (float, optional): RMSE in pixels to stop at.
+        n_jobs (int, optional): Number of worker threads.
+
+    Returns:
+        tuple: Final CameraCalibration, whose used field indexes the
+            kept images, and the list of CameraCalibration per round.
+    """
+    objpoints = np.asarray(objpoints, dtype=np.float32)
+    imgpoints = np.asarray(imgpoints, dtype=np.float32).reshape(
+        len(objpoints), -1, 1, 2
+    )
+    best = calibrate_camera(objpoints, imgpoints, image_size, flags=flags)
+    history = [best]
+
+    def evaluate(drop):
+        keep = best.used[best.used != drop]
+        return calibrate_camera(
+            objpoints[keep],
+            imgpoints[keep],
+            image_size,
+            best.camera_matrix,
+            best.dist_coeffs,
+            flags | cv2.CALIB_USE_INTRINSIC_GUESS,
+            used=keep,
+        )
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        while len(best.used) > min_images:
+            if target_rmse is not None and best.rmse <= target_rmse:
+                break
+            worst = best.used[np.argsort(best.image_rmse)[::-1][:n_candidates]]
+            candidate = min(pool.map(evaluate, worst), key=lambda c: c.rmse)
+            if candidate.rmse > best.rmse * (1.0 - min_improvement):
+                break
+            best = candidate
+            history.append(best)
+
+    return best, history
+
+
+def corner_coverage(imgpoints, image_size, grid=(16, 12)):
+    """Counts detected corners per image cell.
+
+    Args:
+        imgpoints: Corners of all images, any shape ending in 2.
+        image_size: (width, height).
+        grid: Number of cells (columns, rows). Defaults to (16, 12).
+
+    Returns:
+        np.ndarray: (rows, columns) corner counts. Empty or sparse cells
+            show where more calibration images are needed.
+    """
+    pts = np.concatenate(
+        [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in imgpoints]
+    )
+    counts, _, _ = np.histogram2d(
+        pts[:, 1],
+        pts[:, 0],
+        bins=(grid[1], grid[0]),
+        range=((0, image_size[1]), (0, image_size[0])),
+    )
+    return counts
+
+
+def draw_coverage(coverage, image_size, img=None, alpha=0.5):
+    """Renders a corner coverage map as a color heat-map.
+
+    Args:
+        coverage: Counts from corner_coverage.
+        image_size: (width, height).
+        img (optional): BGR image to blend the heat-map with.
+        alpha (float): Heat-map opacity over img. Defaults to 0.5.
+
+    Returns:
+        np.ndarray: BGR heat-map image of image_size.
+    """
+    norm = np.uint8(255 * coverage / max(coverage.max(), 1))
+    heat = cv2.resize(norm, tuple(image_size), interpolation=cv2.INTER_NEAREST)
+    heat = cv2.applyColorMap(heat, cv2.COLORMAP_JET)
+    if img is not None:
+        heat = cv2.addWeighted(heat, alpha, img, 1.0 - alpha, 0.0)
+    return heat
+
+
 def find_aruco_pose(frame, camera_matrix, dist_coeffs, marker_length):
     """Finds aruco marker pose."""
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -147,14 +703,8 @@ def find_checkerboard_pose(frame, camera_matrix, dist_coeffs, cols, rows, square
     """Finds checkerboard pose."""
     R_target2cam, t_target2cam = None, None
 
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-    objp = np.zeros((cols * rows, 3), np.float32)
-    objp[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2)
-    objp = objp * square_size
-
-    axis = np.float32(
-        [[3 * square_size, 0, 0], [0, 3 * square_size, 0], [0, 0, -3 * square_size]]
-    ).reshape(-1, 3)
+    criteria = SUBPIX_CRITERIA
+    objp, axis = checkerboard_geometry(cols, rows, square_size)
 
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
@@ -175,6 +725,131 @@ def find_checkerboard_pose(frame, camera_matrix, dist_coeffs, cols, rows, square
     return R_target2cam, t_target2cam
 
 
+class CheckerboardTracker:
+    """Stateful checkerboard pose estimation for live video.
+
+    Board geometry is computed once. Corners are searched in a region
+    of interest around the last detection and the full frame is only
+    searched when the board is lost. The previous pose is used as the
+    solvePnP initial guess.
+    """
+
+    def __init__(
+        self,
+        camera_matrix,
+        dist_coeffs,
+        cols,
+        rows,
+        square_size,
+        roi_margin=0.3,
+        draw=True,
+        flags=None,
+    ):
+        """
+        Args:
+            camera_matrix: 3x3 camera matrix.
+            dist_coeffs: Distortion coefficients.
+            cols (int): Inner corners per row.
+            rows (int): Inner corners per column.
+            square_size (float): Square size.
+            roi_margin (float): ROI margin relative to the last board
+                bounding box size. Defaults to 0.3.
+            draw (bool): Draw axis on frames. Defaults to True.
+            flags (int, optional): cv2.findChessboardCorners flags.
+                Defaults to the OpenCV defaults, adaptive threshold and
+                image normalization. Add cv2.CALIB_CB_FAST_CHECK to
+                reject frames without a board sooner.
+        """
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.pattern_size = (cols, rows)
+        self.objp, self.axis = checkerboard_geometry(cols, rows, square_size)
+        self.roi_margin = roi_margin
+        self.draw = draw
+        self.flags = (
+            cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE
+            if flags is None
+            else flags
+        )
+        self.reset()
+
+    def reset(self):
+        """Forgets the last detection."""
+        self.corners = None
+        self.rvec = None
+        self.tvec = None
+
+    def _roi(self, shape):
+        """Returns (x0, y0, x1, y1) around the last corners."""
+        pts = self.corners.reshape(-1, 2)
+        x0, y0 = pts.min(axis=0)
+        x1, y1 = pts.max(axis=0)
+        mx = (x1 - x0) * self.roi_margin
+        my = (y1 - y0) * self.roi_margin
+        h, w = shape[:2]
+        return (
+            max(int(x0 - mx), 0),
+            max(int(y0 - my), 0),
+            min(int(x1 + mx) + 1, w),
+            min(int(y1 + my) + 1, h),
+        )
+
+    def _find_corners(self, gray):
+        if self.corners is not None:
+            x0, y0, x1, y1 = self._roi(gray.shape)
+            ret, corners = cv2.findChessboardCorners(
+                gray[y0:y1, x0:x1], self.pattern_size, None, self.flags
+            )
+            if ret:
+                corners += np.float32([x0, y0])
+                return ret, corners
+        return cv2.findChessboardCorners(gray, self.pattern_size, None, self.flags)
+
+    def find_pose(self, frame):
+        """Finds checkerboard pose.
+
+        Args:
+            frame: BGR or grayscale frame.
+
+        Returns:
+            tuple: R_target2cam and t_target2cam, None if not found.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+        ret, corners = self._find_corners(gray)
+        if not ret:
+            self.reset()
+            return None, None
+
+        # refine corners
+        corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), SUBPIX_CRITERIA)
+
+        # find pose, starting from the previous one
+        use_guess = self.rvec is not None
+        ret, rvec, tvec = cv2.solvePnP(
+            self.objp,
+            corners,
+            self.camera_matrix,
+            self.dist_coeffs,
+            self.rvec.copy() if use_guess else None,
+            self.tvec.copy() if use_guess else None,
+            useExtrinsicGuess=use_guess,
+        )
+        if not ret:
+            self.reset()
+            return None, None
+        self.corners, self.rvec, self.tvec = corners, rvec, tvec
+
+        if self.draw and frame.ndim == 3:
+            imgpts, _ = cv2.projectPoints(
+                self.axis, rvec, tvec, self.camera_matrix, self.dist_coeffs
+            )
+            draw_axis(frame, corners, imgpts)
+
+        R_target2cam, _ = cv2.Rodrigues(rvec)
+        return R_target2cam, tvec.squeeze()
+
+
 def collect_eye_hand_data(
     camera,
     camera_matrix,
@@ -190,6 +865,14 @@ def collect_eye_hand_data(
     target_poses = []
     robot_ee_poses = []
     count = 0
+    if not aruco:
+        tracker = CheckerboardTracker(
+            camera_matrix=camera_matrix,
+            dist_coeffs=dist_coeffs,
+            cols=cols,
+            rows=rows,
+            square_size=square_size,
+        )
     while True:
         _, frame = camera.read()
         if aruco:
@@ -200,14 +883,7 @@ def collect_eye_hand_data(
                 marker_length=marker_length,
             )
         else:
-            R_target2cam, t_target2cam = find_checkerboard_pose(
-                frame=frame,
-                camera_matrix=camera_matrix,
-                dist_coeffs=dist_coeffs,
-                cols=cols,
-                rows=rows,
-                square_size=square_size,
-            )
+            R_target2cam, t_target2cam = tracker.find_pose(frame)
         cv2.imshow("frame", frame)
 
         key = cv2.waitKey(1)
@@ -228,30 +904,430 @@ def collect_eye_hand_data(
     return target_poses, robot_ee_poses
 
 
+def generate_eye_hand_poses(
+    reference_pose, n_poses, max_angle=25.0, max_offset=50.0, oversample=20, seed=None
+):
+    """Generates diverse robot poses around a reference pose.
+
+    Random candidates are rotated about random axes (up to max_angle)
+    and shifted (up to max_offset). Farthest point sampling then picks
+    the subset that best covers the rotation space.
+
+    Args:
+        reference_pose (list[float]): XYZWPR pose facing the target.
+        n_poses (int): Number of poses.
+        max_angle (float): Maximum rotation from reference in degrees.
+            Defaults to 25.
+        max_offset (float): Maximum translation from reference in mm.
+            Defaults to 50.
+        oversample (int): Candidates per returned pose. Defaults to 20.
+        seed (int, optional): Random seed.
+
+    Returns:
+        np.ndarray: (n_poses, 6) XYZWPR poses.
+    """
+    rng = np.random.default_rng(seed)
+    n_cand = n_poses * oversample
+
+    axes = rng.normal(size=(n_cand, 3))
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    angles = np.radians(max_angle) * np.sqrt(rng.uniform(size=n_cand))
+    offsets = rng.normal(size=(n_cand, 3))
+    offsets *= (
+        max_offset
+        * np.cbrt(rng.uniform(size=(n_cand, 1)))
+        / np.linalg.norm(offsets, axis=1, keepdims=True)
+    )
+    # first candidate is the reference pose itself
+    angles[0], offsets[0] = 0.0, 0.0
+
+    # distance between candidates: rotation angle + translation, normalized
+    rotvecs = axes * angles[:, None]
+    quats = Rotation.from_rotvec(rotvecs).as_quat()
+
+    selected = [0]
+    dot = np.abs(quats @ quats[0])
+    min_dist = 2 * np.arccos(np.clip(dot, -1.0, 1.0)) / np.radians(max_angle)
+    min_dist += np.linalg.norm(offsets - offsets[0], axis=1) / max(max_offset, 1e-9)
+    for _ in range(n_poses - 1):
+        k = int(np.argmax(min_dist))
+        selected.append(k)
+        dot = np.abs(quats @ quats[k])
+        dist = 2 * np.arccos(np.clip(dot, -1.0, 1.0)) / np.radians(max_angle)
+        dist += np.linalg.norm(offsets - offsets[k], axis=1) / max(max_offset, 1e-9)
+        min_dist = np.minimum(min_dist, dist)
+
+    # apply rotations in the tool frame of the reference pose
+    H_ref = xyzrpw_to_H(np.asarray(reference_pose, dtype=np.float64))
+    R = H_ref[:3, :3] @ Rotation.from_rotvec(rotvecs[selected]).as_matrix()
+    t = H_ref[:3, 3] + offsets[selected]
+    wpr = Rotation.from_matrix(R).as_euler("xyz", degrees=True)
+    return np.hstack([t, wpr])
+
+
+def _grab_latest_frame(camera, n_flush):
+    """Drops buffered frames and returns the latest one."""
+    for _ in range(n_flush):
+        camera.grab()
+    return camera.read()
+
+
+def _ee_poses_to_Rt(robot_ee_poses):
+    """Converts XYZWPR poses to rotations and translations."""
+    poses = np.asarray(robot_ee_poses, dtype=np.float64)
+    R = Rotation.from_euler("xyz", poses[:, 3:], degrees=True).as_matrix()
+    return R, poses[:, :3]
+
+
+def collect_eye_hand_data_auto(
+    camera,
+    camera_matrix,
+    dist_coeffs,
+    robot,
+    reference_pose,
+    aruco=True,
+    marker_length=None,
+    cols=None,
+    rows=None,
+    square_size=None,
+    n_poses=40,
+    min_samples=10,
+    eye_to_hand=True,
+    velocity=20,
+    acceleration=100,
+    settle_time=0.5,
+    n_flush=5,
+    convergence_tol=0.5,
+    patience=3,
+    max_angle=25.0,
+    max_offset=50.0,
+    max_rms=1.0,
+    min_rotation=2.0,
+    seed=None,
+    verbose=True,
+):
+    """Collects eye hand calibration data without user interaction.
+
+    The robot visits poses from generate_eye_hand_poses. At each pose it
+    waits for settling, grabs the latest frame and detects the target.
+    Samples without a detection or with an unreachable pose are skipped,
+    as are checkerboard detections with a reprojection RMS above max_rms
+    and samples whose gripper orientation is within min_rotation of an
+    accepted sample, since they add little information to the hand-eye
+    solution. Only accepted samples count towards convergence.
+    Collection stops early once the hand-eye translation changes less
+    than convergence_tol for patience consecutive samples.
+
+    Args:
+        camera: Video capture object.
+        camera_matrix, dist_coeffs: Camera intrinsics.
+        robot (Robot): Connected robot.
+        reference_pose (list[float]): XYZWPR pose where the target is
+            well visible.
+        aruco (bool): Use aruco marker, otherwise checkerboard.
+        n_poses (int): Maximum number of poses. Defaults to 40.
+        min_samples (int): Samples before checking convergence.
+        eye_to_hand (bool): Camera is static. Defaults to True.
+        velocity (int): Robot velocity in percent. Defaults to 20.
+        acceleration (int): Robot acceleration in percent.
+        settle_time (float): Wait time after motion in seconds.
+        n_flush (int): Buffered frames to drop before capturing.
+        convergence_tol (float): Translation change in mm.
+        patience (int): Consecutive converged samples before stopping.
+        max_rms (float): Maximum checkerboard reprojection RMS in
+            pixels. Defaults to 1.0.
+        min_rotation (float): Minimum gripper rotation in degrees to
+            every accepted sample. Defaults to 2.0.
+
+    Returns:
+        tuple(list, list): Target poses and robot end-effector poses.
+    """
+    poses = generate_eye_hand_poses(
+        reference_pose, n_poses, max_angle=max_angle, max_offset=max_offset, seed=seed
+    )
+    tracker = None
+    if not aruco:
+        tracker = CheckerboardTracker(
+            camera_matrix, dist_coeffs, cols, rows, square_size, draw=False
+        )
+    target_poses = []
+    robot_ee_poses = []
+    accepted_rot = []
+    prev_t, n_converged = None, 0
+    for pose in poses:
+        code, msg = robot.move(
+            "pose",
+            vals=list(pose),
+            velocity=velocity,
+            acceleration=acceleration,
+            cnt_val=0,
+            linear=False,
+            continue_on_error=True,
+        )
+        if code != robot.SUCCESS_CODE:
+            if verbose:
+                print(f"Skipped pose: {msg}")
+            continue
+        time.sleep(settle_time)
+
+        _, frame = _grab_latest_frame(camera, n_flush)
+        if aruco:
+            R_target2cam, t_target2cam = find_aruco_pose(
+                frame=frame,
+                camera_matrix=camera_matrix,
+                dist_coeffs=dist_coeffs,
+                marker_length=marker_length,
+            )
+        else:
+            R_target2cam, t_target2cam = tracker.find_pose(frame)
+        if R_target2cam is None:
+            if verbose:
+                print("None pose detected, skipped")
+            continue
+
+        # sample quality
+        if tracker is not None:
+            _, rms = reprojection_errors(
+                tracker.objp[None],
+                tracker.corners.reshape(1, -1, 2),
+                tracker.rvec.reshape(1, 3),
+                tracker.tvec.reshape(1, 3),
+                camera_matrix,
+                dist_coeffs,
+            )
+            if rms[0] > max_rms:
+                if verbose:
+                    print(f"Reprojection RMS {rms[0]:.2f} px, skipped")
+                continue
+        ee_pose = robot.get_curpos()
+        rot = Rotation.from_euler("xyz", ee_pose[3:], degrees=True)
+        if accepted_rot:
+            relative = Rotation.concatenate(accepted_rot).inv() * rot
+            angles = np.degrees(relative.magnitude())
+            if angles.min() < min_rotation:
+                if verbose:
+                    print(f"Rotation {angles.min():.1f} deg to a sample, skipped")
+                continue
+        accepted_rot.append(rot)
+
+        target_poses.append((R_target2cam, t_target2cam))
+        robot_ee_poses.append(ee_pose)
+        if verbose:
+            print(f"Collected data: {len(target_poses)}")
+
+        if len(target_poses) < min_samples:
+            continue
+        R_g2b, t_g2b = _ee_poses_to_Rt(robot_ee_poses)
+        _, t = calibrate_eye_hand(
+            R_g2b,
+            t_g2b,
+            [R for R, _ in target_poses],
+            [t for _, t in target_poses],
+            eye_to_hand=eye_to_hand,
+        )
+        t = t.ravel()
+        if prev_t is not None and np.linalg.norm(t - prev_t) < convergence_tol:
+            n_converged += 1
+        else:
+            n_converged = 0
+        prev_t = t
+        if n_converged >= patience:
+            if verbose:
+                print("Calibration converged.")
+            break
+
+    return target_poses, robot_ee_poses
+
+
+def _invert_poses(R, t):
+    """Inverts a batch of rigid transformations."""
+    R = np.asarray(R, dtype=np.float64).reshape(-1, 3, 3)
+    t = np.asarray(t, dtype=np.float64).reshape(-1, 3)
+    R_inv = R.transpose(0, 2, 1)
+    t_inv = -np.einsum("nij,nj->ni", R_inv, t)
+    return R_inv, t_inv
+
+
 def calibrate_eye_hand(
     R_gripper2base, t_gripper2base, R_target2cam, t_target2cam, eye_to_hand=True
 ):
-    tts = []
     if eye_to_hand:
         # change coordinates from gripper2base to base2gripper
-        R_base2gripper, t_base2gripper = [], []
-        for R, t in zip(R_gripper2base, t_gripper2base):
-            R_b2g = R.T
-            t_b2g = -R_b2g @ t
-            tts.append(t_b2g)
-            R_base2gripper.append(R_b2g)
-            t_base2gripper.append(t_b2g)
-
-        # change parameters values
-        R_gripper2base = R_base2gripper
-        t_gripper2base = t_base2gripper
+        R_gripper2base, t_gripper2base = _invert_poses(R_gripper2base, t_gripper2base)
 
     # calibrate
     R, t = cv2.calibrateHandEye(
-        R_gripper2base=R_gripper2base,
-        t_gripper2base=t_gripper2base,
+        R_gripper2base=list(R_gripper2base),
+        t_gripper2base=list(t_gripper2base),
         R_target2cam=R_target2cam,
         t_target2cam=t_target2cam,
     )
 
     return R, t
+
+
+HandEyeResult = namedtuple(
+    "HandEyeResult", ["R", "t", "method", "inliers", "residuals", "scores"]
+)
+
+
+def _hand_eye_methods():
+    return {
+        "tsai": cv2.CALIB_HAND_EYE_TSAI,
+        "park": cv2.CALIB_HAND_EYE_PARK,
+        "horaud": cv2.CALIB_HAND_EYE_HORAUD,
+        "andreff": cv2.CALIB_HAND_EYE_ANDREFF,
+        "daniilidis": cv2.CALIB_HAND_EYE_DANIILIDIS,
+    }
+
+
+def hand_eye_residuals(R, t, R_g2b, t_g2b, R_t2c, t_t2c, rot_weight=100.0):
+    """Computes per-sample hand-eye residuals.
+
+    For a correct solution X the chain gripper2base @ X @ target2cam is
+    constant over all samples. Residuals measure deviation of each chain
+    from their consensus.
+
+    Args:
+        R, t: Hand-eye rotation and translation.
+        R_g2b, t_g2b: (N, 3, 3) and (N, 3) gripper poses as passed to
+            the solver.
+        R_t2c, t_t2c: (N, 3, 3) and (N, 3) target poses.
+        rot_weight (float): Translation units per radian used to combine
+            rotation and translation errors.
+
+    Returns:
+        np.ndarray: (N,) residuals in translation units.
+    """
+    t = np.asarray(t, dtype=np.float64).reshape(3)
+    R_chain = R_g2b @ R @ R_t2c
+    t_chain = np.einsum("nij,nj->ni", R_g2b @ R, t_t2c) + R_g2b @ t + t_g2b
+
+    # consensus: chordal mean rotation and median translation
+    U, _, Vt = np.linalg.svd(R_chain.sum(axis=0))
+    R_mean = U @ np.diag([1.0, 1.0, np.linalg.det(U @ Vt)]) @ Vt
+    t_med = np.median(t_chain, axis=0)
+
+    cos = (np.einsum("nij,ij->n", R_chain, R_mean) - 1.0) / 2.0
+    rot_err = np.arccos(np.clip(cos, -1.0, 1.0))
+    trans_err = np.linalg.norm(t_chain - t_med, axis=1)
+    return trans_err + rot_weight * rot_err
+
+
+def _solve_hand_eye(method, R_g2b, t_g2b, R_t2c, t_t2c, idx):
+    try:
+        R, t = cv2.calibrateHandEye(
+            R_gripper2base=list(R_g2b[idx]),
+            t_gripper2base=list(t_g2b[idx]),
+            R_target2cam=list(R_t2c[idx]),
+            t_target2cam=list(t_t2c[idx]),
+            method=method,
+        )
+    except cv2.error:
+        return None
+    if not np.all(np.isfinite(R)) or not np.all(np.isfinite(t)):
+        return None
+    return R, t.reshape(3)
+
+
+def calibrate_eye_hand_robust(
+    R_gripper2base,
+    t_gripper2base,
+    R_target2cam,
+    t_target2cam,
+    eye_to_hand=True,
+    methods=None,
+    n_trials=50,
+    subset_size=None,
+    inlier_threshold=5.0,
+    rot_weight=100.0,
+    n_jobs=None,
+    seed=None,
+):
+    """Hand-eye calibration with all OpenCV methods and outlier rejection.
+
+    Random sample subsets are solved in parallel with every method. The
+    solution with the most inliers (ties broken by median residual) is
+    kept, then every method is refitted on its inliers and the one with
+    the smallest median residual is returned.
+
+    Args:
+        R_gripper2base, t_gripper2base: Robot poses.
+        R_target2cam, t_target2cam: Target poses seen by the camera.
+        eye_to_hand (bool): Camera is static. Defaults to True.
+        methods (list[str], optional): Subset of tsai, park, horaud,
+            andreff, daniilidis. Defaults to all.
+        n_trials (int): Number of random subsets. Defaults to 50.
+        subset_size (int, optional): Samples per subset. Defaults to
+            half of the samples, at least 3.
+        inlier_threshold (float): Maximum inlier residual in translation
+            units. Defaults to 5.0.
+        rot_weight (float): Translation units per radian of rotation
+            error. Defaults to 100.0.
+        n_jobs (int, optional): Number of worker threads.
+        seed (int, optional): Random seed.
+
+    Returns:
+        HandEyeResult: Rotation, translation, method name, boolean
+            inlier mask, per-sample residuals and per-method median
+            residuals on the final inliers.
+    """
+    all_methods = _hand_eye_methods()
+    methods = methods or list(all_methods)
+    R_g2b = np.asarray(R_gripper2base, dtype=np.float64).reshape(-1, 3, 3)
+    t_g2b = np.asarray(t_gripper2base, dtype=np.float64).reshape(-1, 3)
+    R_t2c = np.asarray(R_target2cam, dtype=np.float64).reshape(-1, 3, 3)
+    t_t2c = np.asarray(t_target2cam, dtype=np.float64).reshape(-1, 3)
+    if eye_to_hand:
+        R_g2b, t_g2b = _invert_poses(R_g2b, t_g2b)
+
+    n = len(R_g2b)
+    if n < 3:
+        raise ValueError("At least 3 samples are required.")
+    subset_size = subset_size or max(3, n // 2)
+    rng = np.random.default_rng(seed)
+    subsets = [np.arange(n)] + [
+        np.sort(rng.choice(n, size=subset_size, replace=False)) for _ in range(n_trials)
+    ]
+
+    def evaluate(job):
+        name, idx = job
+        sol = _solve_hand_eye(all_methods[name], R_g2b, t_g2b, R_t2c, t_t2c, idx)
+        if sol is None:
+            return None
+        res = hand_eye_residuals(*sol, R_g2b, t_g2b, R_t2c, t_t2c, rot_weight)
+        return name, sol, res
+
+    # RANSAC-style subset search
+    jobs = [(name, idx) for idx in subsets for name in methods]
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        trials = [r for r in pool.map(evaluate, jobs) if r is not None]
+    if not trials:
+        raise ValueError("Hand-eye calibration failed for all methods.")
+    _, _, best_res = max(
+        trials,
+        key=lambda r: ((r[2] < inlier_threshold).sum(), -np.median(r[2])),
+    )
+    inliers = best_res < inlier_threshold
+    if inliers.sum() < 3:
+        inliers = best_res <= np.sort(best_res)[2]
+
+    # refit all methods on inliers
+    idx = np.flatnonzero(inliers)
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        fits = [
+            r for r in pool.map(evaluate, [(m, idx) for m in methods]) if r is not None
+        ]
+    if not fits:
+        raise ValueError("Hand-eye calibration failed on inliers.")
+    scores = {name: float(np.median(res[inliers])) for name, _, res in fits}
+    name, (R, t), residuals = min(fits, key=lambda r: scores[r[0]])
+
+    return HandEyeResult(
+        R=R,
+        t=t,
+        method=name,
+        inliers=inliers,
+        residuals=residuals,
+        scores=scores,
+    )
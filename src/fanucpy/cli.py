@@ -0,0 +1,208 @@
+"""Command-line tools to monitor and benchmark a robot.
+
+Examples:
+    fanucpy --host 192.168.1.100 monitor --io RDO:7 DOUT:1
+    fanucpy --host 192.168.1.100 ping -n 200
+    fanucpy --sim bench
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sys
+import time
+
+from fanucpy.robot import IO_TYPES, FanucError, Robot
+
+SERVER_PORT = 18735
+LOGGER_PORT = 18736
+
+
+def _io_signal(spec: str) -> tuple[str, int]:
+    io_type, _, io_num = spec.upper().partition(":")
+    if io_type == "DO":
+        io_type = "DOUT"
+    if io_type not in IO_TYPES or not io_num.isdigit():
+        raise argparse.ArgumentTypeError(
+            f"Expected TYPE:NUM with TYPE in {', '.join(IO_TYPES)}, got {spec}"
+        )
+    return io_type, int(io_num)
+
+
+def _percentiles(latencies) -> str:
+    import numpy as np
+
+    ms = np.asarray(latencies) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return f"min {ms.min():.2f}  p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  max {ms.max():.2f} ms"
+
+
+def _monitor(robot: Robot, args) -> None:
+    live = sys.stdout.isatty()
+    period = 1.0 / args.rate
+    t_next = time.perf_counter()
+    n = 0
+    while args.count is None or n < args.count:
+        t0 = time.perf_counter()
+        state = robot.get_state(io=args.io)
+        rtt = time.perf_counter() - t0
+        lines = [
+            "pose    " + " ".join(f"{v:9.3f}" for v in state.pose),
+            "joints  " + " ".join(f"{v:9.3f}" for v in state.joints),
+            f"power   {state.power:9.1f} W",
+        ]
+        if state.io:
+            lines.append(
+                "io      "
+                + "  ".join(f"{t}[{num}]={int(v)}" for (t, num), v in state.io.items())
+            )
+        lines.append(f"rtt     {rtt * 1000:9.2f} ms")
+        if live:
+            # redraw in place
+            sys.stdout.write("\x1b[H\x1b[J")
+        print("\n".join(lines), flush=True)
+        n += 1
+        t_next += period
+        time.sleep(max(0.0, t_next - time.perf_counter()))
+
+
+def _ping(robot: Robot, args) -> None:
+    latencies = []
+    for _ in range(args.count):
+        t0 = time.perf_counter()
+        robot.send_cmd(args.cmd, continue_on_error=True)
+        latencies.append(time.perf_counter() - t0)
+        if args.interval:
+            time.sleep(args.interval)
+    print(f"{args.count} x {args.cmd}: {_percentiles(latencies)}")
+
+
+def _bench(robot: Robot, args) -> None:
+    tests = [
+        ("protover", lambda: robot.send_cmd("protover", continue_on_error=True)),
+        ("curpos", robot.get_curpos),
+        ("curjpos", robot.get_curjpos),
+        ("getstate", lambda: robot.get_state(io=[])),
+        ("rdbits 128", lambda: robot.get_io_bits("DOUT", 1, 128)),
+    ]
+    if args.moves or args.sim:
+        joints = robot.get_curjpos()
+        # zero-length moves to the current joints
+        tests.append(
+            (
+                "movej",
+                lambda: robot.move(
+                    "joint",
+                    vals=joints,
+                    velocity=100,
+                    acceleration=100,
+                    cnt_val=0,
+                    linear=False,
+                ),
+            )
+        )
+
+    print(f"{'test':<12}{'commands':>10}{'cmd/s':>10}  latency")
+    for name, fn in tests:
+        try:
+            fn()
+        except FanucError as e:
+            print(f"{name:<12}{'-':>10}{'-':>10}  not supported: {e}")
+            continue
+        latencies = []
+        t_end = time.perf_counter() + args.duration
+        while time.perf_counter() < t_end:
+            t0 = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t0)
+        rate = len(latencies) / sum(latencies)
+        print(f"{name:<12}{len(latencies):>10}{rate:>10.0f}  {_percentiles(latencies)}")
+
+
+COMMANDS = {"monitor": _monitor, "ping": _ping, "bench": _bench}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="fanucpy", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="robot IP address")
+    parser.add_argument(
+        "--port",
+        type=int,
+        help=f"port, defaults to {LOGGER_PORT} for monitor, else {SERVER_PORT}",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=5.0, help="socket timeout in seconds"
+    )
+    parser.add_argument(
+        "--sim", action="store_true", help="run against a local simulated server"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    monitor = sub.add_parser("monitor", help="live pose, joints, power and IO")
+    monitor.add_argument("--rate", type=float, default=5.0, help="refresh rate in Hz")
+    monitor.add_argument(
+        "--io",
+        type=_io_signal,
+        nargs="*",
+        default=[],
+        metavar="TYPE:NUM",
+        help="signals, e.g. RDO:7",
+    )
+    monitor.add_argument(
+        "--count", type=int, help="number of refreshes, defaults to until Ctrl-C"
+    )
+
+    ping = sub.add_parser("ping", help="round-trip latency percentiles")
+    ping.add_argument("-n", "--count", type=int, default=100, help="number of requests")
+    ping.add_argument(
+        "--interval", type=float, default=0.0, help="pause between requests in seconds"
+    )
+    ping.add_argument("--cmd", default="protover", help="command to send")
+
+    bench = sub.add_parser("bench", help="command throughput")
+    bench.add_argument("--duration", type=float, default=2.0, help="seconds per test")
+    bench.add_argument(
+        "--moves",
+        action="store_true",
+        help="include zero-length moves, needs a robot ready to move",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    with contextlib.ExitStack() as stack:
+        if args.sim:
+            from fanucpy.simulator import RobotSimulator
+
+            sim = stack.enter_context(RobotSimulator(time_scale=0.0))
+            args.host, args.port = sim.address
+        if args.port is None:
+            args.port = LOGGER_PORT if args.command == "monitor" else SERVER_PORT
+
+        robot = Robot(
+            robot_model="Fanuc",
+            host=args.host,
+            port=args.port,
+            socket_timeout=args.timeout,
+        )
+        try:
+            robot.connect()
+        except (OSError, FanucError) as e:
+            print(
+                f"fanucpy: cannot connect to {args.host}:{args.port}: {e}",
+                file=sys.stderr,
+            )
+            return 1
+        try:
+            COMMANDS[args.command](robot, args)
+        except KeyboardInterrupt:
+            pass
+        except (OSError, FanucError) as e:
+            print(f"fanucpy: {e}", file=sys.stderr)
+            return 1
+        finally:
+            robot.disconnect()
+    return 0
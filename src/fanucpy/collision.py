@@ -0,0 +1,518 @@
+"""Client-side workspace and collision checks for planned moves.
+
+Cell geometry (boxes, cylinders, spheres and triangle meshes) is baked
+into a signed distance grid once. Batches of TCP poses, interpolated
+paths and, with a capsule link model, joint configurations are then
+checked with vectorized grid lookups before anything is sent to the
+robot.
+
+Distances are in mm and positive outside of obstacles. Grid values are
+exact at the nodes and trilinearly interpolated in between, so use a
+margin of about the grid resolution for tight clearances. Self
+collisions of the arm are not checked.
+"""
+from __future__ import annotations
+
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from fanucpy.transformations import path_length, interpolate_poses, xyzrpw_to_H
+
+PathCheck = namedtuple("PathCheck", ["ok", "segment", "pose", "clearance"])
+
+# grid cells around each obstacle with exact distances
+NEAR_CELLS = 3
+
+
+def _pose_H(pose) -> np.ndarray:
+    pose = np.asarray(pose, dtype=np.float64)
+    return pose if pose.shape == (4, 4) else xyzrpw_to_H(pose)
+
+
+def wpr_to_matrices(wpr) -> np.ndarray:
+    """(N, 3, 3) rotation matrices of (N, 3) WPR angles in degrees."""
+    w, p, r = np.radians(np.asarray(wpr, dtype=np.float64).reshape(-1, 3)).T
+    cw, sw, cp, sp, cr, sr = (
+        np.cos(w),
+        np.sin(w),
+        np.cos(p),
+        np.sin(p),
+        np.cos(r),
+        np.sin(r),
+    )
+    # Rz(r) @ Ry(p) @ Rx(w)
+    return np.stack(
+        [
+            np.stack(
+                [cr * cp, cr * sp * sw - sr * cw, cr * sp * cw + sr * sw], axis=-1
+            ),
+            np.stack(
+                [sr * cp, sr * sp * sw + cr * cw, sr * sp * cw - cr * sw], axis=-1
+            ),
+            np.stack([-sp, cp * sw, cp * cw], axis=-1),
+        ],
+        axis=-2,
+    )
+
+
+def _box_sdf(local, half):
+    q = np.abs(local) - half
+    outside = np.linalg.norm(np.maximum(q, 0.0), axis=-1)
+    return outside + np.minimum(q.max(axis=-1), 0.0)
+
+
+class Shape:
+    """Obstacle placed with a pose in the cell frame."""
+
+    def __init__(self, pose=(0, 0, 0, 0, 0, 0)):
+        H = _pose_H(pose)
+        self.R = H[:3, :3]
+        self.t = H[:3, 3]
+
+    def _local(self, points):
+        return (np.asarray(points, dtype=np.float64) - self.t) @ self.R
+
+    def distance(self, points) -> np.ndarray:
+        """Signed distances of (N, 3) points, negative inside."""
+        raise NotImplementedError
+
+    def corners(self) -> np.ndarray:
+        """(8, 3) corners of a box bounding the shape in the cell frame."""
+        lo, hi = self._local_bounds()
+        local = np.array(np.meshgrid(*zip(lo, hi), indexing="ij")).reshape(3, -1).T
+        return local @ self.R.T + self.t
+
+
+class Box(Shape):
+    def __init__(self, size, pose=(0, 0, 0, 0, 0, 0)):
+        """
+        Args:
+            size: Edge lengths in x, y and z.
+            pose: Pose of the box center, XYZWPR or 4x4 matrix.
+        """
+        super().__init__(pose)
+        self.half = np.asarray(size, dtype=np.float64) / 2.0
+
+    def distance(self, points):
+        return _box_sdf(self._local(points), self.half)
+
+    def _local_bounds(self):
+        return -self.half, self.half
+
+
+class Cylinder(Shape):
+    def __init__(self, radius: float, height: float, pose=(0, 0, 0, 0, 0, 0)):
+        """
+        Args:
+            radius (float): Radius in mm.
+            height (float): Height in mm along the local z-axis.
+            pose: Pose of the cylinder center, XYZWPR or 4x4 matrix.
+        """
+        super().__init__(pose)
+        self.radius = radius
+        self.height = height
+
+    def distance(self, points):
+        local = self._local(points)
+        q = np.stack(
+            [
+                np.linalg.norm(local[:, :2], axis=1) - self.radius,
+                np.abs(local[:, 2]) - self.height / 2.0,
+            ],
+            axis=1,
+        )
+        return np.linalg.norm(np.maximum(q, 0.0), axis=1) + np.minimum(
+            q.max(axis=1), 0.0
+        )
+
+    def _local_bounds(self):
+        half = np.array([self.radius, self.radius, self.height / 2.0])
+        return -half, half
+
+
+class Sphere(Shape):
+    def __init__(self, radius: float, center=(0, 0, 0)):
+        """
+        Args:
+            radius (float): Radius in mm.
+            center: Center in the cell frame.
+        """
+        super().__init__(
+            np.concatenate([np.asarray(center, dtype=np.float64), np.zeros(3)])
+        )
+        self.radius = radius
+
+    def distance(self, points):
+        return np.linalg.norm(self._local(points), axis=1) - self.radius
+
+    def _local_bounds(self):
+        half = np.full(3, self.radius)
+        return -half, half
+
+
+def _segment_distance(p, a, b):
+    """Distances of (N, 1, 3) points to (F, 3) segments a -> b."""
+    ab = b - a
+    t = np.sum((p - a) * ab, axis=-1) / np.maximum(np.sum(ab * ab, axis=-1), 1e-12)
+    t = np.clip(t, 0.0, 1.0)[..., None]
+    return np.linalg.norm(a + t * ab - p, axis=-1)
+
+
+class Mesh(Shape):
+    """Closed triangle mesh, e.g. a fixture exported as STL.
+
+    Signs come from the generalized winding number, so small holes in
+    the mesh are tolerated. Exact distances are computed within band
+    mm of the mesh bounds, farther points get the distance to the
+    bounding box, which never overestimates the clearance.
+    """
+
+    def __init__(self, vertices, faces, pose=(0, 0, 0, 0, 0, 0), band: float = 50.0):
+        """
+        Args:
+            vertices: (V, 3) vertices in mm.
+            faces: (F, 3) vertex indices of the triangles.
+            pose: Pose of the mesh frame, XYZWPR or 4x4 matrix.
+            band (float): Distance in mm from the mesh bounds within
+                which distances are exact.
+        """
+        super().__init__(pose)
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.faces = np.asarray(faces, dtype=np.int64)
+        self.band = band
+        self._tri = self.vertices[self.faces]
+        self._lo = self.vertices.min(axis=0)
+        self._hi = self.vertices.max(axis=0)
+
+    @classmethod
+    def from_stl(
+        cls, path: str, pose=(0, 0, 0, 0, 0, 0), scale: float = 1.0, band: float = 50.0
+    ) -> Mesh:
+        """Loads a binary or ASCII STL file.
+
+        Args:
+            path (str): STL file.
+            pose: Pose of the mesh frame in the cell.
+            scale (float): Factor to mm, e.g. 1000 for files in m.
+            band (float): See Mesh.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        n = struct.unpack("<I", data[80:84])[0] if len(data) >= 84 else -1
+        if len(data) == 84 + 50 * n:
+            records = np.frombuffer(
+                data, dtype=np.uint8, count=50 * n, offset=84
+            ).reshape(n, 50)
+            vertices = records[:, 12:48].copy().view("<f4").reshape(-1, 3)
+        else:
+            vertices = np.array(
+                [
+                    line.split()[1:4]
+                    for line in data.decode().splitlines()
+                    if line.strip().startswith("vertex")
+                ],
+                dtype=np.float64,
+            )
+        vertices = vertices.astype(np.float64) * scale
+        return cls(
+            vertices, np.arange(len(vertices)).reshape(-1, 3), pose=pose, band=band
+        )
+
+    def _local_bounds(self):
+        return self._lo, self._hi
+
+    def _exact(self, p, chunk: int = 1 << 21):
+        a, b, c = self._tri[:, 0], self._tri[:, 1], self._tri[:, 2]
+        n = np.cross(b - a, c - a)
+        n_len = np.linalg.norm(n, axis=1)
+        unit = n / np.maximum(n_len, 1e-12)[:, None]
+        out = np.empty(len(p))
+        step = max(1, chunk // max(len(a), 1))
+        for s in range(0, len(p), step):
+            q = p[s : s + step, None, :]
+            # distance to the face plane if the projection is inside
+            h = np.sum((q - a) * unit, axis=-1)
+            proj = q - h[..., None] * unit
+            inside = (
+                (np.sum(np.cross(b - a, proj - a) * n, axis=-1) >= 0)
+                & (np.sum(np.cross(c - b, proj - b) * n, axis=-1) >= 0)
+                & (np.sum(np.cross(a - c, proj - c) * n, axis=-1) >= 0)
+            )
+            edge = np.minimum(
+                np.minimum(_segment_distance(q, a, b), _segment_distance(q, b, c)),
+                _segment_distance(q, c, a),
+            )
+            dist = np.where(inside & (n_len > 1e-12), np.abs(h), edge).min(axis=1)
+
+            # generalized winding number
+            ra, rb, rc = a - q, b - q, c - q
+            la, lb, lc = (np.linalg.norm(r, axis=-1) for r in (ra, rb, rc))
+            det = np.sum(ra * np.cross(rb, rc), axis=-1)
+            den = (
+                la * lb * lc
+                + np.sum(ra * rb, axis=-1) * lc
+                + np.sum(rb * rc, axis=-1) * la
+                + np.sum(rc * ra, axis=-1) * lb
+            )
+            winding = np.sum(np.arctan2(det, den), axis=1) / (2.0 * np.pi)
+            out[s : s + step] = np.where(np.abs(winding) > 0.5, -dist, dist)
+        return out
+
+    def distance(self, points):
+        local = self._local(points)
+        center = (self._lo + self._hi) / 2.0
+        out = _box_sdf(local - center, (self._hi - self._lo) / 2.0)
+        near = out < self.band
+        if np.any(near):
+            out[near] = self._exact(local[near])
+        return out
+
+
+class LinkModel:
+    """Capsules attached to the links of a serial arm.
+
+    Link frames follow standard Denavit-Hartenberg parameters. FANUC
+    controllers report J3 relative to the horizon rather than to the
+    upper arm, set j3_coupling (usually -1 or 1, depending on the axis
+    directions of the DH table) so that theta3 = J3 + j3_coupling * J2.
+    """
+
+    def __init__(self, dh, capsules, j3_coupling: float = 0.0, base=(0, 0, 0, 0, 0, 0)):
+        """
+        Args:
+            dh: (n, 4) rows of a (mm), alpha (deg), d (mm) and theta
+                offset (deg) per joint.
+            capsules: (link, p0, p1, radius) tuples, with segment ends
+                p0 and p1 in the frame of link, 0 being the base frame
+                and k the frame after joint k.
+            j3_coupling (float): See above.
+            base: Robot base in the cell frame, XYZWPR or 4x4 matrix.
+        """
+        self.dh = np.asarray(dh, dtype=np.float64).reshape(-1, 4)
+        self.capsules = [
+            (int(k), np.asarray(p0, float), np.asarray(p1, float), float(r))
+            for k, p0, p1, r in capsules
+        ]
+        self.j3_coupling = j3_coupling
+        self.base = _pose_H(base)
+
+    def link_frames(self, joints) -> np.ndarray:
+        """(N, n + 1, 4, 4) link frames in the cell for (N, n) joints in
+        degrees."""
+        q = np.radians(np.asarray(joints, dtype=np.float64).reshape(-1, len(self.dh)))
+        theta = q + np.radians(self.dh[:, 3])
+        if len(self.dh) > 2:
+            theta[:, 2] += self.j3_coupling * q[:, 1]
+        a, alpha, d = self.dh[:, 0], np.radians(self.dh[:, 1]), self.dh[:, 2]
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        T = np.zeros(theta.shape + (4, 4))
+        T[..., 0, 0], T[..., 0, 1], T[..., 0, 2], T[..., 0, 3] = (
+            ct,
+            -st * ca,
+            st * sa,
+            a * ct,
+        )
+        T[..., 1, 0], T[..., 1, 1], T[..., 1, 2], T[..., 1, 3] = (
+            st,
+            ct * ca,
+            -ct * sa,
+            a * st,
+        )
+        T[..., 2, 1], T[..., 2, 2], T[..., 2, 3] = sa, ca, d
+        T[..., 3, 3] = 1.0
+
+        frames = np.empty((len(q), len(self.dh) + 1, 4, 4))
+        frames[:, 0] = self.base
+        for k in range(len(self.dh)):
+            frames[:, k + 1] = frames[:, k] @ T[:, k]
+        return frames
+
+    def spheres(self):
+        """Spheres covering the capsules.
+
+        Sphere centers are spaced at most one capsule radius apart and
+        their radii grow to sqrt(r^2 + (step / 2)^2), so the spheres
+        cover the whole capsule with few lookups.
+
+        Returns:
+            list: (link, (S, 3) centers in the link frame, (S,) radii)
+                per link with capsules.
+        """
+        per_link = {}
+        for k, p0, p1, r in self.capsules:
+            length = np.linalg.norm(p1 - p0)
+            n = int(np.ceil(length / max(r, 1e-9))) + 1
+            step = length / max(n - 1, 1)
+            centers = p0 + np.linspace(0.0, 1.0, n)[:, None] * (p1 - p0)
+            radii = np.full(n, np.hypot(r, step / 2.0))
+            c, rr = per_link.get(k, (np.empty((0, 3)), np.empty(0)))
+            per_link[k] = (np.vstack([c, centers]), np.concatenate([rr, radii]))
+        return [(k, c, rr) for k, (c, rr) in sorted(per_link.items())]
+
+
+class Workspace:
+    """Allowed cell volume with obstacles, baked into a distance grid."""
+
+    def __init__(
+        self,
+        bounds,
+        obstacles=(),
+        resolution: float = 10.0,
+        tool=None,
+        links: LinkModel | None = None,
+    ):
+        """
+        Args:
+            bounds: ((xmin, ymin, zmin), (xmax, ymax, zmax)) allowed
+                volume in mm. Points outside collide with the walls.
+            obstacles: Shapes in the cell frame.
+            resolution (float): Grid spacing in mm.
+            tool: (M, 4) spheres (x, y, z, radius) in the tool frame
+                checked at every TCP pose. Defaults to the TCP point.
+            links (LinkModel, optional): Arm model for joint checks.
+        """
+        self.lo, self.hi = (np.asarray(b, dtype=np.float64) for b in bounds)
+        self.obstacles = list(obstacles)
+        self.resolution = resolution
+        self.tool = (
+            np.zeros((1, 4))
+            if tool is None
+            else np.asarray(tool, dtype=np.float64).reshape(-1, 4)
+        )
+        self.links = links
+        self._link_spheres = None
+        self._build()
+
+    def _build(self):
+        self.shape = np.maximum(
+            np.ceil((self.hi - self.lo) / self.resolution).astype(int) + 1, 2
+        )
+        axes = [
+            self.lo[i] + self.resolution * np.arange(self.shape[i]) for i in range(3)
+        ]
+        self.grid = np.full(tuple(self.shape), 1e9)
+        for shape in self.obstacles:
+            corners = shape.corners()
+            lo, hi = corners.min(axis=0), corners.max(axis=0)
+            # the distance to the bounding box is a lower bound far away,
+            # it is separable over the grid axes
+            q = [
+                np.abs(axes[i] - (lo[i] + hi[i]) / 2.0) - (hi[i] - lo[i]) / 2.0
+                for i in range(3)
+            ]
+            qx, qy, qz = q[0][:, None, None], q[1][None, :, None], q[2][None, None, :]
+            d = np.sqrt(
+                np.maximum(qx, 0.0) ** 2
+                + np.maximum(qy, 0.0) ** 2
+                + np.maximum(qz, 0.0) ** 2
+            )
+            d += np.minimum(np.maximum(np.maximum(qx, qy), qz), 0.0)
+            # exact distances close to the shape
+            pad = NEAR_CELLS * self.resolution
+            start = np.clip(
+                np.floor((lo - pad - self.lo) / self.resolution).astype(int),
+                0,
+                self.shape,
+            )
+            stop = np.clip(
+                np.ceil((hi + pad - self.lo) / self.resolution).astype(int) + 1,
+                0,
+                self.shape,
+            )
+            if np.all(stop > start):
+                sub = tuple(slice(a, b) for a, b in zip(start, stop))
+                nodes = np.stack(
+                    np.meshgrid(*[ax[sl] for ax, sl in zip(axes, sub)], indexing="ij"),
+                    axis=-1,
+                )
+                d[sub] = shape.distance(nodes.reshape(-1, 3)).reshape(nodes.shape[:3])
+            np.minimum(self.grid, d, out=self.grid)
+        self._flat = self.grid.ravel()
+        self._strides = np.array([self.shape[1] * self.shape[2], self.shape[2], 1])
+
+    def distance(self, points) -> np.ndarray:
+        """Clearance of (N, 3) points to obstacles and walls in mm."""
+        p = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        f = (p - self.lo) / self.resolution
+        i = np.clip(np.floor(f).astype(np.int64), 0, self.shape - 2)
+        t = np.clip(f - i, 0.0, 1.0)
+        base = i @ self._strides
+        s0, s1, s2 = self._strides
+        g = self._flat
+        tx, ty, tz = t[:, 0], t[:, 1], t[:, 2]
+        c00 = g[base] * (1 - tz) + g[base + s2] * tz
+        c01 = g[base + s1] * (1 - tz) + g[base + s1 + s2] * tz
+        c10 = g[base + s0] * (1 - tz) + g[base + s0 + s2] * tz
+        c11 = g[base + s0 + s1] * (1 - tz) + g[base + s0 + s1 + s2] * tz
+        d = (c00 * (1 - ty) + c01 * ty) * (1 - tx) + (c10 * (1 - ty) + c11 * ty) * tx
+        walls = np.minimum(p - self.lo, self.hi - p).min(axis=1)
+        return np.minimum(d, walls)
+
+    def clearance(self, poses) -> np.ndarray:
+        """Clearance of the tool spheres at (N, 6) XYZWPR TCP poses."""
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+        centers, radii = self.tool[:, :3], self.tool[:, 3]
+        if np.any(centers):
+            R = wpr_to_matrices(poses[:, 3:])
+            points = centers @ R.transpose(0, 2, 1) + poses[:, None, :3]
+        else:
+            points = np.broadcast_to(poses[:, None, :3], (len(poses), len(centers), 3))
+        d = self.distance(points.reshape(-1, 3)).reshape(len(poses), -1) - radii
+        return d.min(axis=1)
+
+    def collides(self, poses, margin: float = 0.0) -> np.ndarray:
+        """(N,) True where the tool at a TCP pose is within margin mm of
+        an obstacle or wall."""
+        return self.clearance(poses) < margin
+
+    def joint_clearance(self, joints) -> np.ndarray:
+        """Clearance of the link capsules at (N, n) joint positions."""
+        if self.links is None:
+            raise ValueError("Workspace has no link model.")
+        if self._link_spheres is None:
+            self._link_spheres = self.links.spheres()
+        frames = self.links.link_frames(joints)
+        d = np.full(len(frames), np.inf)
+        for k, centers, radii in self._link_spheres:
+            R, t = frames[:, k, :3, :3], frames[:, k, None, :3, 3]
+            points = centers @ R.transpose(0, 2, 1) + t
+            dk = self.distance(points.reshape(-1, 3)).reshape(len(frames), -1) - radii
+            d = np.minimum(d, dk.min(axis=1))
+        return d
+
+    def check_path(
+        self, poses, spacing: float = 5.0, margin: float = 0.0, rot_weight: float = 1.0
+    ) -> PathCheck:
+        """Checks linear moves through XYZWPR waypoints.
+
+        Args:
+            poses: (M, 6) waypoints, e.g. the current pose followed by
+                the targets.
+            spacing (float): Distance between checked poses in mm.
+            margin (float): Required clearance in mm.
+            rot_weight (float): mm per degree of rotation, so that
+                reorientations are sampled too.
+
+        Returns:
+            PathCheck: ok, index of the first colliding segment (None if
+                ok), the first colliding pose (None if ok) and the
+                minimum clearance.
+        """
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+        s = path_length(poses, rot_weight)
+        if len(poses) < 2 or s[-1] == 0:
+            u = np.zeros(1)
+        else:
+            s_new = np.append(np.arange(0.0, s[-1], spacing), s[-1])
+            u = np.interp(s_new, s, np.arange(len(s), dtype=np.float64))
+        samples = interpolate_poses(poses, u)
+        clearance = self.clearance(samples)
+        hits = np.flatnonzero(clearance < margin)
+        if not len(hits):
+            return PathCheck(True, None, None, float(clearance.min()))
+        k = hits[0]
+        segment = int(min(np.floor(u[k]), max(len(poses) - 2, 0)))
+        return PathCheck(False, segment, samples[k].tolist(), float(clearance.min()))
@@ -0,0 +1,185 @@
+"""Execution engine for robot apps with per-step profiling."""
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from fanucpy.robotapp import RobotApp
+
+PERCENTILES = (50, 90, 99)
+
+
+class CommandTimer:
+    """Times robot commands by wrapping ``Robot.send_cmd``.
+
+    Timings are grouped by command name, e.g. movej, curpos, setrdo.
+    """
+
+    def __init__(self, robot):
+        self.robot = robot
+        self.timings: dict[str, list[float]] = defaultdict(list)
+
+    def _timed_send_cmd(self, cmd, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._send_cmd(cmd, *args, **kwargs)
+        finally:
+            name = cmd.strip().split(":", 1)[0]
+            self.timings[name].append(time.perf_counter() - start)
+
+    def __enter__(self):
+        self._send_cmd = self.robot.send_cmd
+        self.robot.send_cmd = self._timed_send_cmd
+        return self
+
+    def __exit__(self, *exc):
+        del self.robot.send_cmd
+
+
+def summarize(samples, percentiles=PERCENTILES) -> dict:
+    """Summarizes latency samples in seconds."""
+    arr = np.asarray(samples, dtype=np.float64)
+    if arr.size == 0:
+        return {"count": 0}
+    summary = {
+        "count": int(arr.size),
+        "mean": float(arr.mean()),
+        "min": float(arr.min()),
+        "max": float(arr.max()),
+        "total": float(arr.sum()),
+    }
+    for p, v in zip(percentiles, np.percentile(arr, percentiles)):
+        summary[f"p{p}"] = float(v)
+    return summary
+
+
+class CycleReport:
+    """Cycle time, step and command latency statistics of an app run."""
+
+    def __init__(self):
+        self.cycle_times: list[float] = []
+        self.step_times: dict[str, list[float]] = defaultdict(list)
+        self.command_times: dict[str, list[float]] = {}
+        self.errors: list[str] = []
+        self.results: list = []
+        self.elapsed = 0.0
+
+    @property
+    def n_cycles(self) -> int:
+        return len(self.cycle_times)
+
+    @property
+    def throughput(self) -> float:
+        """Successful cycles per hour."""
+        if self.elapsed <= 0:
+            return 0.0
+        return (self.n_cycles - len(self.errors)) / self.elapsed * 3600
+
+    def summary(self) -> dict:
+        """Returns cycle, step and command statistics."""
+        return {
+            "cycles": summarize(self.cycle_times),
+            "steps": {k: summarize(v) for k, v in self.step_times.items()},
+            "commands": {k: summarize(v) for k, v in self.command_times.items()},
+            "errors": len(self.errors),
+            "throughput": self.throughput,
+        }
+
+    def dominant_step(self) -> str | None:
+        """Name of the step with the largest total time."""
+        if not self.step_times:
+            return None
+        return max(self.step_times, key=lambda k: sum(self.step_times[k]))
+
+    def __str__(self) -> str:
+        def row(name, s):
+            if s["count"] == 0:
+                return f"{name:<24}{0:>6}"
+            return f"{name:<24}{s['count']:>6}{s['mean'] * 1e3:>10.1f}" + "".join(
+                f"{s[f'p{p}'] * 1e3:>10.1f}" for p in PERCENTILES
+            )
+
+        header = f"{'name':<24}{'count':>6}{'mean':>10}" + "".join(
+            f"{f'p{p}':>10}" for p in PERCENTILES
+        )
+        lines = [header + "  [ms]", row("cycle", summarize(self.cycle_times))]
+        lines += [row(k, summarize(v)) for k, v in self.step_times.items()]
+        lines += [row(f"cmd:{k}", summarize(v)) for k, v in self.command_times.items()]
+        lines.append(
+            f"errors: {len(self.errors)}, throughput: {self.throughput:.1f} cycles/h"
+        )
+        return "\n".join(lines)
+
+
+class AppEngine:
+    """Runs a RobotApp repeatedly and profiles its steps."""
+
+    def __init__(self, app: RobotApp, robot=None):
+        """
+        Args:
+            app (RobotApp): App to run. Steps are marked with
+                ``app.step(name)``.
+            robot (Robot, optional): Robot whose command timings are
+                recorded. Defaults to None.
+        """
+        self.app = app
+        self.robot = robot
+
+    def run(
+        self,
+        n_cycles: int | None = None,
+        duration: float | None = None,
+        stop_on_error: bool = True,
+        **kwargs,
+    ) -> CycleReport:
+        """Runs the app for n_cycles or duration seconds.
+
+        Args:
+            n_cycles (int, optional): Number of cycles.
+            duration (float, optional): Run time in seconds. Defaults to
+                a single cycle if neither limit is given.
+            stop_on_error (bool): Stop at the first failed cycle.
+                Defaults to True.
+            kwargs: Arguments passed to ``app.run``.
+
+        Returns:
+            CycleReport: Run statistics.
+        """
+        if n_cycles is None and duration is None:
+            n_cycles = 1
+
+        report = CycleReport()
+        timer = CommandTimer(self.robot) if self.robot is not None else None
+        if timer is not None:
+            timer.__enter__()
+
+        start = time.perf_counter()
+        try:
+            while True:
+                if n_cycles is not None and report.n_cycles >= n_cycles:
+                    break
+                if duration is not None and time.perf_counter() - start >= duration:
+                    break
+
+                steps = self.app._step_timings = []
+                cycle_start = time.perf_counter()
+                status, message, result = self.app.run(**kwargs)
+                report.cycle_times.append(time.perf_counter() - cycle_start)
+                report.results.append(result)
+                for name, dt in steps:
+                    report.step_times[name].append(dt)
+
+                if not status:
+                    report.errors.append(message)
+                    if stop_on_error:
+                        break
+        finally:
+            self.app._step_timings = None
+            report.elapsed = time.perf_counter() - start
+            if timer is not None:
+                timer.__exit__(None, None, None)
+                report.command_times = dict(timer.timings)
+
+        return report
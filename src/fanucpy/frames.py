@@ -0,0 +1,161 @@
+"""Transform graph of named frames, e.g. base, user frame, tool, camera."""
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+from fanucpy.transformations import H_to_xyzrpw, xyzrpw_to_H
+
+
+def _as_H(pose) -> np.ndarray:
+    """4x4 matrix from a 4x4 matrix or XYZWPR pose."""
+    pose = np.asarray(pose, dtype=np.float64)
+    if pose.shape == (4, 4):
+        return pose.copy()
+    if pose.shape == (6,):
+        return xyzrpw_to_H(pose)
+    raise ValueError(f"Expected 4x4 matrix or XYZWPR pose, got shape {pose.shape}")
+
+
+def invert_H(H) -> np.ndarray:
+    """Inverse of a rigid 4x4 transform."""
+    Hinv = np.eye(4)
+    R = H[:3, :3]
+    Hinv[:3, :3] = R.T
+    Hinv[:3, 3] = -R.T @ H[:3, 3]
+    return Hinv
+
+
+class TransformGraph:
+    """Named frames connected by rigid transforms.
+
+    An edge set with set_transform(parent, child, pose) holds the pose of
+    child in parent, e.g. the TCP in the user frame or the camera in the
+    flange. Lookups compose the chain between any two connected frames.
+    Composed chains are cached and only the chains through an edge are
+    dropped when that edge changes, so static chains such as
+    camera -> flange stay cached while the TCP pose is updated.
+    """
+
+    def __init__(self):
+        self._edges: dict[tuple[str, str], np.ndarray] = {}
+        self._adjacent: dict[str, set[str]] = {}
+        self._chains: dict[tuple[str, str], np.ndarray] = {}
+        self._paths: dict[tuple[str, str], list[str]] = {}
+        self._dependents: dict[frozenset, set[tuple[str, str]]] = {}
+
+    @property
+    def frames(self) -> list[str]:
+        return sorted(self._adjacent)
+
+    def set_transform(self, parent: str, child: str, pose) -> None:
+        """Sets the pose of child in parent.
+
+        Args:
+            parent (str): Parent frame.
+            child (str): Child frame.
+            pose: 4x4 matrix or XYZWPR pose in mm and degrees.
+        """
+        H = _as_H(pose)
+        key = frozenset((parent, child))
+        new_edge = (parent, child) not in self._edges and (
+            child,
+            parent,
+        ) not in self._edges
+        self._edges.pop((child, parent), None)
+        self._edges[(parent, child)] = H
+        if new_edge:
+            self._adjacent.setdefault(parent, set()).add(child)
+            self._adjacent.setdefault(child, set()).add(parent)
+            # shorter paths may exist now
+            self._paths.clear()
+            self._chains.clear()
+            self._dependents.clear()
+        else:
+            for chain in self._dependents.pop(key, ()):
+                self._chains.pop(chain, None)
+
+    def update_from_robot(self, robot, frame: str = "user", tcp: str = "tcp") -> None:
+        """Sets the TCP pose in the active user frame from the robot."""
+        self.set_transform(frame, tcp, robot.get_curpos())
+
+    def _path(self, target: str, source: str) -> list[str]:
+        key = (target, source)
+        if key not in self._paths:
+            if target not in self._adjacent or source not in self._adjacent:
+                raise KeyError(
+                    f"Unknown frame: {target if target not in self._adjacent else source}"
+                )
+            prev = {target: None}
+            queue = deque([target])
+            while queue:
+                frame = queue.popleft()
+                if frame == source:
+                    break
+                for nxt in self._adjacent[frame]:
+                    if nxt not in prev:
+                        prev[nxt] = frame
+                        queue.append(nxt)
+            if source not in prev:
+                raise KeyError(f"No transform between {target} and {source}")
+            path = [source]
+            while path[-1] != target:
+                path.append(prev[path[-1]])
+            self._paths[key] = path[::-1]
+        return self._paths[key]
+
+    def get(self, target: str, source: str) -> np.ndarray:
+        """4x4 transform mapping coordinates in source to target.
+
+        Equals the pose of source in target.
+        """
+        key = (target, source)
+        H = self._chains.get(key)
+        if H is None:
+            path = self._path(target, source)
+            H = np.eye(4)
+            for a, b in zip(path[:-1], path[1:]):
+                edge = self._edges.get((a, b))
+                H = H @ (edge if edge is not None else invert_H(self._edges[(b, a)]))
+                self._dependents.setdefault(frozenset((a, b)), set()).add(key)
+            H.setflags(write=False)
+            self._chains[key] = H
+        return H
+
+    def get_xyzrpw(self, target: str, source: str) -> list[float]:
+        """Pose of source in target as XYZWPR."""
+        return H_to_xyzrpw(self.get(target, source))
+
+    def transform_points(self, points, source: str, target: str) -> np.ndarray:
+        """Transforms (N, 3) points from source to target coordinates."""
+        H = self.get(target, source)
+        points = np.asarray(points, dtype=np.float64)
+        return points @ H[:3, :3].T + H[:3, 3]
+
+    def transform_poses(self, poses, source: str, target: str) -> np.ndarray:
+        """Transforms (N, 4, 4) poses given in source to target."""
+        return np.matmul(self.get(target, source), np.asarray(poses, dtype=np.float64))
+
+    @classmethod
+    def for_robot(
+        cls,
+        user_frame=(0, 0, 0, 0, 0, 0),
+        tool=(0, 0, 0, 0, 0, 0),
+    ) -> TransformGraph:
+        """Graph with frames base, user, tcp and flange.
+
+        Args:
+            user_frame: User frame in base, e.g. UFRAME[8] of MAPPDK.
+            tool: Tool frame in flange, e.g. UTOOL[8] of MAPPDK.
+
+        Returns:
+            TransformGraph: Graph with an identity TCP pose. Update it
+                with set_transform("user", "tcp", pose) or
+                update_from_robot.
+        """
+        graph = cls()
+        graph.set_transform("base", "user", user_frame)
+        graph.set_transform("flange", "tcp", tool)
+        graph.set_transform("user", "tcp", np.eye(4))
+        return graph
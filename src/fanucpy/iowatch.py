@@ -0,0 +1,254 @@
+"""Digital IO change watcher with adaptive polling."""
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+# keyword names accepted by IOWatcher.wait_for
+IO_KEYWORDS = {"rdo": "RDO", "dout": "DOUT", "do": "DOUT", "din": "DIN"}
+
+
+class _Waiter:
+    def __init__(self, signal, value, deadline):
+        self.signal = signal
+        self.value = value
+        self.deadline = deadline
+        self.future: Future = Future()
+
+
+class IOWatcher:
+    """Polls a set of digital signals in a background thread.
+
+    All registered signals are read with one bulk IO command per poll.
+    The poll interval drops to ``min_interval`` while futures are
+    pending, after a change or after ``expect()``, and grows by
+    ``backoff`` up to ``max_interval`` while signals stay idle.
+
+    Use a separate connection, e.g. the logger port, so that polling
+    does not interleave with the commands of the running app. Callbacks
+    run on the watcher thread and should return quickly. A callback
+    that raises is reported to ``on_error`` and polling continues, read
+    errors stop the watcher and fail the pending futures.
+    """
+
+    def __init__(
+        self,
+        robot,
+        signals: list[tuple[str, int]] | None = None,
+        min_interval: float = 0.005,
+        max_interval: float = 0.2,
+        backoff: float = 1.5,
+        hold: float = 0.5,
+        on_error=None,
+    ):
+        """
+        Args:
+            robot (Robot): Connected robot.
+            signals (list[tuple[str, int]], optional): Signals to watch,
+                e.g. [("DOUT", 123), ("RDO", 7)].
+            min_interval (float): Poll interval in seconds when a change
+                is expected.
+            max_interval (float): Poll interval in seconds when idle.
+            backoff (float): Interval growth factor per idle poll.
+            hold (float): Seconds to keep polling fast after a change.
+            on_error (callable, optional): Called with the callback and
+                the exception when a callback raises. Defaults to
+                printing the traceback.
+        """
+        self.robot = robot
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.hold = hold
+        self.on_error = on_error
+
+        self.values: dict[tuple[str, int], bool] = {}
+        self.n_polls = 0
+        self.error: Exception | None = None
+        self._signals: list[tuple[str, int]] = []
+        self._callbacks: list[tuple[tuple[str, int], str, object]] = []
+        self._waiters: list[_Waiter] = []
+        self._fast_until = 0.0
+        self._interval = min_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        for io_type, io_num in signals or []:
+            self.watch(io_type, io_num)
+
+    def watch(self, io_type: str, io_num: int) -> tuple[str, int]:
+        """Adds a signal to the polled set."""
+        signal = ("DOUT" if io_type == "DO" else io_type, int(io_num))
+        with self._lock:
+            if signal not in self._signals:
+                self._signals.append(signal)
+        return signal
+
+    def on_change(self, io_type: str, io_num: int, callback, edge: str = "both"):
+        """Calls callback(signal, value, timestamp) on signal edges.
+
+        Args:
+            io_type (str): RDO, DOUT (or DO) or DIN.
+            io_num (int): Signal number.
+            callback (callable): Function to call.
+            edge (str): "rising", "falling" or "both".
+
+        Returns:
+            Handle for remove_callback.
+        """
+        if edge not in ("rising", "falling", "both"):
+            raise ValueError(f"Unknown edge: {edge}")
+        entry = (self.watch(io_type, io_num), edge, callback)
+        with self._lock:
+            self._callbacks.append(entry)
+        return entry
+
+    def remove_callback(self, handle) -> None:
+        with self._lock:
+            self._callbacks.remove(handle)
+
+    def wait_for(
+        self, value: bool = True, timeout: float | None = None, **signal
+    ) -> Future:
+        """Returns a future resolved once a signal has the given value.
+
+        Example:
+            watcher.wait_for(dout=123, value=True, timeout=5).result()
+
+        Args:
+            value (bool): Expected value.
+            timeout (float, optional): Seconds until the future fails
+                with TimeoutError.
+            **signal: One of rdo, dout, do or din with signal number.
+
+        Returns:
+            Future: Resolves to the poll timestamp.
+        """
+        if len(signal) != 1 or next(iter(signal)) not in IO_KEYWORDS:
+            raise ValueError(f"Expected one of {list(IO_KEYWORDS)} as signal.")
+        key, io_num = next(iter(signal.items()))
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        waiter = _Waiter(self.watch(IO_KEYWORDS[key], io_num), bool(value), deadline)
+        with self._lock:
+            self._waiters.append(waiter)
+        self._wake.set()
+        return waiter.future
+
+    def expect(self, duration: float) -> None:
+        """Polls at the minimum interval for the next duration seconds."""
+        self._fast_until = max(self._fast_until, time.perf_counter() + duration)
+        self._wake.set()
+
+    def poll(self) -> dict[tuple[str, int], bool]:
+        """Reads all watched signals and dispatches edges and waiters.
+
+        Returns:
+            dict: Changed signals and their new values.
+        """
+        with self._lock:
+            signals = list(self._signals)
+        if not signals:
+            return {}
+        vals = self.robot.get_io_list(signals)
+        now = time.perf_counter()
+        self.n_polls += 1
+
+        changed = {}
+        for signal, val in zip(signals, vals):
+            val = bool(val)
+            prev = self.values.get(signal)
+            self.values[signal] = val
+            if prev is not None and prev != val:
+                changed[signal] = val
+
+        with self._lock:
+            callbacks = list(self._callbacks)
+            waiters, self._waiters = self._waiters, []
+        for signal, edge, callback in callbacks:
+            if signal in changed and edge in (
+                "both",
+                "rising" if changed[signal] else "falling",
+            ):
+                try:
+                    callback(signal, changed[signal], now)
+                except Exception as exc:
+                    self._callback_failed(callback, exc)
+
+        pending = []
+        for w in waiters:
+            if w.future.cancelled():
+                continue
+            if self.values.get(w.signal) == w.value:
+                w.future.set_result(now)
+            elif w.deadline is not None and now >= w.deadline:
+                w.future.set_exception(TimeoutError(f"{w.signal} != {w.value}"))
+            else:
+                pending.append(w)
+        with self._lock:
+            self._waiters = pending + self._waiters
+
+        if changed:
+            self._fast_until = now + self.hold
+        return changed
+
+    def _callback_failed(self, callback, exc: Exception) -> None:
+        if self.on_error is not None:
+            self.on_error(callback, exc)
+        else:
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def _next_interval(self) -> float:
+        with self._lock:
+            deadlines = [w.deadline for w in self._waiters if w.deadline is not None]
+            busy = bool(self._waiters)
+        if busy or time.perf_counter() < self._fast_until:
+            self._interval = self.min_interval
+        else:
+            self._interval = min(self._interval * self.backoff, self.max_interval)
+        if deadlines:
+            until_deadline = min(deadlines) - time.perf_counter()
+            return max(0.0, min(self._interval, until_deadline))
+        return self._interval
+
+    def _fail_waiters(self, exc: Exception) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for w in waiters:
+            if not w.future.done():
+                w.future.set_exception(exc)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as exc:
+                self.error = exc
+                self._fail_waiters(exc)
+                return
+            self._wake.wait(self._next_interval())
+            self._wake.clear()
+
+    def start(self) -> IOWatcher:
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._fail_waiters(RuntimeError("IOWatcher stopped."))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,327 @@
+"""Offline cycle time estimation for sequences of robot moves.
+
+Segment durations are estimated from joint or Cartesian distances with
+trapezoidal or jerk-limited velocity profiles. The nominal axis limits
+below are starting points, fit the model against recorded move timings
+to tighten the estimates for a given cell.
+"""
+from __future__ import annotations
+
+from collections import namedtuple
+
+import numpy as np
+
+from fanucpy._lazy import LazyImport
+
+Rotation = LazyImport("scipy.spatial.transform", "Rotation")
+
+AxisLimits = namedtuple(
+    "AxisLimits",
+    [
+        "joint_velocity",  # deg/s per axis
+        "joint_acceleration",  # deg/s^2 per axis
+        "joint_jerk",  # deg/s^3 per axis
+        "linear_velocity",  # mm/s
+        "linear_acceleration",  # mm/s^2
+        "linear_jerk",  # mm/s^3
+        "rotation_velocity",  # deg/s
+    ],
+)
+
+
+def _limits(joint_velocity, linear_velocity, rotation_velocity, ramp=0.25, jerk=0.1):
+    """Builds limits from maximum speeds and nominal ramp times."""
+    jv = np.asarray(joint_velocity, dtype=np.float64)
+    return AxisLimits(
+        joint_velocity=jv,
+        joint_acceleration=jv / ramp,
+        joint_jerk=jv / ramp / jerk,
+        linear_velocity=float(linear_velocity),
+        linear_acceleration=linear_velocity / ramp,
+        linear_jerk=linear_velocity / ramp / jerk,
+        rotation_velocity=float(rotation_velocity),
+    )
+
+
+# maximum speeds from datasheets, accelerations are nominal
+ROBOT_LIMITS = {
+    "LR Mate 200iD": _limits([450, 380, 520, 550, 545, 1000], 2000, 540),
+    "M-10iD/12": _limits([260, 240, 260, 430, 450, 720], 2000, 540),
+    "CRX-10iA": _limits([120, 120, 180, 180, 180, 180], 1000, 180),
+}
+
+Move = namedtuple(
+    "Move",
+    ["move_type", "vals", "velocity", "acceleration", "cnt_val", "linear"],
+    defaults=[25, 100, 0, False],
+)
+
+
+def profile_time(distance, velocity, acceleration, jerk=None):
+    """Duration of point-to-point motions, vectorized.
+
+    Args:
+        distance: Distances.
+        velocity: Maximum velocities.
+        acceleration: Maximum accelerations.
+        jerk (optional): Maximum jerks. Trapezoidal profile if None,
+            otherwise the ramps of the trapezoid are extended by the
+            time needed to build up acceleration.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Durations and ramp (acceleration
+            phase) durations.
+    """
+    d = np.abs(np.asarray(distance, dtype=np.float64))
+    v = np.asarray(velocity, dtype=np.float64)
+    a = np.asarray(acceleration, dtype=np.float64)
+    cruise = d >= v * v / a
+    ramp = np.where(cruise, v / a, np.sqrt(d / a))
+    t = np.where(cruise, d / v + v / a, 2.0 * ramp)
+    if jerk is not None:
+        j = np.asarray(jerk, dtype=np.float64)
+        a_peak = np.minimum(a, j * ramp)
+        extra = np.where(d > 0, a_peak / j, 0.0)
+        t = t + extra
+        ramp = ramp + extra
+    return t, ramp
+
+
+def _as_arrays(program):
+    """Converts a list of moves to arrays."""
+    moves = [m if isinstance(m, Move) else Move(**m) for m in program]
+    n = len(moves)
+    n_axes = max(len(m.vals) for m in moves) if moves else 0
+    vals = np.full((n, n_axes), np.nan)
+    for i, m in enumerate(moves):
+        vals[i, : len(m.vals)] = m.vals
+    is_joint = np.array([m.move_type in ("joint", "movej") for m in moves], dtype=bool)
+    return (
+        is_joint,
+        vals,
+        np.array([m.velocity for m in moves], dtype=np.float64),
+        np.array([m.acceleration for m in moves], dtype=np.float64),
+        np.array([m.cnt_val for m in moves], dtype=np.float64),
+        np.array([m.linear for m in moves], dtype=bool),
+    )
+
+
+def _previous(states, start):
+    """Start of every move: the last known state before it.
+
+    Rows of states are the positions after each move in one space, NaN
+    where unknown. Unknown rows carry the previous state forward. Moves
+    before the first known state start at start if given.
+    """
+    n = len(states)
+    known = ~np.isnan(states).all(axis=1)
+    last = np.maximum.accumulate(np.where(known, np.arange(n), -1))
+    idx = np.concatenate([[-1], last[:-1]])[:n]
+    prev = np.full_like(states, np.nan)
+    prev[idx >= 0] = states[idx[idx >= 0]]
+    if start is not None:
+        start = np.asarray(start, dtype=np.float64)
+        prev[idx < 0, : len(start)] = start
+    return prev
+
+
+class MotionModel:
+    """Offline motion time model of a robot."""
+
+    def __init__(
+        self,
+        limits: str | AxisLimits = "LR Mate 200iD",
+        profile: str = "trapezoidal",
+        time_scale: float = 1.0,
+        overhead: float = 0.0,
+        fk=None,
+        ik=None,
+    ):
+        """
+        Args:
+            limits (str or AxisLimits): Robot model name from
+                ROBOT_LIMITS or custom limits.
+            profile (str): "trapezoidal" or "jerk". Defaults to
+                "trapezoidal".
+            time_scale (float): Scale of modelled motion time.
+            overhead (float): Per-command overhead in seconds, e.g.
+                communication and program call.
+            fk (callable, optional): Maps (N, n_axes) joints to (N, 6)
+                XYZWPR poses, so pose moves after joint moves start at
+                the right pose.
+            ik (callable, optional): Maps (N, 6) poses to (N, n_axes)
+                joints, the inverse of fk.
+        """
+        self.limits = ROBOT_LIMITS[limits] if isinstance(limits, str) else limits
+        if profile not in ("trapezoidal", "jerk"):
+            raise ValueError(f"Unknown profile: {profile}")
+        self.profile = profile
+        self.time_scale = time_scale
+        self.overhead = overhead
+        self.fk = fk
+        self.ik = ik
+
+    def joint_time(self, q0, q1, velocity=100, acceleration=100):
+        """Joint interpolated motion time, vectorized over leading axes.
+
+        Args:
+            q0, q1: (..., n_axes) joint values in degrees.
+            velocity: Velocity in percent.
+            acceleration: Acceleration in percent.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Durations and ramp durations
+                of the slowest axis. NaN where a start value of a moving
+                axis is NaN.
+        """
+        lim = self.limits
+        q1 = np.asarray(q1, dtype=np.float64)
+        d = np.abs(q1 - np.asarray(q0, dtype=np.float64))
+        # axes missing from the target do not move, unknown starts stay NaN
+        d = np.where(np.isnan(q1), 0.0, d)
+        k = d.shape[-1]
+        vel = np.clip(np.asarray(velocity, dtype=np.float64), 1, 100)[..., None] / 100
+        acc = (
+            np.clip(np.asarray(acceleration, dtype=np.float64), 1, 100)[..., None] / 100
+        )
+        v = lim.joint_velocity[:k] * vel
+        a = lim.joint_acceleration[:k] * acc
+        j = lim.joint_jerk[:k] if self.profile == "jerk" else None
+        t, ramp = profile_time(d, v, a, j)
+        unknown = np.isnan(t).any(axis=-1)
+        axis = np.argmax(np.where(np.isnan(t), -np.inf, t), axis=-1)[..., None]
+        return (
+            np.where(unknown, np.nan, np.take_along_axis(t, axis, -1)[..., 0]),
+            np.where(unknown, np.nan, np.take_along_axis(ramp, axis, -1)[..., 0]),
+        )
+
+    def linear_time(self, p0, p1, velocity=100, acceleration=100):
+        """Linear motion time between XYZWPR poses, vectorized.
+
+        Args:
+            p0, p1: (..., 6) poses in mm and degrees.
+            velocity: TCP speed in mm/s.
+            acceleration: Acceleration in percent.
+        """
+        lim = self.limits
+        p0 = np.asarray(p0, dtype=np.float64)
+        p1 = np.asarray(p1, dtype=np.float64)
+        shape = np.broadcast_shapes(p0.shape, p1.shape)[:-1]
+        p0 = np.broadcast_to(p0, shape + (6,)).reshape(-1, 6)
+        p1 = np.broadcast_to(p1, shape + (6,)).reshape(-1, 6)
+
+        d = np.linalg.norm(p1[:, :3] - p0[:, :3], axis=1)
+        angle = np.full(len(d), np.nan)
+        ok = np.isfinite(p0).all(axis=1) & np.isfinite(p1).all(axis=1)
+        if ok.any():
+            rel = Rotation.from_euler("xyz", p0[ok, 3:], degrees=True).inv() * (
+                Rotation.from_euler("xyz", p1[ok, 3:], degrees=True)
+            )
+            angle[ok] = np.degrees(rel.magnitude())
+
+        vel = np.broadcast_to(np.asarray(velocity, dtype=np.float64), shape).ravel()
+        acc = np.broadcast_to(np.asarray(acceleration, dtype=np.float64), shape).ravel()
+        v = np.clip(vel, 1, lim.linear_velocity)
+        a = lim.linear_acceleration * np.clip(acc, 1, 100) / 100
+        j = lim.linear_jerk if self.profile == "jerk" else None
+        t_lin, ramp_lin = profile_time(d, v, a, j)
+
+        # orientation is limited by rotation speed at the same ramp time
+        v_rot = lim.rotation_velocity * v / lim.linear_velocity
+        t_rot, ramp_rot = profile_time(angle, v_rot, v_rot / np.maximum(v / a, 1e-9))
+        t = np.maximum(t_lin, t_rot)
+        ramp = np.where(t_lin >= t_rot, ramp_lin, ramp_rot)
+        return t.reshape(shape), ramp.reshape(shape)
+
+    def segment_times(self, program, start_joints=None, start_pose=None):
+        """Estimates the duration of every move of a program.
+
+        Moves are Move tuples or dicts with Robot.move arguments. Joint
+        moves are timed in joint space, linear pose moves in Cartesian
+        space. Pose moves with joint interpolation are approximated in
+        Cartesian space at the given percentage of the maximum linear
+        speed. CNT blending overlaps the deceleration of a move with the
+        acceleration of the next one.
+
+        Every move starts at the last known position in its space. After
+        a move in the other space this is converted with fk or ik if
+        given, otherwise the last position in the same space is carried
+        forward, which ignores the motion in between.
+
+        Args:
+            program (list): Moves.
+            start_joints (list[float], optional): Initial joint values.
+            start_pose (list[float], optional): Initial XYZWPR pose.
+
+        Returns:
+            np.ndarray: Durations in seconds. NaN for moves without a
+                known start, e.g. the first move without a start value.
+        """
+        is_joint, vals, vel, acc, cnt, linear = _as_arrays(program)
+        n = len(is_joint)
+        t = np.full(n, np.nan)
+        ramp = np.zeros(n)
+        pose = ~is_joint
+
+        joints = np.where(is_joint[:, None], vals, np.nan)
+        poses = np.where(pose[:, None], vals, np.nan)[:, :6]
+        if self.ik is not None and pose.any():
+            joints[pose, :] = np.nan
+            ik_joints = np.asarray(self.ik(poses[pose]), dtype=np.float64)
+            joints[pose, : ik_joints.shape[1]] = ik_joints
+        if self.fk is not None and is_joint.any():
+            poses[is_joint] = self.fk(vals[is_joint])
+
+        if is_joint.any():
+            prev = _previous(joints, start_joints)[is_joint]
+            t[is_joint], ramp[is_joint] = self.joint_time(
+                prev, vals[is_joint], vel[is_joint], acc[is_joint]
+            )
+
+        if pose.any():
+            prev = _previous(poses, start_pose)[pose]
+            pvel = np.where(
+                linear[pose],
+                vel[pose],
+                np.clip(vel[pose], 1, 100) / 100 * self.limits.linear_velocity,
+            )
+            t[pose], ramp[pose] = self.linear_time(
+                prev, vals[pose][:, :6], pvel, acc[pose]
+            )
+
+        # CNT blending with the following move
+        saved = np.zeros(n)
+        if n > 1:
+            saved[:-1] = cnt[:-1] / 100 * np.minimum(ramp[:-1], ramp[1:])
+        t = t - np.nan_to_num(saved)
+
+        return self.time_scale * t + self.overhead
+
+    def program_time(self, program, start_joints=None, start_pose=None) -> float:
+        """Total estimated program duration in seconds.
+
+        Moves without a known start, NaN in segment_times, are not
+        counted, so the total is a lower bound if there are any.
+        """
+        return float(np.nansum(self.segment_times(program, start_joints, start_pose)))
+
+    def fit(self, program, durations, start_joints=None, start_pose=None):
+        """Fits time scale and per-command overhead to measured durations.
+
+        Args:
+            program (list): Executed moves.
+            durations (list[float]): Measured durations, e.g. movej and
+                movep command timings from AppEngine.
+
+        Returns:
+            MotionModel: self.
+        """
+        self.time_scale, self.overhead = 1.0, 0.0
+        t_model = self.segment_times(program, start_joints, start_pose)
+        t_meas = np.asarray(durations, dtype=np.float64)
+        ok = np.isfinite(t_model) & np.isfinite(t_meas)
+        A = np.stack([t_model[ok], np.ones(ok.sum())], axis=1)
+        (self.time_scale, self.overhead), *_ = np.linalg.lstsq(
+            A, t_meas[ok], rcond=None
+        )
+        return self
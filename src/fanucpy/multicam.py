@@ -0,0 +1,229 @@
+"""Synchronized capture and target detection with several cameras.
+
+Frames are captured with a software sync: every device is triggered
+with grab() in a tight loop first and the frames are decoded with
+retrieve() afterwards, in parallel. Detection runs in parallel workers,
+one per camera, and the target poses are fused in the robot base frame
+with the per-camera extrinsics. Capture of the next frame set overlaps
+with detection of the current one in stream().
+"""
+from __future__ import annotations
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fanucpy._lazy import LazyImport
+
+Rotation = LazyImport("scipy.spatial.transform", "Rotation")
+
+FrameSet = namedtuple("FrameSet", ["frames", "timestamps", "skew"])
+FusedPose = namedtuple("FusedPose", ["R", "t", "views", "spread"])
+MultiViewResult = namedtuple("MultiViewResult", ["pose", "detections", "frameset"])
+
+
+def average_rotations(R, weights=None):
+    """Weighted mean of (N, 3, 3) rotation matrices.
+
+    Uses the eigenvector of the weighted quaternion outer product sum,
+    which is independent of quaternion signs.
+    """
+    q = Rotation.from_matrix(
+        np.asarray(R, dtype=np.float64).reshape(-1, 3, 3)
+    ).as_quat()
+    w = np.ones(len(q)) if weights is None else np.asarray(weights, dtype=np.float64)
+    M = (q * w[:, None]).T @ q
+    _, vecs = np.linalg.eigh(M)
+    return Rotation.from_quat(vecs[:, -1]).as_matrix()
+
+
+def fuse_poses(R, t, weights=None, max_deviation=None) -> FusedPose | None:
+    """Fuses target poses seen by several cameras.
+
+    Args:
+        R: (N, 3, 3) target rotations in the base frame.
+        t: (N, 3) target translations in the base frame.
+        weights (optional): (N,) view weights. Defaults to equal.
+        max_deviation (float, optional): Views whose translation is
+            farther than this from the median of all views are dropped.
+            Only applied with three or more views.
+
+    Returns:
+        FusedPose: Rotation, translation, indices of the used views and
+            RMS distance of the used views from the fused translation.
+            None without views or if all views were dropped.
+    """
+    R = np.asarray(R, dtype=np.float64).reshape(-1, 3, 3)
+    t = np.asarray(t, dtype=np.float64).reshape(-1, 3)
+    w = np.ones(len(t)) if weights is None else np.asarray(weights, dtype=np.float64)
+    views = np.arange(len(t))
+    if not len(t):
+        return None
+    if max_deviation is not None and len(t) >= 3:
+        ok = np.linalg.norm(t - np.median(t, axis=0), axis=1) <= max_deviation
+        if not ok.any():
+            return None
+        views = views[ok]
+    w = w[views] / w[views].sum()
+    t_fused = w @ t[views]
+    spread = float(np.sqrt(np.sum(w * np.sum((t[views] - t_fused) ** 2, axis=1))))
+    return FusedPose(average_rotations(R[views], w), t_fused, views, spread)
+
+
+class CameraGroup:
+    """Cameras capturing and detecting a target together.
+
+    Cameras are capture objects with grab() and retrieve(), e.g.
+    cv2.VideoCapture, or calibration.Camera objects, whose frames are
+    rectified in the detection workers.
+    """
+
+    def __init__(
+        self,
+        cameras,
+        detectors,
+        extrinsics,
+        weights=None,
+        max_skew=0.02,
+        max_regrabs=2,
+        max_deviation=None,
+    ):
+        """
+        Args:
+            cameras (list): Capture objects.
+            detectors (list[callable]): Per-camera functions taking a
+                frame and returning R_target2cam and t_target2cam, or
+                None, None. E.g. CheckerboardTracker(...).find_pose or a
+                functools.partial of find_aruco_pose.
+            extrinsics (list): Per-camera 4x4 camera poses in the base
+                frame, e.g. H_cam2base of calibrate_eye_hand.
+            weights (list[float], optional): Per-camera weights, e.g.
+                inverse calibration errors. Views are further weighted
+                by the inverse squared target distance. Defaults to
+                equal.
+            max_skew (float): Maximum spread of the grab timestamps in
+                seconds. Defaults to 0.02.
+            max_regrabs (int): Grab attempts beyond the first when the
+                skew is exceeded. Defaults to 2.
+            max_deviation (float, optional): See fuse_poses.
+        """
+        if not len(cameras) == len(detectors) == len(extrinsics):
+            raise ValueError(
+                "cameras, detectors and extrinsics must have the same length."
+            )
+        self.cameras = list(cameras)
+        self.detectors = list(detectors)
+        self.extrinsics = [np.asarray(H, dtype=np.float64) for H in extrinsics]
+        self.weights = (
+            np.ones(len(cameras))
+            if weights is None
+            else np.asarray(weights, dtype=np.float64)
+        )
+        self.max_skew = max_skew
+        self.max_regrabs = max_regrabs
+        self.max_deviation = max_deviation
+        # capture, retrieve and detection workers
+        self._pool = ThreadPoolExecutor(max_workers=2 * len(self.cameras) + 1)
+
+    def _capture(self, camera):
+        return getattr(camera, "capture", None) or camera
+
+    def grab(self) -> FrameSet:
+        """Captures one synchronized frame set.
+
+        Returns:
+            FrameSet: Frames (None where retrieval failed), grab
+                timestamps from time.perf_counter and their spread.
+        """
+        captures = [self._capture(camera) for camera in self.cameras]
+        for _ in range(self.max_regrabs + 1):
+            timestamps = []
+            for capture in captures:
+                capture.grab()
+                timestamps.append(time.perf_counter())
+            skew = timestamps[-1] - timestamps[0]
+            if skew <= self.max_skew:
+                break
+        frames = list(self._pool.map(lambda c: c.retrieve(), captures))
+        frames = [frame if ret else None for ret, frame in frames]
+        return FrameSet(frames, np.array(timestamps), skew)
+
+    def _detect_one(self, i, frame):
+        if frame is None:
+            return None
+        camera = self.cameras[i]
+        if hasattr(camera, "rectify"):
+            frame = camera.rectify(frame)
+        R, t = self.detectors[i](frame)
+        if R is None:
+            return None
+        return np.asarray(R, dtype=np.float64), np.asarray(t, dtype=np.float64).reshape(
+            3
+        )
+
+    def detect(self, frameset: FrameSet) -> list:
+        """Detects the target in every frame in parallel.
+
+        Returns:
+            list: Per camera R_target2cam and t_target2cam, or None.
+        """
+        return list(
+            self._pool.map(self._detect_one, range(len(self.cameras)), frameset.frames)
+        )
+
+    def fuse(self, detections) -> FusedPose | None:
+        """Fuses detections into a target pose in the base frame.
+
+        Returns:
+            FusedPose: See fuse_poses, views index the cameras. None if
+                no camera saw the target or the views disagree.
+        """
+        cams = [i for i, d in enumerate(detections) if d is not None]
+        if not cams:
+            return None
+        R = np.stack([self.extrinsics[i][:3, :3] @ detections[i][0] for i in cams])
+        t = np.stack(
+            [
+                self.extrinsics[i][:3, :3] @ detections[i][1]
+                + self.extrinsics[i][:3, 3]
+                for i in cams
+            ]
+        )
+        # pose accuracy falls with the squared target distance
+        dist2 = np.array([max(detections[i][1] @ detections[i][1], 1e-9) for i in cams])
+        pose = fuse_poses(R, t, self.weights[cams] / dist2, self.max_deviation)
+        if pose is None:
+            return None
+        return pose._replace(views=np.asarray(cams)[pose.views])
+
+    def read(self) -> MultiViewResult:
+        """Captures, detects and fuses one frame set."""
+        frameset = self.grab()
+        detections = self.detect(frameset)
+        return MultiViewResult(self.fuse(detections), detections, frameset)
+
+    def stream(self):
+        """Yields MultiViewResult for consecutive frame sets.
+
+        The next frame set is captured while the current one is
+        processed.
+        """
+        pending = self._pool.submit(self.grab)
+        while True:
+            frameset = pending.result()
+            pending = self._pool.submit(self.grab)
+            detections = self.detect(frameset)
+            yield MultiViewResult(self.fuse(detections), detections, frameset)
+
+    def release(self):
+        self._pool.shutdown(wait=True)
+        for camera in self.cameras:
+            camera.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -1,13 +1,123 @@
 from __future__ import annotations
 
 import socket
-from typing import Literal
+import zlib
+from typing import Literal, NamedTuple
+
+# signal type codes used by compound IO commands
+IO_TYPES = {"RDO": "R", "DOUT": "D", "DIN": "I"}
+MAX_STATE_IO = 32
+MAX_IO_BITS = 128
+MAX_IO_LIST = 32
+
+# compact motion values: sign and value * 1000 in 5 base 36 digits
+FIXED_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+FIXED_SCALE = 1000
+FIXED_WIDTH = 5
+FIXED_MAX = (36**FIXED_WIDTH - 1) / FIXED_SCALE
+# first driver protocol version with cmovej/cmovep
+COMPACT_MOTION_VERSION = 2
+# first driver protocol version with cached paths
+PATH_VERSION = 3
+PATH_SLOTS = 50
 
 
 class FanucError(Exception):
     pass
 
 
+def encode_bits(bits) -> str:
+    """Packs booleans into hex digits, first value in the most
+    significant bit, last digit padded with zeros."""
+    bits = [bool(b) for b in bits]
+    if not bits:
+        return ""
+    n_digits = (len(bits) + 3) // 4
+    val = int("".join("1" if b else "0" for b in bits), 2) << (4 * n_digits - len(bits))
+    return f"{val:0{n_digits}X}"
+
+
+def decode_bits(hex_bits: str, count: int) -> list[bool]:
+    """Unpacks the first count booleans of hex digits."""
+    bits = bin(int(hex_bits.strip(), 16))[2:].zfill(4 * len(hex_bits.strip()))
+    return [b == "1" for b in bits[:count]]
+
+
+def encode_fixed(val: float) -> str:
+    """Encodes a value with 0.001 resolution as 6 chars, e.g. +0LFLS."""
+    ival = round(abs(val) * FIXED_SCALE)
+    if ival > 36**FIXED_WIDTH - 1:
+        raise ValueError(f"Value out of compact range: {val}")
+    digits = ""
+    for _ in range(FIXED_WIDTH):
+        ival, d = divmod(ival, 36)
+        digits = FIXED_DIGITS[d] + digits
+    return ("-" if val < 0 else "+") + digits
+
+
+def decode_fixed(val_str: str) -> float:
+    """Decodes a value encoded by encode_fixed."""
+    ival = int(val_str[1:], 36)
+    return (-ival if val_str[0] == "-" else ival) / FIXED_SCALE
+
+
+def _io_spec(io_type: str, io_num: int, write: bool = False) -> str:
+    """Signal code used by compound IO commands, e.g. D00012."""
+    if io_type == "DO":
+        io_type = "DOUT"
+    if io_type not in IO_TYPES or (write and io_type == "DIN"):
+        raise ValueError(f"Wrong IO type: {io_type}")
+    return f"{IO_TYPES[io_type]}{str(io_num).zfill(5)}"
+
+
+class RobotState(NamedTuple):
+    """Robot state returned by a single getstate command."""
+
+    pose: list[float]
+    joints: list[float]
+    power: float
+    io: dict[tuple[str, int], bool]
+
+    def as_array(self):
+        """Returns pose, joints, power and IO values as a NumPy array."""
+        import numpy as np
+
+        return np.array(
+            self.pose
+            + self.joints
+            + [self.power]
+            + [float(v) for v in self.io.values()]
+        )
+
+
+class PathSlot(NamedTuple):
+    """Controller slots of an uploaded path."""
+
+    start: int
+    capacity: int
+    count: int
+    signature: int
+
+
+def _path_point(move) -> str:
+    """Encodes a move as pathpt fields without the slot."""
+    m = move._asdict() if hasattr(move, "_asdict") else dict(move)
+    if m["move_type"] in ("joint", "movej"):
+        target = "J"
+    elif m["move_type"] in ("pose", "movep"):
+        target = "P"
+    else:
+        raise ValueError("Incorrect movement type!")
+    cnt_val = int(m.get("cnt_val", 0))
+    if not (0 <= cnt_val <= 100):
+        raise ValueError("Incorrect CNT value.")
+    vals = ":".join(encode_fixed(val) for val in m["vals"])
+    return (
+        f"{int(m.get('velocity', 25)):04}:{int(m.get('acceleration', 100)):04}"
+        f":{cnt_val:03}:{int(m.get('linear', False))}:{target}:{len(m['vals'])}:{vals}"
+    )
+
+
 class Robot:
     def __init__(
         self,
@@ -17,6 +127,7 @@ class Robot:
         ee_DO_type: str | None = None,
         ee_DO_num: int | None = None,
         socket_timeout: int = 60,
+        compact_motion: bool = False,
     ):
         """Class to connect to the robot, send commands, and receive
         responses.
@@ -32,6 +143,10 @@ class Robot:
                 number. Defaults to None.
             socket_timeout(int): Socket timeout in seconds. Defaults to
                 5 seconds.
+            compact_motion (bool): Send move values in the compact
+                fixed-point encoding if the driver supports it, which is
+                checked on connect. Values are rounded to 0.001 and
+                limited to +-60466.175. Defaults to False.
         """
         self.robot_model = robot_model
         self.host = host
@@ -43,6 +158,12 @@ class Robot:
         self.comm_sock: socket.socket
         self.SUCCESS_CODE = 0
         self.ERROR_CODE = 1
+        self.compact_motion = compact_motion
+        self.protocol_version: int | None = None
+        self._use_compact = False
+        self._paths: dict[str, PathSlot] = {}
+        self._path_points: dict[str, list[str]] = {}
+        self._path_table_sig: int | None = None
 
     def handle_response(
         self, resp: str, continue_on_error: bool = False
@@ -73,7 +194,20 @@ class Robot:
         self.comm_sock.settimeout(self.socket_timeout)
         self.comm_sock.connect((self.host, self.port))
         resp = self.comm_sock.recv(self.sock_buff_sz).decode()
-        return self.handle_response(resp)
+        result = self.handle_response(resp)
+        self._negotiate()
+        return result
+
+    def _negotiate(self) -> None:
+        """Enables optional protocol features supported by the driver."""
+        if self.compact_motion:
+            self.protocol_version = self.get_protocol_version()
+            self._use_compact = self.protocol_version >= COMPACT_MOTION_VERSION
+
+    def get_protocol_version(self) -> int:
+        """Gets driver protocol version, 1 for drivers without protover."""
+        code, msg = self.send_cmd("protover", continue_on_error=True)
+        return int(msg) if code == self.SUCCESS_CODE else 1
 
     def disconnect(self) -> None:
         self.comm_sock.close()
@@ -146,6 +280,40 @@ class Robot:
         vals = [float(val.split("=")[1]) for val in msg.split(",") if val != "j=none"]
         return vals
 
+    def get_state(self, io: list[tuple[str, int]] | None = None) -> RobotState:
+        """Gets pose, joints, power and IO in a single round trip.
+
+        Args:
+            io (list[tuple[str, int]], optional): Signals to read, e.g.
+                [("RDO", 7), ("DOUT", 123)]. Types are RDO, DOUT and
+                DIN. Defaults to the end-effector output if configured.
+
+        Returns:
+            RobotState: Pose XYZWPR, joint values, power in Watts and
+                IO values keyed by (type, number).
+        """
+        if io is None:
+            io = []
+            if self.ee_DO_type is not None and self.ee_DO_num is not None:
+                ee_type = "DOUT" if self.ee_DO_type == "DO" else self.ee_DO_type
+                io = [(ee_type, self.ee_DO_num)]
+        if len(io) > MAX_STATE_IO:
+            raise ValueError(f"At most {MAX_STATE_IO} signals per state.")
+
+        cmd = f"getstate:{len(io):02}"
+        for io_type, io_num in io:
+            cmd += f":{_io_spec(io_type, io_num)}"
+        _, msg = self.send_cmd(cmd)
+
+        pose_, joints_, power_, bits = msg.split(";")
+        return RobotState(
+            pose=[float(val) for val in pose_.split(",")],
+            joints=[float(val) for val in joints_.split(",") if val.strip()],
+            # Fanuc returns in kW. Should be adjusted to other robots.
+            power=float(power_) * 1000,
+            io={(t, n): bit == "1" for (t, n), bit in zip(io, bits.strip())},
+        )
+
     def move(
         self,
         move_type: Literal["joint"] | Literal["pose"],
@@ -200,20 +368,146 @@ class Robot:
 
         motion_type = int(linear)
 
+        if self._use_compact:
+            cmd = "c" + cmd
+
         cmd += f":{velocity_}:{acceleration_}:{cnt_val_}:{motion_type}:{len(vals)}"
 
         # prepare joint values
         for val in vals:
-            vs = f"{abs(val):013.6f}"
-            if val >= 0:
-                vs = "+" + vs
+            if self._use_compact:
+                vs = encode_fixed(val)
             else:
-                vs = "-" + vs
+                vs = f"{abs(val):013.6f}"
+                if val >= 0:
+                    vs = "+" + vs
+                else:
+                    vs = "-" + vs
             cmd += f":{vs}"
 
         # call send_cmd
         return self.send_cmd(cmd, continue_on_error=continue_on_error)
 
+    def upload_path(
+        self, name: str, moves: list | None = None, force: bool = False
+    ) -> bool:
+        """Stores a named path on the controller unless it is current.
+
+        Paths are kept in PR[100]-PR[149] and R[100]-R[199], see
+        fanuc.md. The client remembers which paths the controller holds
+        and only uploads new or changed ones.
+
+        Args:
+            name (str): Path name.
+            moves (list, optional): Moves as dicts with Robot.move
+                arguments or motion.Move tuples. Values are sent in the
+                compact encoding. Defaults to the last moves of the path.
+            force (bool): Upload even if the path is current, e.g.
+                after its registers were overwritten. Defaults to False.
+
+        Returns:
+            bool: True if the path was uploaded.
+        """
+        if self.protocol_version is None:
+            self.protocol_version = self.get_protocol_version()
+        if self.protocol_version < PATH_VERSION:
+            raise FanucError("Driver does not support cached paths.")
+
+        if moves is not None:
+            points = [_path_point(m) for m in moves]
+            if not 1 <= len(points) <= PATH_SLOTS:
+                raise ValueError(f"Paths have 1 to {PATH_SLOTS} moves.")
+            self._path_points[name] = points
+        elif name in self._path_points:
+            points = self._path_points[name]
+        else:
+            raise ValueError(f"Unknown path: {name}")
+
+        signature = zlib.crc32("\n".join(points).encode())
+        slot = self._paths.get(name)
+        if (
+            not force
+            and slot is not None
+            and slot.signature == signature
+            and slot.count == len(points)
+        ):
+            return False
+
+        # reuse the slots of the previous version if it fits
+        self._paths.pop(name, None)
+        if slot is not None and slot.capacity >= len(points):
+            start, capacity = slot.start, slot.capacity
+        else:
+            start, capacity = self._allocate_path(len(points)), len(points)
+
+        for k, point in enumerate(points):
+            self.send_cmd(f"pathpt:{start + k:03}:{point}")
+        self._paths[name] = PathSlot(start, capacity, len(points), signature)
+        self._send_path_sig()
+        return True
+
+    def _send_path_sig(self) -> None:
+        """Stores the signature of the path table on the controller."""
+        table = ";".join(f"{n}:{p}" for n, p in sorted(self._paths.items()))
+        self._path_table_sig = zlib.crc32(table.encode()) % 10**9
+        self.send_cmd(f"pathsig:{self._path_table_sig:09}")
+
+    def _allocate_path(self, count: int) -> int:
+        """First slot of a free block of count slots."""
+        used = sorted((p.start, p.start + p.capacity) for p in self._paths.values())
+        start = 0
+        for lo, hi in used:
+            if lo - start >= count:
+                break
+            start = max(start, hi)
+        if start + count > PATH_SLOTS:
+            raise FanucError("Not enough path slots, remove unused paths.")
+        return start
+
+    def remove_path(self, name: str) -> None:
+        """Forgets a path, frees its slots and updates the signature."""
+        self._path_points.pop(name, None)
+        if self._paths.pop(name, None) is not None:
+            self._send_path_sig()
+
+    def run_path(
+        self,
+        name: str,
+        moves: list | None = None,
+        continue_on_error: bool = False,
+    ) -> tuple[Literal[0, 1], str]:
+        """Runs a cached path with a single command.
+
+        Args:
+            name (str): Path name.
+            moves (list, optional): Path moves. The path is uploaded
+                first if it is new or changed.
+
+        Returns:
+            tuple(int, str): Response code and number of completed
+                moves. Progress while running is reported by
+                path_status, e.g. on the logger connection.
+        """
+        self.upload_path(name, moves)
+        for retry in (True, False):
+            slot = self._paths[name]
+            cmd = f"pathrun:{slot.start:03}:{slot.count:03}:{self._path_table_sig:09}"
+            code, msg = self.send_cmd(cmd, continue_on_error=True)
+            if code == self.ERROR_CODE and msg == "path-changed" and retry:
+                # registers were overwritten, upload this path again
+                self.upload_path(name, force=True)
+                continue
+            break
+        if code == self.ERROR_CODE and not continue_on_error:
+            raise FanucError(msg)
+        return code, msg
+
+    def path_status(self) -> tuple[int, int]:
+        """Gets completed and total moves of the running path."""
+        _, msg = self.send_cmd("pathstat")
+        done, total = msg.split(",")
+        return int(done), int(total)
+
     def gripper(
         self,
         value: bool,
@@ -298,6 +592,110 @@ class Robot:
         cmd = f"setdout:{str(dout_num).zfill(5)}:{str(val).lower()}"
         return self.send_cmd(cmd, continue_on_error=continue_on_error)
 
+    def get_io_bits(self, io_type: str, start: int, count: int, as_int: bool = False):
+        """Reads consecutive digital signals in as few round trips as
+        possible, up to 128 signals per command.
+
+        Args:
+            io_type (str): RDO, DOUT (or DO) or DIN.
+            start (int): First signal number.
+            count (int): Number of signals.
+            as_int (bool): Return an int with bit k holding signal
+                start + k instead of an array.
+
+        Returns:
+            np.ndarray or int: Boolean values.
+        """
+        import numpy as np
+
+        vals: list[bool] = []
+        for offset in range(0, count, MAX_IO_BITS):
+            n = min(MAX_IO_BITS, count - offset)
+            spec = _io_spec(io_type, start + offset)
+            _, msg = self.send_cmd(f"rdbits:{spec[0]}:{spec[1:]}:{n:03}")
+            vals += decode_bits(msg, n)
+        if as_int:
+            return sum(1 << k for k, v in enumerate(vals) if v)
+        return np.array(vals, dtype=bool)
+
+    def set_io_bits(
+        self,
+        io_type: str,
+        start: int,
+        vals,
+        count: int | None = None,
+        continue_on_error: bool = False,
+    ) -> tuple[Literal[0, 1], str]:
+        """Writes consecutive digital outputs, up to 128 per command.
+
+        Args:
+            io_type (str): RDO or DOUT (or DO).
+            start (int): First signal number.
+            vals: Sequence of booleans or an int with bit k holding
+                signal start + k.
+            count (int, optional): Number of signals, required if vals
+                is an int.
+        """
+        if isinstance(vals, int):
+            if count is None:
+                raise ValueError("count is required for int values.")
+            vals = [bool(vals >> k & 1) for k in range(count)]
+        vals = [bool(v) for v in vals]
+
+        resp: tuple[Literal[0, 1], str] = (self.SUCCESS_CODE, "success")
+        for offset in range(0, len(vals), MAX_IO_BITS):
+            chunk = vals[offset : offset + MAX_IO_BITS]
+            spec = _io_spec(io_type, start + offset, write=True)
+            cmd = f"wrbits:{spec[0]}:{spec[1:]}:{len(chunk):03}:{encode_bits(chunk)}"
+            resp = self.send_cmd(cmd, continue_on_error=continue_on_error)
+        return resp
+
+    def get_io_list(self, signals: list[tuple[str, int]]):
+        """Reads arbitrary digital signals, up to 32 per command.
+
+        Args:
+            signals (list[tuple[str, int]]): Signals, e.g.
+                [("RDO", 7), ("DIN", 3)].
+
+        Returns:
+            np.ndarray: Boolean values in the order of signals.
+        """
+        import numpy as np
+
+        vals: list[bool] = []
+        for offset in range(0, len(signals), MAX_IO_LIST):
+            chunk = signals[offset : offset + MAX_IO_LIST]
+            specs = ":".join(_io_spec(t, n) for t, n in chunk)
+            _, msg = self.send_cmd(f"rdlist:{len(chunk):02}:{specs}")
+            vals += decode_bits(msg, len(chunk))
+        return np.array(vals, dtype=bool)
+
+    def set_io_list(
+        self,
+        signals: list[tuple[str, int]],
+        vals,
+        continue_on_error: bool = False,
+    ) -> tuple[Literal[0, 1], str]:
+        """Writes arbitrary digital outputs, up to 32 per command.
+
+        Args:
+            signals (list[tuple[str, int]]): Outputs, e.g.
+                [("RDO", 7), ("DOUT", 12)].
+            vals: Boolean values in the order of signals.
+        """
+        vals = [bool(v) for v in vals]
+        if len(vals) != len(signals):
+            raise ValueError("Number of signals and values do not match.")
+
+        resp: tuple[Literal[0, 1], str] = (self.SUCCESS_CODE, "success")
+        for offset in range(0, len(signals), MAX_IO_LIST):
+            chunk = signals[offset : offset + MAX_IO_LIST]
+            bits = encode_bits(vals[offset : offset + MAX_IO_LIST])
+            specs = ":".join(_io_spec(t, n, write=True) for t, n in chunk)
+            cmd = f"wrlist:{len(chunk):02}:{bits}:{specs}"
+            resp = self.send_cmd(cmd, continue_on_error=continue_on_error)
+        return resp
+
     def set_sys_var(
         self,
         sys_var: str,
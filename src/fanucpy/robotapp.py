@@ -1,5 +1,7 @@
+import time
 import traceback
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 
 class RobotApp(ABC):
@@ -7,6 +9,9 @@ class RobotApp(ABC):
     Use this interface to develop robotic apps.
     """
 
+    # list of (step name, seconds), set by AppEngine while profiling
+    _step_timings = None
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -19,6 +24,22 @@ class RobotApp(ABC):
         """Main method"""
         raise NotImplementedError("Should implement run method!")
 
+    @contextmanager
+    def step(self, name: str):
+        """Marks a named step of the app, e.g. approach, pick, retract.
+
+        Steps are timed only when the app runs under AppEngine.
+        """
+        timings = self._step_timings
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.append((name, time.perf_counter() - start))
+
     def run(self, **kwargs):
         """Execution method."""
         status = True
@@ -0,0 +1,220 @@
+"""Visit order optimization for multi-part pick and place jobs."""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from fanucpy.motion import MotionModel
+
+SequenceResult = namedtuple("SequenceResult", ["order", "cost"])
+
+
+class SequenceOptimizer:
+    """Orders pick and place targets for minimum estimated travel time.
+
+    Part i is picked at picks[i] and placed at places[i]. A part must be
+    picked before it is placed and at most ``capacity`` parts are held at
+    once. A nearest neighbour route is improved with Or-opt and 2-opt
+    moves over a cached pairwise joint-space travel time matrix. The
+    number of improvement rounds of the last optimize call is kept in
+    ``n_iterations``.
+    """
+
+    def __init__(
+        self,
+        model: MotionModel | None = None,
+        velocity: float = 100,
+        acceleration: float = 100,
+        capacity: int = 1,
+        cache_size: int = 16,
+        max_tries: int = 8,
+    ):
+        """
+        Args:
+            model (MotionModel, optional): Travel time model. Defaults to
+                MotionModel().
+            velocity (float): Joint velocity in percent.
+            acceleration (float): Joint acceleration in percent.
+            capacity (int): Number of parts the gripper can hold.
+            cache_size (int): Number of cached cost matrices.
+            max_tries (int): Improving moves checked for feasibility per
+                position.
+        """
+        self.model = model or MotionModel()
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.capacity = capacity
+        self.cache_size = cache_size
+        self.max_tries = max_tries
+        self.n_iterations = 0
+        self._cache: OrderedDict = OrderedDict()
+
+    def cost_matrix(self, targets) -> np.ndarray:
+        """Pairwise travel times between (M, n_axes) joint targets."""
+        q = np.ascontiguousarray(targets, dtype=np.float64)
+        key = hashlib.sha1(q.tobytes()).hexdigest() + str(q.shape)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        C, _ = self.model.joint_time(
+            q[:, None, :], q[None, :, :], self.velocity, self.acceleration
+        )
+        self._cache[key] = C
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return C
+
+    def _feasible(self, route, n) -> bool:
+        """Checks precedence and capacity of a full route."""
+        inner = route[1:-1]
+        pos = np.empty(2 * n, dtype=np.int64)
+        pos[inner] = np.arange(len(inner))
+        if np.any(pos[:n] > pos[n:]):
+            return False
+        load = np.cumsum(np.where(inner < n, 1, -1))
+        return load.max() <= self.capacity
+
+    def _nearest_neighbour(self, C, n, start):
+        """Greedy route from start."""
+        route = [start]
+        picked = np.zeros(n, dtype=bool)
+        placed = np.zeros(n, dtype=bool)
+        load = 0
+        for _ in range(2 * n):
+            cand = np.concatenate(
+                [
+                    np.flatnonzero(~picked) if load < self.capacity else [],
+                    np.flatnonzero(picked & ~placed) + n,
+                ]
+            ).astype(np.int64)
+            nxt = int(cand[np.argmin(C[route[-1], cand])])
+            if nxt < n:
+                picked[nxt] = True
+                load += 1
+            else:
+                placed[nxt - n] = True
+                load -= 1
+            route.append(nxt)
+        return route
+
+    def _or_opt(self, C, route, n, eps, deadline):
+        """Moves segments of 1 to 3 nodes. Returns True if improved."""
+        m = len(route)
+        improved = False
+        for seg_len in (1, 2, 3):
+            for i in range(1, m - 1 - seg_len + 1):
+                if time.perf_counter() > deadline:
+                    return improved
+                j = i + seg_len - 1
+                a, si, sj, b = route[i - 1], route[i], route[j], route[j + 1]
+                removed = C[a, b] - C[a, si] - C[sj, b]
+                # insert between route[p] and route[p + 1]
+                rest = np.concatenate([route[:i], route[j + 1 :]])
+                c, d = rest[:-1], rest[1:]
+                delta = removed + C[c, si] + C[sj, d] - C[c, d]
+                delta[i - 1] = 0.0
+                for p in np.argsort(delta)[: self.max_tries]:
+                    if delta[p] >= -eps:
+                        break
+                    seg = route[i : j + 1]
+                    new = np.concatenate([rest[: p + 1], seg, rest[p + 1 :]])
+                    if self._feasible(new, n):
+                        route[:] = new
+                        improved = True
+                        break
+        return improved
+
+    def _two_opt(self, C, route, n, eps, deadline):
+        """Reverses segments. Returns True if improved."""
+        m = len(route)
+        improved = False
+        for i in range(1, m - 2):
+            if time.perf_counter() > deadline:
+                return improved
+            fwd = np.concatenate([[0.0], np.cumsum(C[route[:-1], route[1:]])])
+            rev = np.concatenate([[0.0], np.cumsum(C[route[1:], route[:-1]])])
+            j = np.arange(i + 1, m - 1)
+            a, ri, rj, b = route[i - 1], route[i], route[j], route[j + 1]
+            delta = (
+                C[a, rj]
+                + C[ri, b]
+                - C[a, ri]
+                - C[rj, b]
+                + (rev[j] - rev[i])
+                - (fwd[j] - fwd[i])
+            )
+            for k in np.argsort(delta)[: self.max_tries]:
+                if delta[k] >= -eps:
+                    break
+                new = route.copy()
+                new[i : j[k] + 1] = route[i : j[k] + 1][::-1]
+                if self._feasible(new, n):
+                    route[:] = new
+                    improved = True
+                    break
+        return improved
+
+    def optimize(
+        self,
+        picks,
+        places,
+        start=None,
+        max_time: float = 0.1,
+        eps: float = 1e-9,
+    ) -> SequenceResult:
+        """Finds a short visit order.
+
+        Args:
+            picks: (n, n_axes) pick joint targets.
+            places: (n, n_axes) place joint targets.
+            start (list[float], optional): Current joint values. The
+                route starts anywhere if None.
+            max_time (float): Time budget in seconds for improving the
+                nearest neighbour route, which is always completed. The
+                cost matrix of new targets is computed before and not
+                counted.
+            eps (float): Minimum improvement in seconds.
+
+        Returns:
+            SequenceResult: List of ("pick", i) and ("place", i) visits
+                and the estimated travel time.
+        """
+        picks = np.asarray(picks, dtype=np.float64)
+        places = np.asarray(places, dtype=np.float64)
+        n = len(picks)
+        self.n_iterations = 0
+        if n == 0:
+            return SequenceResult(order=[], cost=0.0)
+
+        # nodes: picks, places, start, virtual end
+        targets = np.vstack([picks, places])
+        C = np.zeros((2 * n + 2, 2 * n + 2))
+        C[: 2 * n, : 2 * n] = self.cost_matrix(targets)
+        s, e = 2 * n, 2 * n + 1
+        if start is not None:
+            # only the start row changes between replans
+            C[s, : 2 * n], _ = self.model.joint_time(
+                np.asarray(start, dtype=np.float64),
+                targets,
+                self.velocity,
+                self.acceleration,
+            )
+
+        deadline = time.perf_counter() + max_time
+        route = np.array(self._nearest_neighbour(C, n, s) + [e], dtype=np.int64)
+
+        while time.perf_counter() < deadline:
+            self.n_iterations += 1
+            improved = self._or_opt(C, route, n, eps, deadline)
+            improved |= self._two_opt(C, route, n, eps, deadline)
+            if not improved:
+                break
+
+        cost = float(C[route[:-1], route[1:]].sum())
+        order = [
+            ("pick", int(k)) if k < n else ("place", int(k - n)) for k in route[1:-1]
+        ]
+        return SequenceResult(order=order, cost=cost)
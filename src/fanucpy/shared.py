@@ -0,0 +1,176 @@
+"""Thread-safe Robot shared by many threads."""
+from __future__ import annotations
+
+import queue
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Literal
+
+from fanucpy.robot import FanucError, Robot
+
+# commands without side effects that the logger program can serve
+READ_ONLY_COMMANDS = (
+    "curpos",
+    "curjpos",
+    "ins_pwr",
+    "getstate",
+    "getrdo",
+    "getdout",
+    "rdbits",
+    "rdlist",
+    "pathstat",
+)
+
+
+class _Channel:
+    """Socket served by a single I/O thread in FIFO order."""
+
+    def __init__(self, robot: SharedRobot, sock: socket.socket, name: str):
+        self.robot = robot
+        self.sock = sock
+        self.queue: queue.Queue = queue.Queue()
+        self.error: Exception | None = None
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, cmd: str, continue_on_error: bool) -> Future:
+        future: Future = Future()
+        if self.error is not None:
+            future.set_exception(self._broken())
+        else:
+            self.queue.put((cmd, continue_on_error, future))
+            if self.error is not None:
+                # the I/O thread may have stopped before the put
+                self._fail_queued(self._broken())
+        return future
+
+    def _broken(self) -> FanucError:
+        return FanucError(f"Connection broken, reconnect required: {self.error}")
+
+    def _fail_queued(self, exc: Exception):
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[2].set_running_or_notify_cancel():
+                item[2].set_exception(exc)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            cmd, continue_on_error, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self.sock.sendall(cmd.encode())
+                resp = self.sock.recv(self.robot.sock_buff_sz).decode()
+                if not resp:
+                    raise ConnectionError("Connection closed by the robot.")
+            except Exception as exc:
+                # a late reply would be taken for the next command's reply
+                self.error = exc
+                future.set_exception(exc)
+                self._fail_queued(self._broken())
+                return
+            try:
+                future.set_result(self.robot.handle_response(resp, continue_on_error))
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        # fail commands queued after the sentinel
+        self._fail_queued(FanucError("Connection closed."))
+        self.sock.close()
+
+
+class SharedRobot(Robot):
+    """Robot that many threads can use at the same time.
+
+    Commands are queued and sent by one I/O thread per connection, so
+    request and response pairs never interleave. Replies are delivered
+    through futures. With a logger port, read-only queries go to the
+    logger connection and are answered while a move blocks the server
+    connection.
+
+    A send or receive failure, e.g. a timeout, breaks the connection:
+    queued and later commands fail until disconnect() and connect().
+
+    Single commands are thread-safe. Methods sending several commands,
+    e.g. upload_path, should not run for the same path concurrently.
+    """
+
+    def __init__(self, *args, logger_port: int | None = None, **kwargs):
+        """
+        Args:
+            *args, **kwargs: Robot arguments.
+            logger_port (int, optional): Logger port, e.g. 18736, to
+                route read-only queries to. Defaults to None.
+        """
+        super().__init__(*args, **kwargs)
+        self.logger_port = logger_port
+        self._channel: _Channel | None = None
+        self._logger_channel: _Channel | None = None
+
+    def _open(self, port: int) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.socket_timeout)
+            sock.connect((self.host, port))
+            resp = sock.recv(self.sock_buff_sz).decode()
+            self.handle_response(resp)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def connect(self) -> tuple[Literal[0, 1], str]:
+        """Connects to the server and, if given, the logger port.
+
+        Existing connections are closed first.
+        """
+        self.disconnect()
+        try:
+            self.comm_sock = self._open(self.port)
+            self._channel = _Channel(self, self.comm_sock, "fanucpy-server")
+            if self.logger_port is not None:
+                self._logger_channel = _Channel(
+                    self, self._open(self.logger_port), "fanucpy-logger"
+                )
+            self._negotiate()
+        except BaseException:
+            self.disconnect()
+            raise
+        return self.SUCCESS_CODE, "success"
+
+    def disconnect(self) -> None:
+        for channel in (self._channel, self._logger_channel):
+            if channel is not None:
+                channel.close()
+        self._channel = self._logger_channel = None
+
+    def submit(self, cmd: str, continue_on_error: bool = False) -> Future:
+        """Queues a command without waiting.
+
+        Returns:
+            Future: Resolves to response code and message, or raises
+                FanucError.
+        """
+        if self._channel is None:
+            raise FanucError("Robot is not connected.")
+        cmd = cmd.strip()
+        channel = self._channel
+        if self._logger_channel is not None and cmd.startswith(READ_ONLY_COMMANDS):
+            channel = self._logger_channel
+        return channel.submit(cmd + "\n", continue_on_error)
+
+    def send_cmd(
+        self, cmd: str, continue_on_error: bool = False
+    ) -> tuple[Literal[0, 1], str]:
+        """Sends command and waits for its response."""
+        return self.submit(cmd, continue_on_error).result()
@@ -0,0 +1,358 @@
+"""Local stand-in for the MAPPDK server.
+
+RobotSimulator speaks the MAPPDK socket protocol, so Robot, apps and
+tools can be exercised off-robot. It keeps joint values, pose and IO in
+memory and does not compute kinematics: joint moves only update joints
+and pose moves only update the pose. With a MotionModel, moves take
+their estimated duration.
+"""
+from __future__ import annotations
+
+import socketserver
+import threading
+import time
+
+from fanucpy.robot import decode_bits, decode_fixed, encode_bits
+
+IO_CODES = {"R": "RDO", "D": "DOUT", "I": "DIN"}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sim = self.server.simulator
+        self.request.sendall(b"0:success")
+        buff = b""
+        while True:
+            try:
+                data = self.request.recv(1024)
+            except OSError:
+                return
+            if not data:
+                return
+            buff += data
+            while b"\n" in buff:
+                line, buff = buff.split(b"\n", 1)
+                resp, keep_conn = sim.handle_cmd(line.decode().strip())
+                self.request.sendall(resp.encode())
+                if not keep_conn:
+                    return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RobotSimulator:
+    """Simulated MAPPDK server on a local port."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        n_joints: int = 6,
+        motion_model=None,
+        time_scale: float = 1.0,
+        idle_power: float = 0.2,
+        motion_power: float = 1.0,
+        protocol_version: int = 3,
+    ):
+        """
+        Args:
+            host (str): Host to bind. Defaults to 127.0.0.1.
+            port (int): Port to bind, 0 picks a free port.
+            n_joints (int): Number of joints. Defaults to 6.
+            motion_model (MotionModel, optional): Makes moves take their
+                estimated duration.
+            time_scale (float): Scale of simulated move durations.
+            idle_power (float): Power at standstill in kW.
+            motion_power (float): Additional power at 100% speed in kW.
+            protocol_version (int): Reported driver protocol version,
+                1 simulates a driver without protover.
+        """
+        self.host = host
+        self.port = port
+        self.motion_model = motion_model
+        self.time_scale = time_scale
+        self.idle_power = idle_power
+        self.motion_power = motion_power
+        self.protocol_version = protocol_version
+
+        self.joints = [0.0] * n_joints
+        self.pose = [0.0] * 6
+        self.io: dict[tuple[str, int], bool] = {}
+        self.sys_vars: dict[str, bool] = {}
+        self.commands: list[str] = []
+        self.path_targets: dict[int, tuple] = {}
+        self.registers: dict[int, int] = {84: 0, 85: 0, 86: 0}
+        self._speed = 0.0
+        self._lock = threading.Lock()
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+        self.handlers = [
+            ("exit", self._exit),
+            ("getstate", self._get_state),
+            ("curpos", self._get_curpos),
+            ("curjpos", self._get_curjpos),
+            ("ins_pwr", self._get_ins_pwr),
+            ("movej", self._move),
+            ("movep", self._move),
+            ("cmovej", self._move),
+            ("cmovep", self._move),
+            ("protover", self._get_protover),
+            ("pathpt", self._path_point),
+            ("pathsig", self._path_sig),
+            ("pathrun", self._path_run),
+            ("pathstat", self._path_stat),
+            ("mappdkcall", self._success),
+            ("setrdo", self._set_rdo),
+            ("getrdo", self._get_rdo),
+            ("setdout", self._set_dout),
+            ("getdout", self._get_dout),
+            ("setsysvar", self._set_sys_var),
+            ("rdbits", self._read_bits),
+            ("wrbits", self._write_bits),
+            ("rdlist", self._read_list),
+            ("wrlist", self._write_list),
+        ]
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.host, self.port
+
+    def start(self) -> RobotSimulator:
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.simulator = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle_cmd(self, cmd: str) -> tuple[str, bool]:
+        """Returns response and whether to keep the connection."""
+        with self._lock:
+            self.commands.append(cmd)
+        for prefix, handler in self.handlers:
+            if cmd.startswith(prefix):
+                if prefix == "exit":
+                    return handler(cmd), False
+                return handler(cmd), True
+        return "1:wrong-command", True
+
+    def get_io(self, io_type: str, io_num: int) -> bool:
+        return self.io.get((io_type, io_num), False)
+
+    def set_io(self, io_type: str, io_num: int, val: bool) -> None:
+        with self._lock:
+            self.io[(io_type, io_num)] = bool(val)
+
+    def _exit(self, cmd):
+        return "0:success"
+
+    def _success(self, cmd):
+        return "0:success"
+
+    def _get_protover(self, cmd):
+        if self.protocol_version < 2:
+            return "1:wrong-command"
+        return f"0:{self.protocol_version}"
+
+    def _get_curpos(self, cmd):
+        with self._lock:
+            pose = list(self.pose)
+        vals = ",".join(f"{k}={v:8.3f}" for k, v in zip("xyzwpr", pose))
+        return f"0:{vals}"
+
+    def _get_curjpos(self, cmd):
+        with self._lock:
+            joints = list(self.joints)
+        joints += [None] * (9 - len(joints))
+        vals = ",".join("j=none" if v is None else f"j={v:8.3f}" for v in joints)
+        return f"0:{vals}"
+
+    def _ins_pwr(self):
+        return self.idle_power + self.motion_power * self._speed
+
+    def _get_ins_pwr(self, cmd):
+        return f"0:{self._ins_pwr():6.6f}"
+
+    def _move(self, cmd):
+        fields = cmd.split(":")
+        velocity, acceleration = int(fields[1]), int(fields[2])
+        linear = fields[4] == "1"
+        nj = int(fields[5])
+        compact = fields[0].startswith("c")
+        vals = [decode_fixed(v) if compact else float(v) for v in fields[6 : 6 + nj]]
+        return self._do_move(
+            fields[0].endswith("movej"), vals, velocity, acceleration, linear
+        )
+
+    def _do_move(self, joint_move, vals, velocity, acceleration, linear):
+        nj = len(vals)
+        duration = 0.0
+        if self.motion_model is not None:
+            if joint_move:
+                duration, _ = self.motion_model.joint_time(
+                    self.joints[:nj], vals, min(velocity, 100), acceleration
+                )
+            else:
+                lin_v = self.motion_model.limits.linear_velocity
+                speed = velocity if linear else min(velocity, 100) / 100 * lin_v
+                duration, _ = self.motion_model.linear_time(
+                    self.pose, vals[:6], speed, acceleration
+                )
+            duration = float(duration) * self.time_scale
+
+        self._speed = min(velocity, 100) / 100
+        time.sleep(duration)
+        self._speed = 0.0
+        with self._lock:
+            if joint_move:
+                self.joints[:nj] = vals
+            else:
+                self.pose[:nj] = vals
+        return "0:success"
+
+    def _path_point(self, cmd):
+        fields = cmd.split(":")
+        slot = int(fields[1])
+        if not 0 <= slot < 50:
+            return "1:wrong-path-slot"
+        nj = int(fields[7])
+        vals = [decode_fixed(v) for v in fields[8 : 8 + nj]]
+        with self._lock:
+            self.path_targets[slot] = (
+                fields[6] == "J",
+                vals,
+                int(fields[2]),
+                int(fields[3]),
+                fields[5] == "1",
+            )
+        return "0:success"
+
+    def _path_sig(self, cmd):
+        self.registers[84] = int(cmd.split(":")[1])
+        return "0:success"
+
+    def _path_run(self, cmd):
+        _, slot, count, sig = cmd.split(":")
+        slot, count = int(slot), int(count)
+        if slot < 0 or count < 1 or slot + count > 50:
+            return "1:wrong-path-slot"
+        if int(sig) != self.registers[84]:
+            return "1:path-changed"
+        self.registers[85], self.registers[86] = 0, count
+        for k in range(count):
+            self._do_move(*self.path_targets[slot + k])
+            self.registers[85] = k + 1
+        return f"0:{count}"
+
+    def _path_stat(self, cmd):
+        return f"0:{self.registers[85]},{self.registers[86]}"
+
+    def _set_rdo(self, cmd):
+        _, num, val = cmd.split(":")
+        if val not in ("true", "false"):
+            return "1:wrong-rdo-value"
+        self.set_io("RDO", int(num), val == "true")
+        return "0:success"
+
+    def _get_rdo(self, cmd):
+        return f"0:{int(self.get_io('RDO', int(cmd.split(':')[1])))}"
+
+    def _set_dout(self, cmd):
+        _, num, val = cmd.split(":")
+        if val not in ("true", "false"):
+            return "1:wrong-dout-value"
+        self.set_io("DOUT", int(num), val == "true")
+        return "0:success"
+
+    def _get_dout(self, cmd):
+        return f"0:{int(self.get_io('DOUT', int(cmd.split(':')[1])))}"
+
+    def _set_sys_var(self, cmd):
+        _, name, val = cmd.split(":")
+        if val not in ("T", "F"):
+            return "1:wrong-sys_var-value"
+        with self._lock:
+            self.sys_vars[name] = val == "T"
+        return "0:success"
+
+    def _read_signals(self, signals):
+        """Values of (code, number) signals, None for a wrong type."""
+        if any(code not in IO_CODES for code, _ in signals):
+            return None
+        return [self.get_io(IO_CODES[code], num) for code, num in signals]
+
+    def _write_signals(self, signals, vals):
+        if any(code not in ("R", "D") for code, _ in signals):
+            return "1:wrong-io-type"
+        for (code, num), val in zip(signals, vals):
+            self.set_io(IO_CODES[code], num, val)
+        return "0:success"
+
+    def _read_bits(self, cmd):
+        _, code, start, count = cmd.split(":")
+        count = int(count)
+        if not 1 <= count <= 128:
+            return "1:wrong-signal-count"
+        vals = self._read_signals([(code, int(start) + k) for k in range(count)])
+        if vals is None:
+            return "1:wrong-io-type"
+        return f"0:{encode_bits(vals)}"
+
+    def _write_bits(self, cmd):
+        _, code, start, count, bits = cmd.split(":")
+        count = int(count)
+        if not 1 <= count <= 128:
+            return "1:wrong-signal-count"
+        signals = [(code, int(start) + k) for k in range(count)]
+        return self._write_signals(signals, decode_bits(bits, count))
+
+    def _read_list(self, cmd):
+        _, count, *specs = cmd.split(":")
+        if not 1 <= int(count) <= 32:
+            return "1:wrong-signal-count"
+        vals = self._read_signals([(s[0], int(s[1:])) for s in specs])
+        if vals is None:
+            return "1:wrong-io-type"
+        return f"0:{encode_bits(vals)}"
+
+    def _write_list(self, cmd):
+        _, count, bits, *specs = cmd.split(":")
+        count = int(count)
+        if not 1 <= count <= 32:
+            return "1:wrong-signal-count"
+        signals = [(s[0], int(s[1:])) for s in specs]
+        return self._write_signals(signals, decode_bits(bits, count))
+
+    def _get_state(self, cmd):
+        specs = cmd.split(":")[2:]
+        if len(specs) > 32:
+            return "1:too-many-signals"
+        vals = self._read_signals([(s[0], int(s[1:])) for s in specs])
+        if vals is None:
+            return "1:wrong-io-type"
+        bits = "".join(str(int(v)) for v in vals)
+        with self._lock:
+            pose, joints = list(self.pose), list(self.joints)
+        return (
+            "0:"
+            + ",".join(f"{v:8.3f}" for v in pose)
+            + ";"
+            + ",".join(f"{v:8.3f}" for v in joints)
+            + f";{self._ins_pwr():6.6f};{bits}"
+        )
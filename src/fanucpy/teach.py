@@ -0,0 +1,256 @@
+"""Teach-by-demonstration path recording and simplification."""
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+
+from fanucpy.motion import Move
+from fanucpy.transformations import quat_slerp, xyzrpw_to_pq
+
+
+def _deviations(pos, quat, s, e, idx):
+    """Position (mm) and orientation (deg) deviation of samples idx from
+    the straight segments s -> e with interpolated orientation."""
+    a, b, p = pos[s], pos[e], pos[idx]
+    ab = b - a
+    length2 = np.sum(ab * ab, axis=1)
+    # pure rotations are parametrized by sample index
+    t_idx = (idx - s) / (e - s)
+    t = np.where(
+        length2 > 1e-12,
+        np.clip(np.sum((p - a) * ab, axis=1) / np.maximum(length2, 1e-12), 0.0, 1.0),
+        t_idx,
+    )
+    d_pos = np.linalg.norm(a + t[:, None] * ab - p, axis=1)
+    q = quat_slerp(quat[s], quat[e], t)
+    dot = np.abs(np.sum(q * quat[idx], axis=1))
+    d_rot = np.degrees(2.0 * np.arccos(np.clip(dot, -1.0, 1.0)))
+    return d_pos, d_rot
+
+
+def simplify_path(poses, pos_tol: float = 1.0, rot_tol: float = 1.0) -> np.ndarray:
+    """Ramer-Douglas-Peucker simplification of XYZWPR poses.
+
+    All segments of a recursion level are processed in one vectorized
+    pass. A sample is kept if it deviates from the segment between kept
+    neighbours by more than pos_tol in position or rot_tol in
+    orientation.
+
+    Args:
+        poses: (N, 6) poses in mm and degrees.
+        pos_tol (float): Position tolerance in mm.
+        rot_tol (float): Orientation tolerance in degrees.
+
+    Returns:
+        np.ndarray: Sorted indices of kept poses.
+    """
+    poses = np.asarray(poses, dtype=np.float64)
+    n = len(poses)
+    if n <= 2:
+        return np.arange(n)
+    pos, quat = xyzrpw_to_pq(poses)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    starts, ends = np.array([0]), np.array([n - 1])
+    while len(starts):
+        lengths = ends - starts - 1
+        ok = lengths > 0
+        starts, ends, lengths = starts[ok], ends[ok], lengths[ok]
+        if not len(starts):
+            break
+        seg = np.repeat(np.arange(len(starts)), lengths)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        idx = starts[seg] + 1 + np.arange(len(seg)) - offsets[seg]
+
+        d_pos, d_rot = _deviations(pos, quat, starts[seg], ends[seg], idx)
+        err = np.maximum(d_pos / pos_tol, d_rot / rot_tol)
+        seg_max = np.maximum.reduceat(err, offsets)
+        split = seg_max > 1.0
+        # first sample with the maximum error of every split segment
+        hits = np.flatnonzero((err == seg_max[seg]) & split[seg])
+        _, first = np.unique(seg[hits], return_index=True)
+        mid = idx[hits[first]]
+        keep[mid] = True
+
+        s, e = starts[split], ends[split]
+        starts = np.concatenate([s, mid])
+        ends = np.concatenate([mid, e])
+    return np.flatnonzero(keep)
+
+
+def suggest_cnt(
+    poses,
+    stops=None,
+    max_cnt: int = 100,
+    blend_length: float = 50.0,
+) -> np.ndarray:
+    """Suggests CNT values for waypoints.
+
+    Smooth direction changes between long segments get high CNT values,
+    sharp corners, short segments, stops and the last waypoint get low
+    ones.
+
+    Args:
+        poses: (M, 6) waypoints.
+        stops (np.ndarray, optional): (M,) True where the robot should
+            stop, e.g. where the demonstration paused.
+        max_cnt (int): Maximum CNT value.
+        blend_length (float): Segment length in mm from which full
+            blending is allowed.
+
+    Returns:
+        np.ndarray: (M,) CNT values.
+    """
+    pos = np.asarray(poses, dtype=np.float64)[:, :3]
+    m = len(pos)
+    cnt = np.zeros(m, dtype=np.int64)
+    if m < 3:
+        return cnt
+    d_in = pos[1:-1] - pos[:-2]
+    d_out = pos[2:] - pos[1:-1]
+    l_in = np.linalg.norm(d_in, axis=1)
+    l_out = np.linalg.norm(d_out, axis=1)
+    cos = np.sum(d_in * d_out, axis=1) / np.maximum(l_in * l_out, 1e-12)
+    smooth = np.where((l_in > 1e-9) & (l_out > 1e-9), (1.0 + cos) / 2.0, 0.0)
+    room = np.clip(np.minimum(l_in, l_out) / blend_length, 0.0, 1.0)
+    cnt[1:-1] = np.round(max_cnt * smooth * room)
+    if stops is not None:
+        cnt[np.asarray(stops, dtype=bool)] = 0
+    return cnt
+
+
+class PathRecorder:
+    """Records poses and joints while a path is taught.
+
+    Samples are read with one getstate command each. Use a separate
+    connection, e.g. the logger port, if other commands are sent while
+    recording.
+    """
+
+    def __init__(self, robot, rate: float = 50.0):
+        """
+        Args:
+            robot (Robot): Connected robot.
+            rate (float): Sampling rate in Hz.
+        """
+        self.robot = robot
+        self.period = 1.0 / rate
+        self.times: list[float] = []
+        self.poses: list[list[float]] = []
+        self.joints: list[list[float]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        """Records one sample."""
+        state = self.robot.get_state(io=[])
+        self.times.append(time.perf_counter())
+        self.poses.append(state.pose)
+        self.joints.append(state.joints)
+
+    def _run(self):
+        t_next = time.perf_counter()
+        while not self._stop.is_set():
+            self.sample()
+            t_next += self.period
+            self._stop.wait(max(0.0, t_next - time.perf_counter()))
+
+    def start(self) -> PathRecorder:
+        self.times, self.poses, self.joints = [], [], []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def waypoints(
+        self,
+        pos_tol: float = 1.0,
+        rot_tol: float = 1.0,
+        velocity: float | None = None,
+        acceleration: int = 100,
+        stop_speed: float = 2.0,
+        stop_time: float = 0.5,
+        max_cnt: int = 100,
+        blend_length: float = 50.0,
+    ) -> list[Move]:
+        """Simplifies the recording into linear moves.
+
+        Args:
+            pos_tol (float): Position tolerance in mm.
+            rot_tol (float): Orientation tolerance in degrees.
+            velocity (float, optional): TCP speed in mm/s. Defaults to
+                the taught speed of each segment.
+            acceleration (int): Acceleration in percent.
+            stop_speed (float): Speed in mm/s below which the
+                demonstration counts as paused.
+            stop_time (float): Minimum pause in seconds that is kept as
+                a stop with CNT 0.
+            max_cnt (int): Maximum suggested CNT value.
+            blend_length (float): See suggest_cnt.
+
+        Returns:
+            list[Move]: Waypoints as linear pose moves.
+        """
+        poses = np.asarray(self.poses, dtype=np.float64)
+        times = np.asarray(self.times, dtype=np.float64)
+        if not len(poses):
+            return []
+
+        # pauses are split points that must be kept
+        step = np.linalg.norm(np.diff(poses[:, :3], axis=0), axis=1)
+        dt = np.maximum(np.diff(times), 1e-9)
+        still = np.concatenate([[True], step / dt < stop_speed])
+        paused = np.zeros(len(poses), dtype=bool)
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], still.astype(int), [0]])))
+        for lo, hi in zip(edges[::2], edges[1::2]):
+            if times[hi - 1] - times[lo] >= stop_time:
+                paused[hi - 1] = True
+
+        keep = np.union1d(np.flatnonzero(paused), [0, len(poses) - 1]).astype(np.int64)
+        idx = [keep[:1]]
+        for lo, hi in zip(keep[:-1], keep[1:]):
+            idx.append(lo + simplify_path(poses[lo : hi + 1], pos_tol, rot_tol)[1:])
+        idx = np.concatenate(idx)
+
+        stops = paused[idx]
+        stops[-1] = True
+        cnt = suggest_cnt(poses[idx], stops, max_cnt, blend_length)
+
+        if velocity is None:
+            # taught speed without pauses, first move at the speed of the second
+            path = np.concatenate([[0.0], np.cumsum(step)])
+            moving = np.concatenate([[0.0], np.cumsum(np.where(still[1:], 0.0, dt))])
+            seg_time = np.diff(moving[idx])
+            seg_time = np.where(seg_time > 0, seg_time, np.diff(times[idx]))
+            speeds = np.diff(path[idx]) / np.maximum(seg_time, 1e-9)
+            speeds = np.concatenate([speeds[:1], speeds]) if len(speeds) else np.ones(1)
+        else:
+            speeds = np.full(len(idx), velocity)
+        speeds = np.clip(np.round(speeds), 1, 9999).astype(int)
+
+        return [
+            Move(
+                move_type="pose",
+                vals=poses[i].tolist(),
+                velocity=int(v),
+                acceleration=acceleration,
+                cnt_val=int(c),
+                linear=True,
+            )
+            for i, v, c in zip(idx, speeds, cnt)
+        ]
@@ -5,11 +5,14 @@ Some of the transformations are based on the following sources:
     - https://automaticaddison.com/how-to-convert-a-quaternion-into-euler-angles-in-python/
 """
 import numpy as np
-from scipy.spatial.transform import Rotation
 
 import math
 from collections import namedtuple
 
+from fanucpy._lazy import LazyImport
+
+Rotation = LazyImport("scipy.spatial.transform", "Rotation")
+
 
 WPR = namedtuple("WPR", ["W", "P", "R"])
 WrPrRr = namedtuple("WrPrRr", ["Wr", "Pr", "Rr"])
@@ -148,3 +151,302 @@ def Quaternion_to_WPR(quat: Quaternion) -> WPR:
         WPR: WPR angles in degrees
     """
     return WrPrRr_to_WPR(Quaternion_to_WrPrRr(quat))
+
+
+def xyzrpw_to_pq(xyzrpw):
+    """Converts (N, 6) XYZWPR poses to (N, 3) positions and (N, 4)
+    quaternions (x, y, z, w)."""
+    xyzrpw = np.asarray(xyzrpw, dtype=np.float64).reshape(-1, 6)
+    quat = Rotation.from_euler("xyz", xyzrpw[:, 3:], degrees=True).as_quat()
+    return xyzrpw[:, :3].copy(), quat
+
+
+def pq_to_xyzrpw(p, q):
+    """Converts (N, 3) positions and (N, 4) quaternions to (N, 6) XYZWPR
+    poses."""
+    wpr = Rotation.from_quat(np.asarray(q, dtype=np.float64)).as_euler(
+        "xyz", degrees=True
+    )
+    return np.hstack(
+        [np.asarray(p, dtype=np.float64).reshape(-1, 3), wpr.reshape(-1, 3)]
+    )
+
+
+def _qmul(a, b):
+    ax, ay, az, aw = np.moveaxis(a, -1, 0)
+    bx, by, bz, bw = np.moveaxis(b, -1, 0)
+    return np.stack(
+        [
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+            aw * bw - ax * bx - ay * by - az * bz,
+        ],
+        axis=-1,
+    )
+
+
+def _qconj(q):
+    return q * np.array([-1.0, -1.0, -1.0, 1.0])
+
+
+def _qlog(q):
+    """Logarithm of unit quaternions as (..., 3) vectors."""
+    v = q[..., :3]
+    n = np.linalg.norm(v, axis=-1, keepdims=True)
+    angle = np.arctan2(n, q[..., 3:])
+    return v * np.where(n > 1e-12, angle / np.maximum(n, 1e-12), 1.0)
+
+
+def _qexp(v):
+    """Exponential of (..., 3) vectors as unit quaternions."""
+    th = np.linalg.norm(v, axis=-1, keepdims=True)
+    sinc = np.where(th > 1e-12, np.sin(th) / np.maximum(th, 1e-12), 1.0)
+    return np.concatenate([v * sinc, np.cos(th)], axis=-1)
+
+
+def quat_continuous(q):
+    """Flips signs of (N, 4) quaternions so that consecutive ones lie in
+    the same hemisphere."""
+    q = np.array(q, dtype=np.float64)
+    if len(q) > 1:
+        dots = np.sum(q[1:] * q[:-1], axis=-1)
+        signs = np.cumprod(np.where(dots < 0, -1.0, 1.0))
+        q[1:] *= signs[:, None]
+    return q
+
+
+def _slerp(q0, q1, t):
+    """SLERP along the arc given by the quaternion signs."""
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin = np.sin(theta)
+    small = sin < 1e-6
+    safe = np.where(small, 1.0, sin)
+    w0 = np.where(small, 1.0 - t, np.sin((1.0 - t) * theta) / safe)
+    w1 = np.where(small, t, np.sin(t * theta) / safe)
+    q = w0 * q0 + w1 * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def quat_slerp(q0, q1, t):
+    """Spherical linear interpolation of quaternions (x, y, z, w).
+
+    Args:
+        q0, q1: (..., 4) quaternions, broadcast against t.
+        t: (...) interpolation parameters in [0, 1].
+
+    Returns:
+        np.ndarray: (..., 4) unit quaternions along the shortest arc.
+    """
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    return _slerp(q0, np.where(dot < 0, -q1, q1), t)
+
+
+def quat_squad(keys, u):
+    """Spherical quadrangle interpolation through key quaternions.
+
+    Unlike piecewise SLERP, the angular velocity is continuous at the
+    keys.
+
+    Args:
+        keys: (K, 4) key quaternions.
+        u: (N,) parameters in [0, K - 1], integer part selects the
+            segment.
+
+    Returns:
+        np.ndarray: (N, 4) unit quaternions.
+    """
+    q = quat_continuous(keys)
+    k = len(q)
+    u = np.clip(np.asarray(u, dtype=np.float64), 0, k - 1)
+    if k == 1:
+        return np.broadcast_to(q[0], u.shape + (4,)).copy()
+
+    # inner control points, ends are their own control points
+    prev = q[np.maximum(np.arange(k) - 1, 0)]
+    nxt = q[np.minimum(np.arange(k) + 1, k - 1)]
+    inv = _qconj(q)
+    s = _qmul(q, _qexp(-(_qlog(_qmul(inv, nxt)) + _qlog(_qmul(inv, prev))) / 4.0))
+
+    i = np.minimum(np.floor(u).astype(np.int64), k - 2)
+    h = u - i
+    outer = quat_slerp(q[i], q[i + 1], h)
+    # no shortest arc flips, they jump where outer and inner diverge
+    inner = _slerp(s[i], s[i + 1], h)
+    return _slerp(outer, inner, 2.0 * h * (1.0 - h))
+
+
+def interpolate_poses(poses, u, orientation: str = "slerp"):
+    """Samples the path through XYZWPR waypoints.
+
+    Positions are interpolated linearly between waypoints, orientations
+    with SLERP or SQUAD.
+
+    Args:
+        poses: (M, 6) waypoints.
+        u: (N,) parameters in [0, M - 1], integer part selects the
+            segment.
+        orientation (str): "slerp" or "squad".
+
+    Returns:
+        np.ndarray: (N, 6) poses.
+    """
+    p, q = xyzrpw_to_pq(poses)
+    m = len(p)
+    u = np.clip(np.asarray(u, dtype=np.float64), 0, m - 1)
+    i = np.minimum(np.floor(u).astype(np.int64), max(m - 2, 0))
+    j = np.minimum(i + 1, m - 1)
+    h = (u - i)[:, None]
+    pos = (1.0 - h) * p[i] + h * p[j]
+    if orientation == "slerp":
+        quat = quat_slerp(q[i], q[j], h[:, 0])
+    elif orientation == "squad":
+        quat = quat_squad(q, u)
+    else:
+        raise ValueError(f"Unknown orientation interpolation: {orientation}")
+    return pq_to_xyzrpw(pos, quat)
+
+
+def linear_path(start, end, n: int):
+    """n poses from start to end with SLERP orientation."""
+    return interpolate_poses([start, end], np.linspace(0.0, 1.0, n))
+
+
+def path_length(poses, rot_weight: float = 0.0):
+    """Cumulative length of a path of XYZWPR poses.
+
+    Args:
+        poses: (M, 6) poses.
+        rot_weight (float): mm per degree of rotation added to the
+            length, so that pure reorientations are resampled too.
+
+    Returns:
+        np.ndarray: (M,) cumulative length starting at 0.
+    """
+    p, q = xyzrpw_to_pq(poses)
+    step = np.linalg.norm(np.diff(p, axis=0), axis=1)
+    if rot_weight:
+        dot = np.abs(np.sum(q[1:] * q[:-1], axis=1))
+        step = step + rot_weight * np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    return np.concatenate([[0.0], np.cumsum(step)])
+
+
+def resample_path(
+    poses, spacing: float, orientation: str = "slerp", rot_weight: float = 0.0
+):
+    """Reparameterizes a path by arc length.
+
+    Densifies sparse waypoints or evens out dense recordings.
+
+    Args:
+        poses: (M, 6) poses.
+        spacing (float): Distance between samples in mm.
+        orientation (str): "slerp" or "squad".
+        rot_weight (float): See path_length.
+
+    Returns:
+        np.ndarray: (N, 6) poses at equal spacing, ending at the last
+            pose.
+    """
+    s = path_length(poses, rot_weight)
+    keep = np.concatenate([[True], np.diff(s) > 0])
+    poses = np.asarray(poses, dtype=np.float64)[keep]
+    s = s[keep]
+    if len(s) < 2:
+        return poses[:1].copy()
+    s_new = np.append(np.arange(0.0, s[-1], spacing), s[-1])
+    u = np.interp(s_new, s, np.arange(len(s), dtype=np.float64))
+    return interpolate_poses(poses, u, orientation)
+
+
+def arc_path(start, via, end, n: int | None = None, spacing: float | None = None):
+    """Circular arc from start through via to end.
+
+    Orientation is interpolated with SQUAD through the three poses.
+
+    Args:
+        start, via, end: XYZWPR poses on the arc.
+        n (int, optional): Number of poses.
+        spacing (float, optional): Distance between poses in mm, used
+            if n is None.
+
+    Returns:
+        np.ndarray: (N, 6) poses.
+    """
+    keys = np.asarray([start, via, end], dtype=np.float64)
+    p1, p2, p3 = keys[:, :3]
+    a, b = p1 - p3, p2 - p3
+    axb = np.cross(a, b)
+    if np.dot(axb, axb) < 1e-12:
+        raise ValueError("Arc points are collinear.")
+    center = p3 + np.cross(np.dot(a, a) * b - np.dot(b, b) * a, axb) / (
+        2.0 * np.dot(axb, axb)
+    )
+    normal = np.cross(p2 - p1, p3 - p2)
+    normal /= np.linalg.norm(normal)
+    radius = np.linalg.norm(p1 - center)
+    e1 = (p1 - center) / radius
+    e2 = np.cross(normal, e1)
+
+    angles = np.mod(
+        np.arctan2((keys[:, :3] - center) @ e2, (keys[:, :3] - center) @ e1), 2 * np.pi
+    )
+    theta_via, theta_end = angles[1], angles[2]
+    if n is None:
+        if spacing is None:
+            raise ValueError("Either n or spacing is required.")
+        n = int(np.ceil(radius * theta_end / spacing)) + 1
+    theta = np.linspace(0.0, theta_end, n)
+    pos = center + radius * (np.cos(theta)[:, None] * e1 + np.sin(theta)[:, None] * e2)
+    u = np.interp(theta, [0.0, theta_via, theta_end], [0.0, 1.0, 2.0])
+    _, q = xyzrpw_to_pq(keys)
+    return pq_to_xyzrpw(pos, quat_squad(q, u))
+
+
+def circle_path(
+    center,
+    radius: float,
+    n: int,
+    normal=(0.0, 0.0, 1.0),
+    wpr=(180.0, 0.0, 0.0),
+    start_angle: float = 0.0,
+    turns: float = 1.0,
+    pitch: float = 0.0,
+):
+    """Circle, or helix with pitch, at constant orientation.
+
+    Args:
+        center: (3,) center in mm.
+        radius (float): Radius in mm.
+        n (int): Number of poses.
+        normal: (3,) circle axis, positive turning direction.
+        wpr: (3,) tool orientation in degrees.
+        start_angle (float): Start angle in degrees.
+        turns (float): Number of turns.
+        pitch (float): Advance along normal per turn in mm.
+
+    Returns:
+        np.ndarray: (n, 6) poses.
+    """
+    center = np.asarray(center, dtype=np.float64)
+    normal = np.asarray(normal, dtype=np.float64)
+    normal = normal / np.linalg.norm(normal)
+    # any axis not parallel to normal spans the plane
+    helper = np.eye(3)[np.argmin(np.abs(normal))]
+    e1 = helper - np.dot(helper, normal) * normal
+    e1 /= np.linalg.norm(e1)
+    e2 = np.cross(normal, e1)
+
+    theta = np.radians(start_angle) + np.linspace(0.0, 2 * np.pi * turns, n)
+    pos = (
+        center
+        + radius * (np.cos(theta)[:, None] * e1 + np.sin(theta)[:, None] * e2)
+        + (pitch * (theta - theta[0]) / (2 * np.pi))[:, None] * normal
+    )
+    return np.hstack([pos, np.broadcast_to(np.asarray(wpr, dtype=np.float64), (n, 3))])
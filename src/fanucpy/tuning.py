@@ -0,0 +1,321 @@
+"""Parameter search for tunable robot app parameters."""
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fanucpy.engine import AppEngine
+
+TuningResult = namedtuple("TuningResult", ["best", "trials", "pareto"])
+
+
+class PowerSampler:
+    """Integrates instantaneous power of a robot in a background thread.
+
+    Use a separate connection, e.g. the logger port, so that sampling
+    does not interleave with the commands of the running app. A failed
+    power reading stops sampling and is raised on exit, as the energy
+    would be incomplete.
+    """
+
+    def __init__(self, robot, rate: float = 20.0):
+        self.robot = robot
+        self.period = 1.0 / rate
+        self.energy = 0.0
+        self.error: Exception | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self):
+        try:
+            t_prev, p_prev = time.perf_counter(), self.robot.get_ins_power()
+            while not self._stop.wait(self.period):
+                t, p = time.perf_counter(), self.robot.get_ins_power()
+                self.energy += 0.5 * (p + p_prev) * (t - t_prev)
+                t_prev, p_prev = t, p
+        except Exception as exc:
+            self.error = exc
+
+    def __enter__(self):
+        self.energy = 0.0
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        if self.error is not None and exc_type is None:
+            raise self.error
+
+
+def pareto_front(points) -> np.ndarray:
+    """Returns indices of non-dominated rows of (N, M) costs."""
+    pts = np.asarray(points, dtype=np.float64)
+    if pts.ndim == 1:
+        pts = pts[:, None]
+    # i is dominated if some j is <= in all and < in one objective
+    le = np.all(pts[:, None, :] <= pts[None, :, :], axis=2)
+    lt = np.any(pts[:, None, :] < pts[None, :, :], axis=2)
+    dominated = np.any(le & lt, axis=0)
+    return np.flatnonzero(~dominated)
+
+
+class ParameterSpace:
+    """Search space of app parameters.
+
+    Each parameter is either a list of choices or a (low, high) tuple.
+    Integer bounds give an integer range, e.g. velocity=(10, 100).
+    """
+
+    def __init__(self, space: dict):
+        self.space = space
+        self.names = list(space)
+
+    def _is_range(self, name):
+        return isinstance(self.space[name], tuple)
+
+    def encode(self, params: dict) -> np.ndarray:
+        """Maps parameters to the unit cube."""
+        x = np.empty(len(self.names))
+        for i, name in enumerate(self.names):
+            spec = self.space[name]
+            if self._is_range(name):
+                lo, hi = spec
+                x[i] = (params[name] - lo) / max(hi - lo, 1e-12)
+            else:
+                x[i] = spec.index(params[name]) / max(len(spec) - 1, 1)
+        return x
+
+    def decode(self, x) -> dict:
+        """Maps unit cube points to parameters."""
+        params = {}
+        for xi, name in zip(x, self.names):
+            spec = self.space[name]
+            if self._is_range(name):
+                lo, hi = spec
+                val = lo + float(xi) * (hi - lo)
+                if isinstance(lo, int) and isinstance(hi, int):
+                    val = int(round(val))
+                params[name] = val
+            else:
+                params[name] = spec[int(round(float(xi) * (len(spec) - 1)))]
+        return params
+
+    def grid(self, n_points: int = 5) -> list[dict]:
+        axes = []
+        for name in self.names:
+            spec = self.space[name]
+            if self._is_range(name):
+                vals = np.linspace(*spec, n_points)
+                if all(isinstance(v, int) for v in spec):
+                    vals = np.unique(np.round(vals).astype(int))
+                axes.append([v.item() for v in vals])
+            else:
+                axes.append(list(spec))
+        return [dict(zip(self.names, vals)) for vals in itertools.product(*axes)]
+
+    def sample(self, n: int, rng) -> list[dict]:
+        return [self.decode(x) for x in rng.uniform(size=(n, len(self.names)))]
+
+
+def _gp_posterior(X, y, Xq, length_scale=0.3, noise=1e-6):
+    """Gaussian process posterior mean and std with an RBF kernel."""
+
+    def kernel(A, B):
+        d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d2 / length_scale**2)
+
+    mu, sigma = y.mean(), y.std() + 1e-12
+    yn = (y - mu) / sigma
+    K = kernel(X, X) + noise * np.eye(len(X))
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, yn))
+    Kq = kernel(Xq, X)
+    mean = Kq @ alpha
+    v = np.linalg.solve(L, Kq.T)
+    var = np.clip(1.0 - (v**2).sum(axis=0), 1e-12, None)
+    return mu + sigma * mean, sigma * np.sqrt(var)
+
+
+class ParameterTuner:
+    """Searches tunable app parameters for short cycles and low energy.
+
+    Candidates are evaluated in parallel, one worker per robot of the
+    pool, e.g. several simulated controllers. With a single real robot
+    the evaluation is serial.
+    """
+
+    def __init__(
+        self,
+        app_factory,
+        robots: list,
+        space: dict,
+        objective: str | dict = "cycle_time",
+        params_key: str = "tunable_params",
+        n_cycles: int = 1,
+        power_robots: list | None = None,
+        power_rate: float = 20.0,
+        **run_kwargs,
+    ):
+        """
+        Args:
+            app_factory (callable): Creates a RobotApp for a robot.
+            robots (list[Robot]): Pool of robots.
+            space (dict): Parameter space, see ParameterSpace.
+            objective (str or dict): "cycle_time", "energy" or weights,
+                e.g. {"cycle_time": 1.0, "energy": 0.001}.
+            params_key (str): Keyword of app.run receiving candidate
+                parameters. Defaults to "tunable_params".
+            n_cycles (int): Cycles per evaluation. Defaults to 1.
+            power_robots (list[Robot], optional): Connections used to
+                sample power, one per robot. Required for energy.
+            power_rate (float): Power sampling rate in Hz.
+            run_kwargs: Fixed arguments of app.run, e.g. static_params.
+        """
+        self.app_factory = app_factory
+        self.robots = robots
+        self.space = ParameterSpace(space)
+        self.weights = {objective: 1.0} if isinstance(objective, str) else objective
+        if "energy" in self.weights and power_robots is None:
+            raise ValueError("Energy objective requires power_robots.")
+        self.params_key = params_key
+        self.n_cycles = n_cycles
+        self.power_robots = power_robots
+        self.power_rate = power_rate
+        self.run_kwargs = run_kwargs
+        self.trials: list[dict] = []
+
+    def _evaluate(self, worker: int, params: dict) -> dict:
+        robot = self.robots[worker]
+        app = self.app_factory(robot)
+        engine = AppEngine(app, robot=robot)
+        kwargs = dict(self.run_kwargs, **{self.params_key: params})
+
+        energy = None
+        if self.power_robots is not None:
+            with PowerSampler(self.power_robots[worker], self.power_rate) as sampler:
+                report = engine.run(n_cycles=self.n_cycles, **kwargs)
+            energy = sampler.energy / max(report.n_cycles, 1)
+        else:
+            report = engine.run(n_cycles=self.n_cycles, **kwargs)
+
+        trial = {
+            "params": params,
+            "cycle_time": float(np.median(report.cycle_times)),
+            "energy": energy,
+            "report": report,
+        }
+        if report.errors:
+            trial["score"] = np.inf
+        else:
+            trial["score"] = sum(w * trial[k] for k, w in self.weights.items())
+        return trial
+
+    def evaluate(self, candidates: list[dict]) -> list[dict]:
+        """Evaluates candidates on the robot pool and adds them to
+        trials."""
+        workers = queue.Queue()
+        for i in range(len(self.robots)):
+            workers.put(i)
+
+        def job(params):
+            worker = workers.get()
+            try:
+                return self._evaluate(worker, params)
+            finally:
+                workers.put(worker)
+
+        with ThreadPoolExecutor(max_workers=len(self.robots)) as pool:
+            trials = list(pool.map(job, candidates))
+        self.trials.extend(trials)
+        return trials
+
+    def _propose(self, trials, n, rng, n_candidates=1000, kappa=2.0):
+        """Proposes n candidates by GP lower confidence bound."""
+        done = [t for t in trials if np.isfinite(t["score"])]
+        X = np.array([self.space.encode(t["params"]) for t in done])
+        y = np.array([t["score"] for t in done])
+        Xq = rng.uniform(size=(n_candidates, len(self.space.names)))
+
+        proposals = []
+        for _ in range(n):
+            mean, std = _gp_posterior(X, y, Xq)
+            k = int(np.argmin(mean - kappa * std))
+            proposals.append(self.space.decode(Xq[k]))
+            # kriging believer: pretend the prediction was observed
+            X = np.vstack([X, Xq[k]])
+            y = np.append(y, mean[k])
+            Xq = np.delete(Xq, k, axis=0)
+        return proposals
+
+    def search(
+        self,
+        strategy: str = "random",
+        n_trials: int = 20,
+        grid_points: int = 5,
+        n_init: int | None = None,
+        seed: int | None = None,
+    ) -> TuningResult:
+        """Runs the search.
+
+        Args:
+            strategy (str): "grid", "random" or "bayes".
+            n_trials (int): Number of evaluations for random and bayes.
+            grid_points (int): Points per range for grid search.
+            n_init (int, optional): Random evaluations before bayes
+                proposals. Defaults to max(5, pool size).
+            seed (int, optional): Random seed.
+
+        Returns:
+            TuningResult: Best trial, the trials of this search and the
+                Pareto front of cycle time and energy. best is None if
+                every trial failed.
+        """
+        rng = np.random.default_rng(seed)
+        trials: list[dict] = []
+        if strategy == "grid":
+            trials += self.evaluate(self.space.grid(grid_points))
+        elif strategy == "random":
+            trials += self.evaluate(self.space.sample(n_trials, rng))
+        elif strategy == "bayes":
+            n_init = min(n_init or max(5, len(self.robots)), n_trials)
+            trials += self.evaluate(self.space.sample(n_init, rng))
+            while len(trials) < n_trials:
+                n = min(len(self.robots), n_trials - len(trials))
+                if not any(np.isfinite(t["score"]) for t in trials):
+                    trials += self.evaluate(self.space.sample(n, rng))
+                else:
+                    trials += self.evaluate(self._propose(trials, n, rng))
+        else:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        ok = [t for t in trials if np.isfinite(t["score"])]
+        return TuningResult(
+            best=min(ok, key=lambda t: t["score"]) if ok else None,
+            trials=trials,
+            pareto=self.pareto(trials),
+        )
+
+    def pareto(self, trials: list[dict] | None = None) -> list[dict]:
+        """Pareto front of successful trials over cycle time and energy.
+
+        Args:
+            trials (list[dict], optional): Trials to consider. Defaults
+                to all trials of the tuner.
+        """
+        trials = self.trials if trials is None else trials
+        ok = [t for t in trials if np.isfinite(t["score"])]
+        if not ok:
+            return []
+        keys = ["cycle_time"] + (["energy"] if self.power_robots else [])
+        front = pareto_front([[t[k] for k in keys] for t in ok])
+        return sorted((ok[i] for i in front), key=lambda t: t["cycle_time"])
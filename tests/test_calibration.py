@@ -0,0 +1,410 @@
+import json
+import os
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from fanucpy.calibration import (
+    CALIB_MANIFEST,
+    CALIB_SCHEMA_VERSION,
+    CalibData,
+    Camera,
+    CheckerboardTracker,
+    calibrate_camera_pruned,
+    calibrate_eye_hand_robust,
+    checkerboard_geometry,
+    convert_pickle_calib_data,
+    corner_coverage,
+    draw_coverage,
+    load_calib_data,
+    project_points,
+    read_calib_manifest,
+    reprojection_errors,
+    save_calib_data,
+)
+
+
+@pytest.fixture
+def calib_data():
+    rng = np.random.default_rng(0)
+    R = Rotation.random(4, random_state=1).as_matrix()
+    t = rng.normal(size=(4, 3))
+    return {
+        "camera_matrix": np.array([[800.0, 0, 320], [0, 800, 240], [0, 0, 1]]),
+        "dist_coeffs": rng.normal(scale=0.01, size=(1, 5)),
+        "rmse": 0.25,
+        "image_size": [640, 480],
+        "H_cam2base": np.eye(4),
+        "robot_ee_poses": rng.normal(size=(4, 6)),
+        "target_poses": [(R[i], t[i].reshape(3, 1)) for i in range(4)],
+        "marker": "aruco",
+        "note": None,
+    }
+
+
+def test_round_trip(tmp_path, calib_data):
+    save_calib_data(calib_data, str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [CALIB_MANIFEST, "intrinsics", "hand_eye", "samples"]
+    )
+
+    data = load_calib_data(str(tmp_path))
+    assert isinstance(data, CalibData)
+    assert set(data) == set(calib_data)
+    assert len(data) == len(calib_data)
+    assert data["rmse"] == 0.25 and data["marker"] == "aruco"
+    assert data["note"] is None
+    for key in ("camera_matrix", "dist_coeffs", "H_cam2base", "robot_ee_poses"):
+        np.testing.assert_array_equal(data[key], calib_data[key])
+    np.testing.assert_array_equal(data["image_size"], [640, 480])
+    assert set(data.group("intrinsics")) == {
+        "camera_matrix",
+        "dist_coeffs",
+        "image_size",
+    }
+    assert set(data.group("hand_eye")) == {"H_cam2base"}
+
+
+def test_rt_pairs(tmp_path, calib_data):
+    save_calib_data(calib_data, str(tmp_path))
+    entry = read_calib_manifest(str(tmp_path))["arrays"]["target_poses"]
+    assert entry["dtype"] == "rt_pairs" and entry["shape"] == [4]
+
+    pairs = load_calib_data(str(tmp_path))["target_poses"]
+    assert len(pairs) == 4
+    for (R, t), (R_ref, t_ref) in zip(pairs, calib_data["target_poses"]):
+        np.testing.assert_allclose(R, R_ref)
+        np.testing.assert_allclose(t, t_ref.ravel())
+
+
+def test_lazy_load(tmp_path, calib_data):
+    save_calib_data(calib_data, str(tmp_path))
+    data = load_calib_data(str(tmp_path))
+    assert data._cache == {}
+
+    # reading intrinsics does not touch the samples
+    os.remove(tmp_path / "samples" / "robot_ee_poses.npy")
+    camera_matrix = data["camera_matrix"]
+    assert data["camera_matrix"] is camera_matrix
+    assert set(data._cache) == {"camera_matrix"}
+    with pytest.raises(FileNotFoundError):
+        data["robot_ee_poses"]
+
+    # samples are memory-mapped
+    assert isinstance(data["target_poses"][0][0], np.memmap)
+    assert not isinstance(camera_matrix, np.memmap)
+
+
+def test_version_mismatch(tmp_path, calib_data):
+    save_calib_data(calib_data, str(tmp_path))
+    path = tmp_path / CALIB_MANIFEST
+    manifest = json.loads(path.read_text())
+    manifest["version"] = CALIB_SCHEMA_VERSION + 1
+    path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="version"):
+        load_calib_data(str(tmp_path))
+
+
+def test_manifest_mismatch(tmp_path, calib_data):
+    save_calib_data(calib_data, str(tmp_path))
+    np.save(tmp_path / "intrinsics" / "dist_coeffs.npy", np.zeros(4))
+    np.save(tmp_path / "samples" / "target_poses_t.npy", np.zeros((3, 3)))
+    data = load_calib_data(str(tmp_path))
+    with pytest.raises(ValueError, match="dist_coeffs"):
+        data["dist_coeffs"]
+    with pytest.raises(ValueError, match="target_poses"):
+        data["target_poses"]
+    np.testing.assert_array_equal(data["camera_matrix"], calib_data["camera_matrix"])
+
+
+def test_ragged_data(tmp_path):
+    with pytest.raises(ValueError, match="ragged"):
+        save_calib_data({"corners": [np.zeros(3), np.zeros(4)]}, str(tmp_path))
+
+
+def test_convert_pickle(tmp_path, calib_data):
+    pickle_path = tmp_path / "calib.pkl"
+    with open(pickle_path, "wb") as f:
+        pickle.dump(calib_data, f)
+    convert_pickle_calib_data(str(pickle_path), str(tmp_path / "store"))
+    data = load_calib_data(str(tmp_path / "store"))
+    np.testing.assert_array_equal(data["camera_matrix"], calib_data["camera_matrix"])
+    assert len(data["target_poses"]) == 4
+
+
+def _hand_eye_samples(n, seed=0):
+    """Synthetic eye-to-hand samples of a static camera."""
+    rng = np.random.default_rng(seed)
+    H_cam2base = np.eye(4)
+    H_cam2base[:3, :3] = Rotation.from_euler(
+        "xyz", [180, 10, 90], degrees=True
+    ).as_matrix()
+    H_cam2base[:3, 3] = [800.0, 100.0, 900.0]
+    H_target2gripper = np.eye(4)
+    H_target2gripper[:3, 3] = [0.0, 0.0, 50.0]
+
+    H_g2b = np.tile(np.eye(4), (n, 1, 1))
+    H_g2b[:, :3, :3] = Rotation.from_rotvec(
+        rng.normal(scale=0.4, size=(n, 3))
+    ).as_matrix()
+    H_g2b[:, :3, 3] = [500.0, 0.0, 300.0] + rng.uniform(-150, 150, size=(n, 3))
+    H_t2c = np.linalg.inv(H_cam2base) @ H_g2b @ H_target2gripper
+    return H_cam2base, H_g2b, H_t2c
+
+
+def test_calibrate_eye_hand_robust():
+    H_cam2base, H_g2b, H_t2c = _hand_eye_samples(20)
+    outliers = [3, 11]
+    H_t2c[outliers, :3, 3] += [40.0, -30.0, 60.0]
+
+    result = calibrate_eye_hand_robust(
+        H_g2b[:, :3, :3],
+        H_g2b[:, :3, 3],
+        H_t2c[:, :3, :3],
+        H_t2c[:, :3, 3],
+        methods=["tsai", "park", "horaud"],
+        n_trials=20,
+        seed=0,
+    )
+    expected = np.ones(20, dtype=bool)
+    expected[outliers] = False
+    np.testing.assert_array_equal(result.inliers, expected)
+    np.testing.assert_allclose(result.R, H_cam2base[:3, :3], atol=1e-6)
+    np.testing.assert_allclose(result.t, H_cam2base[:3, 3], atol=1e-3)
+    assert result.method in ("tsai", "park", "horaud")
+    assert set(result.scores) == {"tsai", "park", "horaud"}
+    assert np.all(result.residuals[outliers] > 5.0)
+
+
+def test_calibrate_eye_hand_robust_too_few_samples():
+    _, H_g2b, H_t2c = _hand_eye_samples(2)
+    with pytest.raises(ValueError):
+        calibrate_eye_hand_robust(
+            H_g2b[:, :3, :3], H_g2b[:, :3, 3], H_t2c[:, :3, :3], H_t2c[:, :3, 3]
+        )
+
+
+class FakeCapture:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.released = False
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+CAMERA_MATRIX = np.array([[500.0, 0, 160], [0, 500, 120], [0, 0, 1]])
+DIST_COEFFS = np.array([-0.2, 0.05, 0.001, -0.001, 0.0])
+
+
+def _texture(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    return cv2.resize(img, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+@pytest.fixture
+def map_calls(monkeypatch):
+    calls = []
+    init_maps = cv2.initUndistortRectifyMap
+
+    def counted(*args):
+        calls.append(args[4])
+        return init_maps(*args)
+
+    monkeypatch.setattr(cv2, "initUndistortRectifyMap", counted)
+    return calls
+
+
+def test_camera_rectify(map_calls):
+    frames = [_texture(320, 240, seed) for seed in range(3)]
+    camera = Camera(CAMERA_MATRIX, DIST_COEFFS, FakeCapture(frames))
+    new_camera_matrix = camera.rect_camera_matrix((320, 240))
+    for frame in frames:
+        expected = cv2.undistort(
+            frame, CAMERA_MATRIX, DIST_COEFFS, None, new_camera_matrix
+        )
+        ret, rect = camera.read()
+        assert ret
+        assert np.abs(rect.astype(int) - expected).max() <= 1
+    assert camera.read() == (False, None)
+    assert map_calls == [(320, 240)]
+    camera.release()
+    assert camera.capture.released
+
+
+def test_camera_maps_rebuilt(map_calls):
+    camera = Camera(CAMERA_MATRIX, DIST_COEFFS)
+    small, large = _texture(320, 240), _texture(640, 480)
+    out = camera.rectify(small)
+    assert camera.rectify(small) is out
+    camera.rectify(large)
+    camera.rectify(small)
+    assert map_calls == [(320, 240), (640, 480)]
+
+    # new intrinsics drop the cached maps
+    camera.dist_coeffs = np.zeros(5)
+    expected = cv2.undistort(
+        small, CAMERA_MATRIX, np.zeros(5), None, camera.rect_camera_matrix((320, 240))
+    )
+    assert np.abs(camera.rectify(small).astype(int) - expected).max() <= 1
+    camera.camera_matrix = CAMERA_MATRIX * [[2], [2], [1]]
+    assert camera.rect_camera_matrix((320, 240))[0, 0] > 900
+    assert map_calls == [(320, 240), (640, 480), (320, 240), (320, 240)]
+
+
+def _checkerboard_frame(cols, rows, square, x0, y0, size=(640, 480)):
+    """Fronto-parallel checkerboard with its first inner corner at (x0, y0)."""
+    img = np.full((size[1], size[0]), 255, dtype=np.uint8)
+    for i in range(cols + 1):
+        for j in range(rows + 1):
+            if (i + j) % 2 == 0:
+                x = x0 + (i - 1) * square
+                y = y0 + (j - 1) * square
+                img[y : y + square, x : x + square] = 0
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+
+
+@pytest.fixture
+def search_shapes(monkeypatch):
+    shapes = []
+    find_corners = cv2.findChessboardCorners
+
+    def recorded(image, *args):
+        shapes.append(image.shape)
+        return find_corners(image, *args)
+
+    monkeypatch.setattr(cv2, "findChessboardCorners", recorded)
+    return shapes
+
+
+def test_checkerboard_tracker_roi(search_shapes):
+    cols, rows, square = 7, 5, 30
+    tracker = CheckerboardTracker(
+        CAMERA_MATRIX, np.zeros(5), cols, rows, square, draw=False
+    )
+    assert not tracker.flags & cv2.CALIB_CB_FAST_CHECK
+
+    # the first detection searches the full frame
+    R, t = tracker.find_pose(_checkerboard_frame(cols, rows, square, 200, 150))
+    assert search_shapes == [(480, 640)]
+    np.testing.assert_allclose(R, np.eye(3), atol=1e-3)
+    assert t[2] == pytest.approx(500, rel=1e-3)
+    np.testing.assert_allclose(tracker.corners[0, 0], [199.5, 149.5], atol=0.5)
+
+    # then only the region around the last corners
+    R, t = tracker.find_pose(_checkerboard_frame(cols, rows, square, 210, 155))
+    assert len(search_shapes) == 2
+    h, w = search_shapes[1]
+    assert h < 480 and w < 640
+    assert h > rows * square and w > cols * square
+    np.testing.assert_allclose(tracker.corners[0, 0], [209.5, 154.5], atol=0.5)
+
+    # a miss resets the tracker, the next search is over the full frame
+    assert tracker.find_pose(np.full((480, 640, 3), 255, np.uint8)) == (None, None)
+    assert tracker.corners is None and tracker.rvec is None
+    tracker.find_pose(_checkerboard_frame(cols, rows, square, 300, 250))
+    assert search_shapes[-1] == (480, 640)
+    np.testing.assert_allclose(tracker.corners[0, 0], [299.5, 249.5], atol=0.5)
+
+
+def _synthetic_views(n, camera_matrix, dist_coeffs, seed=0):
+    """Checkerboard views of a known camera, as (N, M, 3) and (N, M, 2)."""
+    rng = np.random.default_rng(seed)
+    objp, _ = checkerboard_geometry(9, 6, 25.0)
+    objp = objp - objp.mean(axis=0)
+    rvecs = rng.normal(scale=0.3, size=(n, 3))
+    tvecs = np.column_stack(
+        [rng.uniform(-60, 60, n), rng.uniform(-40, 40, n), rng.uniform(500, 700, n)]
+    )
+    imgpoints = np.stack(
+        [
+            cv2.projectPoints(objp, r, t, camera_matrix, dist_coeffs)[0].reshape(-1, 2)
+            for r, t in zip(rvecs, tvecs)
+        ]
+    )
+    return np.stack([objp] * n), imgpoints, rvecs, tvecs
+
+
+CALIB_K = np.array([[900.0, 0, 320], [0, 880, 240], [0, 0, 1]])
+CALIB_D = np.array([-0.15, 0.08, 0.001, -0.0005, -0.02])
+
+
+@pytest.mark.parametrize(
+    "dist_coeffs",
+    [
+        CALIB_D,
+        np.array([-0.1, 0.02, 0.001, 0.002, 0.0, 0.05, -0.01, 0.003]),
+        np.array(
+            [-0.1, 0.02, 0.001, 0.002, 0, 0.05, -0.01, 0.003, 1e-3, -2e-3, 5e-4, 1e-3]
+        ),
+    ],
+)
+def test_project_points(dist_coeffs):
+    objpoints, imgpoints, rvecs, tvecs = _synthetic_views(5, CALIB_K, dist_coeffs)
+    projected = project_points(objpoints, rvecs, tvecs, CALIB_K, dist_coeffs)
+    assert projected.shape == imgpoints.shape
+    assert np.abs(projected - imgpoints).max() < 3e-5
+
+    with pytest.raises(ValueError):
+        project_points(objpoints, rvecs, tvecs, CALIB_K, np.zeros(14))
+
+
+def test_reprojection_errors():
+    objpoints, imgpoints, rvecs, tvecs = _synthetic_views(4, CALIB_K, CALIB_D)
+    imgpoints[1, 3] += [3.0, 4.0]
+    errors, image_rmse = reprojection_errors(
+        objpoints, imgpoints.reshape(4, -1, 1, 2), rvecs, tvecs, CALIB_K, CALIB_D
+    )
+    assert errors.shape == (4, 54)
+    assert errors[1, 3] == pytest.approx(5.0, abs=1e-4)
+    errors[1, 3] = 0.0
+    assert errors.max() < 3e-5
+    assert image_rmse[1] == pytest.approx(5.0 / np.sqrt(54), abs=1e-4)
+    assert np.all(image_rmse[[0, 2, 3]] < 3e-5)
+
+
+def test_calibrate_camera_pruned():
+    objpoints, imgpoints, _, _ = _synthetic_views(16, CALIB_K, CALIB_D, seed=1)
+    rng = np.random.default_rng(2)
+    imgpoints += rng.normal(scale=0.05, size=imgpoints.shape)
+    corrupted = [4, 9]
+    imgpoints[corrupted] += rng.normal(scale=3.0, size=(2, 54, 2))
+
+    best, history = calibrate_camera_pruned(
+        objpoints, imgpoints, (640, 480), min_images=12, n_jobs=2
+    )
+    assert history[0].rmse > 1.0
+    assert np.array_equal(history[0].used, np.arange(16))
+    assert not set(corrupted) & set(best.used)
+    assert len(best.used) >= 12
+    assert best.rmse < 0.1
+    assert [c.rmse for c in history] == sorted((c.rmse for c in history), reverse=True)
+    np.testing.assert_allclose(best.camera_matrix, CALIB_K, rtol=1e-2)
+    assert best.image_rmse.shape == (len(best.used),)
+    assert best.corner_errors.shape == (len(best.used), 54)
+
+
+def test_corner_coverage():
+    imgpoints = [
+        np.array([[[5.0, 5.0]], [[635.0, 475.0]]]),
+        np.array([[10.0, 12.0], [639.9, 0.0], [320.0, 240.0]]),
+    ]
+    coverage = corner_coverage(imgpoints, (640, 480), grid=(4, 3))
+    expected = np.zeros((3, 4))
+    expected[0, 0] = 2
+    expected[2, 3] = 1
+    expected[0, 3] = 1
+    expected[1, 2] = 1
+    np.testing.assert_array_equal(coverage, expected)
+
+    heat = draw_coverage(coverage, (640, 480))
+    assert heat.shape == (480, 640, 3) and heat.dtype == np.uint8
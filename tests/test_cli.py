@@ -0,0 +1,45 @@
+import socket
+
+import pytest
+
+from fanucpy.cli import _io_signal, main
+
+
+def test_ping(capsys):
+    assert main(["--sim", "ping", "-n", "5"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("5 x protover: min ")
+    assert "p99" in out
+
+
+def test_bench(capsys):
+    assert main(["--sim", "bench", "--duration", "0.05"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].split()[:3] == ["test", "commands", "cmd/s"]
+    names = [line.split()[0] for line in out[1:]]
+    assert names == ["protover", "curpos", "curjpos", "getstate", "rdbits", "movej"]
+    assert "not supported" not in "\n".join(out)
+
+
+def test_monitor(capsys):
+    assert main(["--sim", "monitor", "--count", "1", "--io", "RDO:7"]) == 0
+    out = capsys.readouterr().out
+    assert "pose " in out and "joints " in out and "power " in out
+    assert "RDO[7]=0" in out
+    assert "\x1b[H" not in out
+
+
+def test_unreachable(capsys):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    argv = ["--port", str(port), "--timeout", "1", "ping", "-n", "1"]
+    assert main(argv) == 1
+    assert f"cannot connect to 127.0.0.1:{port}" in capsys.readouterr().err
+
+
+def test_io_signal():
+    assert _io_signal("do:12") == ("DOUT", 12)
+    assert _io_signal("RDO:7") == ("RDO", 7)
+    with pytest.raises(SystemExit):
+        main(["--sim", "monitor", "--io", "XYZ:1"])
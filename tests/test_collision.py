@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from fanucpy.collision import (
+    Box,
+    Cylinder,
+    LinkModel,
+    Mesh,
+    Sphere,
+    Workspace,
+    wpr_to_matrices,
+)
+
+BOUNDS = ([-500, -500, 0], [500, 500, 800])
+
+
+def box_mesh(size, pose=(0, 0, 0, 0, 0, 0)):
+    h = np.asarray(size, dtype=np.float64) / 2
+    v = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]) * h
+    # outward counter-clockwise triangles
+    f = [
+        [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+        [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+    ]  # fmt: skip
+    return Mesh(v, f, pose=pose)
+
+
+def test_wpr_to_matrices():
+    wpr = np.random.default_rng(0).uniform(-180, 180, (100, 3))
+    expected = Rotation.from_euler("xyz", wpr, degrees=True).as_matrix()
+    np.testing.assert_allclose(wpr_to_matrices(wpr), expected, atol=1e-12)
+
+
+def test_shape_distances():
+    box = Box([200, 100, 50], pose=[100, 0, 25, 0, 0, 90])
+    points = np.array([[100, 0, 25], [100, 0, 100], [100, 150, 25], [200, 0, 25]])
+    np.testing.assert_allclose(box.distance(points), [-25, 50, 50, 50])
+    cyl = Cylinder(50, 100, pose=[0, 0, 50, 0, 0, 0])
+    np.testing.assert_allclose(
+        cyl.distance([[0, 0, 50], [80, 0, 50], [0, 0, 130], [60, 0, 110]]),
+        [-50, 30, 30, np.hypot(10, 10)],
+    )
+    sphere = Sphere(20, center=[10, 0, 0])
+    np.testing.assert_allclose(sphere.distance([[10, 0, 0], [10, 0, 50]]), [-20, 30])
+
+
+def test_mesh_matches_box():
+    pose = [50, -20, 100, 10, 20, 30]
+    box, mesh = Box([120, 80, 60], pose=pose), box_mesh([120, 80, 60], pose=pose)
+    points = np.random.default_rng(1).uniform(
+        [-100, -150, 0], [200, 150, 250], (500, 3)
+    )
+    np.testing.assert_allclose(mesh.distance(points), box.distance(points), atol=1e-9)
+
+
+def test_grid_matches_exact():
+    obstacles = [
+        Box([200, 100, 150], pose=[200, 0, 75, 0, 0, 30]),
+        Cylinder(60, 300, pose=[-200, 150, 150, 0, 0, 0]),
+        box_mesh([100, 100, 100], pose=[-150, -250, 300, 45, 0, 0]),
+    ]
+    ws = Workspace(BOUNDS, obstacles, resolution=10.0)
+    points = np.random.default_rng(2).uniform(*BOUNDS, (5000, 3))
+    exact = np.min([s.distance(points) for s in obstacles], axis=0)
+    walls = np.minimum(points - BOUNDS[0], np.array(BOUNDS[1]) - points).min(axis=1)
+    exact = np.minimum(exact, walls)
+    d = ws.distance(points)
+    # never more than a cell optimistic
+    assert np.all(d <= exact + 10.0)
+    near = exact < 20.0
+    np.testing.assert_allclose(d[near], exact[near], atol=10.0)
+
+
+def test_tool_clearance():
+    ws = Workspace(BOUNDS, [Box([100, 100, 100], pose=[0, 0, 50, 0, 0, 0])])
+    # sphere 100 mm along the tool z-axis, pointing down
+    ws.tool = np.array([[0, 0, 100, 20]])
+    pose = [0, 0, 350, 180, 0, 0]
+    assert ws.clearance([pose])[0] == pytest.approx(130.0, abs=1.0)
+    assert ws.collides([[0, 0, 200, 180, 0, 0]]).tolist() == [True]
+    assert ws.collides([pose], margin=150.0).tolist() == [True]
+
+
+def test_check_path():
+    ws = Workspace(BOUNDS, [Box([100, 400, 300], pose=[0, 0, 150, 0, 0, 0])])
+    path = [
+        [-300, 0, 200, 180, 0, 0],
+        [-300, 0, 500, 180, 0, 0],
+        [300, 0, 500, 180, 0, 0],
+        [300, 0, 200, 180, 0, 0],
+    ]
+    check = ws.check_path(path, margin=10.0)
+    assert check.ok and check.segment is None
+    # the walls at x = -500 and 500 are closest
+    assert check.clearance == pytest.approx(200.0, abs=1.0)
+
+    check = ws.check_path([path[0], path[3]], margin=10.0)
+    assert not check.ok
+    assert check.segment == 0
+    # first sample within the margin of the face at x = -50
+    assert check.pose[0] == pytest.approx(-55.0)
+
+    check = ws.check_path(path[:2] + [[100, 0, 100, 180, 0, 0]])
+    assert not check.ok
+    assert check.segment == 1
+
+
+def test_joint_clearance():
+    # planar two-link arm along the x-axis at zero joints
+    links = LinkModel(
+        dh=[[300, 0, 0, 0], [200, 0, 0, 0]],
+        capsules=[(1, [-300, 0, 0], [0, 0, 0], 20), (2, [-200, 0, 0], [0, 0, 0], 20)],
+        base=[0, 0, 400, 0, 0, 0],
+    )
+    ws = Workspace(
+        ([-1000, -1000, 0], [1000, 1000, 1000]),
+        [Box([100, 100, 100], pose=[0, 400, 400, 0, 0, 0])],
+        links=links,
+    )
+    d = ws.joint_clearance([[0, 0], [90, 0]])
+    assert d[0] == pytest.approx(350.0 - 20.0, abs=10.0)
+    assert d[1] < 0
+    with pytest.raises(ValueError):
+        Workspace(BOUNDS).joint_clearance([[0, 0]])
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+from fanucpy.engine import AppEngine, CommandTimer, CycleReport, summarize
+from fanucpy.robotapp import RobotApp
+
+
+class FakeRobot:
+    def __init__(self):
+        self.commands = []
+
+    def send_cmd(self, cmd, continue_on_error=False):
+        self.commands.append(cmd)
+        if cmd.startswith("err"):
+            raise ConnectionError(cmd)
+        return 0, "success"
+
+    def get_curpos(self):
+        return self.send_cmd("curpos")
+
+    def get_rdo(self, rdo_num):
+        return self.send_cmd(f"getrdo:{rdo_num}")
+
+
+class StepApp(RobotApp):
+    """Sleeps through two steps, raises in the given cycles."""
+
+    def __init__(self, fail_cycles=(), robot=None):
+        super().__init__()
+        self.fail_cycles = set(fail_cycles)
+        self.robot = robot
+        self.cycle = 0
+
+    def configure(self):
+        pass
+
+    def _main(self, scale=1.0):
+        self.cycle += 1
+        with self.step("approach"):
+            time.sleep(0.01 * scale)
+        with self.step("pick"):
+            time.sleep(0.02 * scale)
+            if self.cycle in self.fail_cycles:
+                raise RuntimeError("gripper empty")
+            if self.robot is not None:
+                self.robot.get_curpos()
+                self.robot.get_rdo(1)
+        return self.cycle
+
+
+def test_summarize():
+    s = summarize([0.1, 0.2, 0.3, 0.4])
+    assert s["count"] == 4
+    assert s["mean"] == pytest.approx(0.25)
+    assert s["min"] == 0.1 and s["max"] == 0.4
+    assert s["total"] == pytest.approx(1.0)
+    assert s["p50"] == pytest.approx(0.25)
+    assert summarize([]) == {"count": 0}
+
+
+def test_step_timings():
+    report = AppEngine(StepApp()).run(n_cycles=3, scale=2.0)
+    assert report.n_cycles == 3
+    assert report.results == [1, 2, 3]
+    assert report.errors == []
+    assert list(report.step_times) == ["approach", "pick"]
+    for name, minimum in (("approach", 0.02), ("pick", 0.04)):
+        assert len(report.step_times[name]) == 3
+        assert min(report.step_times[name]) >= minimum
+    for cycle, approach, pick in zip(
+        report.cycle_times, report.step_times["approach"], report.step_times["pick"]
+    ):
+        assert cycle >= approach + pick
+    assert report.dominant_step() == "pick"
+    assert report.elapsed >= sum(report.cycle_times)
+
+
+def test_step_outside_engine():
+    app = StepApp()
+    assert app.run() == (True, "success", 1)
+    assert app._step_timings is None
+
+
+def test_summary():
+    report = AppEngine(StepApp()).run(n_cycles=2)
+    summary = report.summary()
+    assert summary["cycles"]["count"] == 2
+    assert set(summary["steps"]) == {"approach", "pick"}
+    assert summary["steps"]["pick"]["count"] == 2
+    assert summary["steps"]["pick"]["total"] == pytest.approx(
+        sum(report.step_times["pick"])
+    )
+    assert summary["errors"] == 0
+    assert summary["throughput"] == pytest.approx(2 / report.elapsed * 3600)
+    text = str(report)
+    assert "approach" in text and "pick" in text
+    assert "errors: 0" in text
+
+
+def test_failing_step():
+    report = AppEngine(StepApp(fail_cycles=[2])).run(n_cycles=5)
+    assert report.n_cycles == 2
+    assert report.results == [1, None]
+    assert len(report.errors) == 1
+    assert "gripper empty" in report.errors[0]
+    # the raising step is still timed
+    assert len(report.step_times["pick"]) == 2
+
+    report = AppEngine(StepApp(fail_cycles=[2])).run(n_cycles=4, stop_on_error=False)
+    assert report.n_cycles == 4
+    assert report.results == [1, None, 3, 4]
+    assert len(report.errors) == 1
+    assert report.throughput == pytest.approx(3 / report.elapsed * 3600)
+
+
+def test_duration():
+    report = AppEngine(StepApp()).run(duration=0.1, scale=0.5)
+    assert 1 <= report.n_cycles <= 10
+    assert report.elapsed >= 0.1
+    assert AppEngine(StepApp()).run().n_cycles == 1
+
+
+def test_empty_report():
+    report = CycleReport()
+    assert report.dominant_step() is None
+    assert report.throughput == 0.0
+    assert report.summary()["cycles"] == {"count": 0}
+
+
+def test_command_timings():
+    robot = FakeRobot()
+    report = AppEngine(StepApp(robot=robot), robot=robot).run(n_cycles=3)
+    # send_cmd is restored after the run
+    assert "send_cmd" not in vars(robot)
+    assert len(robot.commands) == 6
+    assert set(report.command_times) == {"curpos", "getrdo"}
+    assert all(len(v) == 3 for v in report.command_times.values())
+    assert set(report.summary()["commands"]) == {"curpos", "getrdo"}
+    assert "cmd:curpos" in str(report)
+
+
+def test_command_timer_restores_on_error():
+    robot = FakeRobot()
+    with pytest.raises(ConnectionError):
+        with CommandTimer(robot) as timer:
+            robot.send_cmd("err:1")
+    assert list(timer.timings) == ["err"]
+    assert "send_cmd" not in vars(robot)
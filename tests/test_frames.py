@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from fanucpy.frames import TransformGraph, invert_H
+from fanucpy.transformations import xyzrpw_to_H
+
+USER_FRAME = [100.0, -50.0, 20.0, 0.0, 0.0, 90.0]
+TOOL = [0.0, 0.0, 150.0, 180.0, 0.0, 0.0]
+CAMERA = [40.0, 0.0, 60.0, 0.0, -30.0, 0.0]
+
+
+def H(pose):
+    return xyzrpw_to_H(np.array(pose, dtype=np.float64))
+
+
+class FakeRobot:
+    def __init__(self, pose):
+        self.pose = pose
+
+    def get_curpos(self):
+        return list(self.pose)
+
+
+@pytest.fixture
+def graph():
+    graph = TransformGraph.for_robot(USER_FRAME, TOOL)
+    graph.set_transform("flange", "camera", CAMERA)
+    return graph
+
+
+def test_invert_H():
+    H_ab = H([10.0, 20.0, 30.0, 15.0, -40.0, 120.0])
+    np.testing.assert_allclose(invert_H(H_ab), np.linalg.inv(H_ab), atol=1e-12)
+
+
+def test_get(graph):
+    tcp = [300.0, 20.0, 400.0, 180.0, 0.0, 45.0]
+    graph.update_from_robot(FakeRobot(tcp))
+    H_user, H_tcp, H_tool, H_cam = map(H, (USER_FRAME, tcp, TOOL, CAMERA))
+
+    np.testing.assert_allclose(graph.get("base", "tcp"), H_user @ H_tcp)
+    expected = H_user @ H_tcp @ np.linalg.inv(H_tool) @ H_cam
+    np.testing.assert_allclose(graph.get("base", "camera"), expected, atol=1e-9)
+    # inverse paths
+    np.testing.assert_allclose(
+        graph.get("camera", "base"), np.linalg.inv(expected), atol=1e-9
+    )
+    np.testing.assert_allclose(graph.get("tcp", "flange"), H_tool, atol=1e-12)
+    np.testing.assert_allclose(graph.get("flange", "tcp"), H_tool)
+    np.testing.assert_array_equal(graph.get("tcp", "tcp"), np.eye(4))
+    np.testing.assert_allclose(graph.get_xyzrpw("user", "tcp"), tcp, atol=1e-9)
+    assert graph.frames == ["base", "camera", "flange", "tcp", "user"]
+
+
+def test_transform_points_and_poses(graph):
+    H_cam = graph.get("base", "camera")
+    points = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 500.0]])
+    np.testing.assert_allclose(
+        graph.transform_points(points, "camera", "base"),
+        (H_cam @ np.column_stack([points, np.ones(2)]).T).T[:, :3],
+    )
+    poses = np.stack([np.eye(4), H([1.0, 2.0, 3.0, 10.0, 20.0, 30.0])])
+    np.testing.assert_allclose(
+        graph.transform_poses(poses, "camera", "base"), H_cam @ poses
+    )
+
+
+def test_cache(graph):
+    H_old = graph.get("base", "camera")
+    assert graph.get("base", "camera") is H_old
+    static = graph.get("flange", "camera")
+    with pytest.raises(ValueError):
+        H_old[0, 0] = 2.0
+
+    # a new TCP pose drops only the chains through the user -> tcp edge
+    robot = FakeRobot([300.0, 20.0, 400.0, 180.0, 0.0, 45.0])
+    graph.update_from_robot(robot)
+    assert graph.get("flange", "camera") is static
+    H_new = graph.get("base", "camera")
+    assert H_new is not H_old
+    assert not np.allclose(H_new, H_old)
+
+    robot.pose = [310.0, 20.0, 400.0, 180.0, 0.0, 45.0]
+    graph.update_from_robot(robot)
+    np.testing.assert_allclose(
+        graph.get("base", "camera")[:3, 3] - H_new[:3, 3], [0.0, 10.0, 0.0]
+    )
+    # inverse chains are dropped as well
+    np.testing.assert_allclose(
+        graph.get("camera", "base"), invert_H(graph.get("base", "camera")), atol=1e-9
+    )
+
+
+def test_set_transform_invalidates(graph):
+    H_old = graph.get("camera", "user")
+    graph.set_transform("flange", "camera", np.eye(4))
+    H_new = graph.get("camera", "user")
+    np.testing.assert_allclose(H_new, graph.get("flange", "user"), atol=1e-9)
+    assert not np.allclose(H_new, H_old)
+
+    # setting the reverse edge replaces it
+    graph.set_transform("camera", "flange", H([0.0, 0.0, 5.0, 0, 0, 0]))
+    np.testing.assert_allclose(graph.get("flange", "camera")[:3, 3], [0.0, 0.0, -5.0])
+
+    # a new edge can make a shorter path
+    before = graph.get("base", "camera")
+    graph.set_transform("base", "camera", np.eye(4))
+    assert not np.allclose(graph.get("base", "camera"), before)
+    np.testing.assert_array_equal(graph.get("base", "camera"), np.eye(4))
+
+
+def test_unknown_frames(graph):
+    with pytest.raises(KeyError, match="gripper"):
+        graph.get("base", "gripper")
+    with pytest.raises(KeyError, match="gripper"):
+        graph.get("gripper", "base")
+    graph.set_transform("world", "table", np.eye(4))
+    with pytest.raises(KeyError, match="No transform"):
+        graph.get("base", "table")
+    with pytest.raises(ValueError):
+        graph.set_transform("base", "table", np.zeros(3))
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from fanucpy.iowatch import IOWatcher
+from fanucpy.robot import Robot
+from fanucpy.simulator import RobotSimulator
+
+
+@pytest.fixture
+def sim():
+    with RobotSimulator(time_scale=0.0) as sim:
+        yield sim
+
+
+@pytest.fixture
+def robot(sim):
+    robot = Robot(robot_model="Fanuc", host=sim.host, port=sim.port)
+    robot.connect()
+    yield robot
+    robot.disconnect()
+
+
+def test_edges(sim, robot):
+    events = {"rising": [], "falling": [], "both": []}
+    watcher = IOWatcher(robot)
+    for edge, calls in events.items():
+        watcher.on_change("DO", 5, lambda s, v, t, calls=calls: calls.append(v), edge)
+
+    # the first poll sets the reference values without edges
+    assert watcher.poll() == {}
+    for val in (True, True, False, True):
+        sim.set_io("DOUT", 5, val)
+        watcher.poll()
+    assert events == {
+        "rising": [True, True],
+        "falling": [False],
+        "both": [True, False, True],
+    }
+    assert watcher.values == {("DOUT", 5): True}
+    with pytest.raises(ValueError):
+        watcher.on_change("DOUT", 5, print, edge="up")
+
+
+def test_remove_callback(sim, robot):
+    calls = []
+    watcher = IOWatcher(robot)
+    handle = watcher.on_change("RDO", 7, lambda *args: calls.append(args))
+    watcher.poll()
+    watcher.remove_callback(handle)
+    sim.set_io("RDO", 7, True)
+    assert watcher.poll() == {("RDO", 7): True}
+    assert calls == []
+
+
+def test_wait_for(sim, robot):
+    with IOWatcher(robot) as watcher:
+        future = watcher.wait_for(dout=12, value=True, timeout=5)
+        timer = threading.Timer(0.05, sim.set_io, ("DOUT", 12, True))
+        timer.start()
+        t_set = time.perf_counter()
+        assert future.result(timeout=5) >= t_set
+        timer.join()
+        # already true
+        assert watcher.wait_for(do=12).result(timeout=5)
+    with pytest.raises(ValueError):
+        watcher.wait_for(ai=1)
+
+
+def test_wait_for_timeout(robot):
+    with IOWatcher(robot, max_interval=1.0) as watcher:
+        t0 = time.perf_counter()
+        future = watcher.wait_for(din=3, value=True, timeout=0.1)
+        with pytest.raises(TimeoutError):
+            future.result(timeout=5)
+        assert time.perf_counter() - t0 < 0.5
+
+
+def test_adaptive_interval(sim, robot):
+    watcher = IOWatcher(
+        robot, [("RDO", 1)], min_interval=0.01, max_interval=0.1, backoff=2.0, hold=0
+    )
+    intervals = []
+    for _ in range(6):
+        watcher.poll()
+        intervals.append(watcher._next_interval())
+    assert intervals == pytest.approx([0.02, 0.04, 0.08, 0.1, 0.1, 0.1])
+
+    # a change, an expected change or a waiter resets to the minimum
+    watcher.hold = 1.0
+    sim.set_io("RDO", 1, True)
+    watcher.poll()
+    assert watcher._next_interval() == 0.01
+    watcher._fast_until = 0.0
+    assert watcher._next_interval() == 0.02
+    watcher.expect(1.0)
+    assert watcher._next_interval() == 0.01
+    watcher._fast_until = 0.0
+    watcher.wait_for(rdo=1, value=False)
+    assert watcher._next_interval() == 0.01
+
+
+def test_callback_error_keeps_polling(sim, robot):
+    errors = []
+
+    def bad(signal, value, t):
+        raise RuntimeError("bad handler")
+
+    calls = []
+    watcher = IOWatcher(robot, on_error=lambda cb, exc: errors.append((cb, exc)))
+    watcher.on_change("RDO", 7, bad)
+    watcher.on_change("RDO", 7, lambda s, v, t: calls.append(v))
+    # reference values before the first edge
+    watcher.poll()
+    with watcher:
+        first = watcher.wait_for(rdo=7, value=True, timeout=5)
+        sim.set_io("RDO", 7, True)
+        first.result(timeout=5)
+        sim.set_io("RDO", 7, False)
+        watcher.wait_for(rdo=7, value=False, timeout=5).result(timeout=5)
+        assert watcher._thread.is_alive()
+    assert watcher.error is None
+    assert calls == [True, False]
+    assert [cb for cb, _ in errors] == [bad, bad]
+    assert str(errors[0][1]) == "bad handler"
+
+
+def test_callback_error_printed(sim, robot, capsys):
+    watcher = IOWatcher(robot)
+    watcher.on_change("RDO", 7, lambda s, v, t: 1 / 0)
+    watcher.poll()
+    sim.set_io("RDO", 7, True)
+    watcher.poll()
+    assert "ZeroDivisionError" in capsys.readouterr().err
+
+
+def test_read_error_fails_waiters(robot):
+    with IOWatcher(robot, min_interval=0.05) as watcher:
+        future = watcher.wait_for(rdo=7, value=True, timeout=5)
+        robot.comm_sock.close()
+        with pytest.raises(OSError):
+            future.result(timeout=5)
+        watcher._thread.join(timeout=5)
+        assert isinstance(watcher.error, OSError)
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from fanucpy.motion import MotionModel, Move, profile_time
+
+
+def test_profile_time():
+    # triangular: d = a * ramp^2
+    t, ramp = profile_time(1.0, 10.0, 4.0)
+    assert ramp == pytest.approx(0.5)
+    assert t == pytest.approx(1.0)
+    # trapezoidal: d / v + v / a
+    t, ramp = profile_time(100.0, 10.0, 4.0)
+    assert ramp == pytest.approx(2.5)
+    assert t == pytest.approx(12.5)
+
+
+def test_joint_time_slowest_axis():
+    model = MotionModel()
+    t, _ = model.joint_time([0] * 6, [10, 0, 0, 0, 0, 90])
+    t_axes = [model.joint_time([0] * 6, q)[0] for q in np.diag([10, 0, 0, 0, 0, 90])]
+    assert t == pytest.approx(max(t_axes))
+    assert model.joint_time([0] * 6, [0] * 6)[0] == 0.0
+
+
+def test_joint_time_nan():
+    model = MotionModel()
+    # missing target axes do not move, unknown starts are unknown
+    assert np.isfinite(model.joint_time([0] * 6, [10] * 5 + [np.nan])[0])
+    assert np.isnan(model.joint_time([np.nan] + [0] * 5, [10] * 6)[0])
+    t, ramp = model.joint_time([[np.nan] * 6, [0] * 6], [10] * 6)
+    assert np.isnan(t[0]) and np.isnan(ramp[0])
+    assert np.isfinite(t[1])
+
+
+def test_acceleration_clipped():
+    model = MotionModel()
+    q0, q1 = [0] * 6, [45] * 6
+    assert model.joint_time(q0, q1, 100, 500)[0] == model.joint_time(q0, q1)[0]
+    assert model.joint_time(q0, q1, 100, 0)[0] == model.joint_time(q0, q1, 100, 1)[0]
+    p0, p1 = [0, 0, 0, 0, 0, 0], [300, 0, 0, 0, 0, 0]
+    assert model.linear_time(p0, p1, 500, 500)[0] == model.linear_time(p0, p1, 500)[0]
+    assert np.isfinite(model.linear_time(p0, p1, 500, 0)[0])
+
+
+PROGRAM = [
+    Move("joint", [0, 0, 0, 0, 0, 0]),
+    Move("joint", [30, 0, 0, 0, 0, 0], velocity=100),
+    Move("pose", [400, 0, 300, 180, 0, 0], velocity=500, linear=True),
+    Move("pose", [400, 100, 300, 180, 0, 0], velocity=500, linear=True),
+    Move("joint", [0, 0, 0, 0, 0, 0]),
+]
+
+
+def fk(joints):
+    joints = np.asarray(joints)
+    return np.column_stack(
+        [400 + joints[:, 0], np.zeros(len(joints)), np.full(len(joints), 300)]
+        + [np.full(len(joints), v) for v in (180, 0, 0)]
+    )
+
+
+def ik(poses):
+    poses = np.asarray(poses)
+    return np.column_stack(
+        [poses[:, 0] - 400 + poses[:, 1]] + [np.zeros(len(poses))] * 5
+    )
+
+
+def test_segment_times_carry_state():
+    model = MotionModel()
+    t = model.segment_times(PROGRAM)
+    # no start value for the first move in each space
+    assert np.isnan(t[[0, 2]]).all()
+    assert t[1] == pytest.approx(model.joint_time([0] * 6, PROGRAM[1].vals)[0])
+    assert t[3] == pytest.approx(
+        model.linear_time(PROGRAM[2].vals, PROGRAM[3].vals, 500)[0]
+    )
+    # joints carried over the pose moves
+    assert t[4] == pytest.approx(model.joint_time(PROGRAM[1].vals, [0] * 6, 25)[0])
+
+    t = model.segment_times(PROGRAM, start_joints=[0] * 6, start_pose=PROGRAM[2].vals)
+    assert t[0] == 0.0 and t[2] == 0.0
+    assert np.isfinite(t).all()
+
+
+def test_program_time_lower_bound():
+    model = MotionModel()
+    t = model.segment_times(PROGRAM)
+    assert model.program_time(PROGRAM) == pytest.approx(np.nansum(t))
+    assert model.program_time(PROGRAM) > 0
+    assert model.program_time([]) == 0.0
+
+
+def test_segment_times_kinematics():
+    plain = MotionModel()
+    model = MotionModel(fk=fk, ik=ik)
+    t = model.segment_times(PROGRAM, start_joints=[0] * 6)
+    assert np.isfinite(t).all()
+    # the pose move starts at fk of the joint target
+    assert t[2] == pytest.approx(
+        plain.linear_time(fk([[30] + [0] * 5])[0], PROGRAM[2].vals, 500)[0]
+    )
+    # the joint move starts at ik of the pose target
+    q0 = ik([PROGRAM[3].vals])[0]
+    assert q0[0] == 100
+    assert t[4] == pytest.approx(plain.joint_time(q0, [0] * 6, 25)[0])
+
+
+def test_linear_joint_move_velocity():
+    model = MotionModel()
+    program = [Move("joint", [45] * 6, velocity=10, linear=True)]
+    t = model.segment_times(program, start_joints=[0] * 6)
+    assert t[0] == pytest.approx(model.joint_time([0] * 6, [45] * 6, 10)[0])
+
+
+def test_cnt_blending():
+    model = MotionModel()
+    program = [Move("joint", [30, 0, 0, 0, 0, 0]), Move("joint", [60, 0, 0, 0, 0, 0])]
+    fine = model.segment_times(program, start_joints=[0] * 6)
+    program[0] = program[0]._replace(cnt_val=100)
+    blended = model.segment_times(program, start_joints=[0] * 6)
+    assert blended[0] < fine[0]
+    assert blended[1] == fine[1]
+
+
+def test_fit():
+    steps = np.cumsum([0, 5, 40, 10, 90, 20, 60])
+    program = [Move("joint", [q, 0, 0, 0, 0, 0], velocity=50) for q in steps]
+    t = MotionModel().segment_times(program)
+    model = MotionModel().fit(program, 1.5 * t + 0.05)
+    assert model.time_scale == pytest.approx(1.5)
+    assert model.overhead == pytest.approx(0.05)
@@ -0,0 +1,148 @@
+import time
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from fanucpy.multicam import CameraGroup, average_rotations, fuse_poses
+
+R_TRUE = Rotation.from_euler("xyz", [10, -20, 30], degrees=True).as_matrix()
+T_TRUE = np.array([500.0, -100.0, 300.0])
+
+
+def noisy_views(n, seed=0, t_noise=1.0, r_noise=0.5):
+    rng = np.random.default_rng(seed)
+    noise = Rotation.from_rotvec(np.radians(r_noise) * rng.normal(size=(n, 3)))
+    R = (noise * Rotation.from_matrix(R_TRUE)).as_matrix()
+    t = T_TRUE + t_noise * rng.normal(size=(n, 3))
+    return R, t
+
+
+def angle(R0, R1):
+    return np.degrees(Rotation.from_matrix(R0.T @ R1).magnitude())
+
+
+def test_average_rotations():
+    R, _ = noisy_views(50)
+    assert angle(average_rotations(R), R_TRUE) < 0.3
+    # quaternion signs do not matter
+    q = Rotation.from_matrix(R).as_quat()
+    q[::2] *= -1
+    assert np.allclose(
+        average_rotations(Rotation.from_quat(q).as_matrix()), average_rotations(R)
+    )
+    # a view with zero weight is ignored
+    R[0] = np.eye(3)
+    w = np.ones(50)
+    w[0] = 0.0
+    assert angle(average_rotations(R, w), R_TRUE) < 0.3
+
+
+def test_fuse_recovers_pose():
+    R, t = noisy_views(20)
+    pose = fuse_poses(R, t)
+    assert angle(pose.R, R_TRUE) < 0.3
+    np.testing.assert_allclose(pose.t, T_TRUE, atol=1.0)
+    assert pose.views.tolist() == list(range(20))
+    assert pose.spread == pytest.approx(np.sqrt(np.mean(np.sum((t - pose.t) ** 2, 1))))
+    # weights pull the translation to the trusted view
+    w = np.full(20, 1e-6)
+    w[3] = 1.0
+    np.testing.assert_allclose(fuse_poses(R, t, w).t, t[3], atol=1e-3)
+
+
+def test_fuse_rejects_outliers():
+    R, t = noisy_views(4)
+    t[2] += [100.0, 0.0, 0.0]
+    R[2] = np.eye(3)
+    pose = fuse_poses(R, t, max_deviation=10.0)
+    assert pose.views.tolist() == [0, 1, 3]
+    np.testing.assert_allclose(pose.t, T_TRUE, atol=2.0)
+    assert angle(pose.R, R_TRUE) < 1.0
+    # not applied to two views
+    assert fuse_poses(R[1:3], t[1:3], max_deviation=10.0).views.tolist() == [0, 1]
+
+
+def test_fuse_all_rejected():
+    R, t = noisy_views(3)
+    t += 100 * np.eye(3)
+    assert fuse_poses(R, t, max_deviation=10.0) is None
+    assert fuse_poses(np.empty((0, 3, 3)), np.empty((0, 3))) is None
+
+
+class FakeCapture:
+    def __init__(self, frame, delays=(), ok=True):
+        self.frame = frame
+        self.delays = list(delays)
+        self.ok = ok
+        self.n_grabs = 0
+        self.released = False
+
+    def grab(self):
+        self.n_grabs += 1
+        if self.delays:
+            time.sleep(self.delays.pop(0))
+        return True
+
+    def retrieve(self):
+        return self.ok, self.frame if self.ok else None
+
+    def release(self):
+        self.released = True
+
+
+def group(cameras, **kwargs):
+    extrinsics = [np.eye(4) for _ in cameras]
+    for k, H in enumerate(extrinsics):
+        H[:3, 3] = [k * 100.0, 0, 0]
+    # frames hold the target translation in the camera frame
+    detectors = [
+        lambda f: (R_TRUE, f)
+        if f is not None and np.isfinite(f).all()
+        else (None, None)
+    ] * len(cameras)
+    return CameraGroup(cameras, detectors, extrinsics, **kwargs)
+
+
+def test_views_map_to_cameras():
+    cams = [
+        FakeCapture(np.full(3, np.nan)),
+        FakeCapture(T_TRUE - [100, 0, 0]),
+        FakeCapture(np.zeros(3), ok=False),
+        FakeCapture(T_TRUE - [300, 0, 0]),
+    ]
+    with group(cams) as g:
+        result = g.read()
+    assert [d is None for d in result.detections] == [True, False, True, False]
+    assert result.pose.views.tolist() == [1, 3]
+    np.testing.assert_allclose(result.pose.t, T_TRUE)
+    assert result.frameset.frames[2] is None
+    assert all(c.released for c in cams)
+
+
+def test_no_detections():
+    with group([FakeCapture(np.full(3, np.nan))] * 2) as g:
+        assert g.read().pose is None
+
+
+def test_grab_regrabs_on_skew():
+    # the second camera is slow on the first grab only
+    cams = [FakeCapture(T_TRUE), FakeCapture(T_TRUE, delays=[0.05])]
+    with group(cams, max_skew=0.02, max_regrabs=2) as g:
+        frameset = g.grab()
+    assert [c.n_grabs for c in cams] == [2, 2]
+    assert frameset.skew <= 0.02
+
+    cams = [FakeCapture(T_TRUE), FakeCapture(T_TRUE, delays=[0.05] * 5)]
+    with group(cams, max_skew=0.02, max_regrabs=2) as g:
+        frameset = g.grab()
+    assert [c.n_grabs for c in cams] == [3, 3]
+    assert frameset.skew > 0.02
+
+
+def test_stream():
+    cams = [FakeCapture(T_TRUE), FakeCapture(T_TRUE - [100, 0, 0])]
+    with group(cams) as g:
+        results = [r for r, _ in zip(g.stream(), range(3))]
+    assert all(r.pose.views.tolist() == [0, 1] for r in results)
+    assert cams[0].n_grabs >= 3
@@ -0,0 +1,247 @@
+import numpy as np
+import pytest
+
+from fanucpy.robot import (
+    FIXED_MAX,
+    FanucError,
+    Robot,
+    decode_bits,
+    decode_fixed,
+    encode_bits,
+    encode_fixed,
+)
+from fanucpy.simulator import RobotSimulator
+
+
+@pytest.fixture
+def sim():
+    with RobotSimulator(time_scale=0.0) as sim:
+        yield sim
+
+
+def connect(sim, **kwargs):
+    robot = Robot(robot_model="Fanuc", host=sim.host, port=sim.port, **kwargs)
+    robot.connect()
+    return robot
+
+
+def test_fixed_round_trip():
+    rng = np.random.default_rng(0)
+    vals = np.concatenate(
+        [
+            rng.uniform(-FIXED_MAX, FIXED_MAX, 10000),
+            rng.uniform(-1, 1, 1000),
+            [0.0, -0.0, 0.0004, -0.0004, 0.0005, -0.0005, 179.9999, -179.9999],
+            [FIXED_MAX, -FIXED_MAX],
+        ]
+    )
+    for val in vals:
+        enc = encode_fixed(val)
+        assert len(enc) == 6
+        assert abs(decode_fixed(enc) - val) <= 0.0005 + 1e-9
+
+
+def test_fixed_sign_and_limits():
+    assert encode_fixed(-1.5)[0] == "-"
+    assert encode_fixed(1.5)[0] == "+"
+    assert decode_fixed(encode_fixed(FIXED_MAX)) == FIXED_MAX
+    with pytest.raises(ValueError):
+        encode_fixed(FIXED_MAX + 0.001)
+    with pytest.raises(ValueError):
+        encode_fixed(-FIXED_MAX - 0.001)
+
+
+@pytest.mark.parametrize("count", range(1, 129))
+def test_bits_round_trip(count):
+    rng = np.random.default_rng(count)
+    for bits in (
+        rng.random(count) < 0.5,
+        np.ones(count, dtype=bool),
+        np.zeros(count, dtype=bool),
+    ):
+        hex_bits = encode_bits(bits)
+        assert len(hex_bits) == (count + 3) // 4
+        assert decode_bits(hex_bits, count) == bits.tolist()
+
+
+def test_compact_motion(sim):
+    robot = connect(sim, compact_motion=True)
+    vals = [19.0, 66.1234, -33.0, 18.0, -30.0005, -179.9]
+    robot.move("joint", vals=vals, velocity=100, acceleration=100)
+    robot.disconnect()
+    assert sim.commands[-1].startswith("cmovej:")
+    np.testing.assert_allclose(sim.joints, vals, atol=0.0005)
+
+
+def test_compact_motion_old_driver():
+    with RobotSimulator(time_scale=0.0, protocol_version=1) as sim:
+        robot = connect(sim, compact_motion=True)
+        robot.move("pose", vals=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        robot.disconnect()
+    assert sim.commands[-1].startswith("movep:")
+    assert sim.pose == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_get_state(sim):
+    sim.joints = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    sim.pose = [10.0, -20.0, 30.5, 180.0, 0.0, -90.0]
+    sim.set_io("RDO", 7, True)
+    sim.set_io("DIN", 3, True)
+    robot = connect(sim, ee_DO_type="RDO", ee_DO_num=7)
+
+    state = robot.get_state(io=[("RDO", 7), ("DOUT", 12), ("DIN", 3)])
+    assert state.pose == sim.pose
+    assert state.joints == sim.joints
+    assert state.power == pytest.approx(robot.get_ins_power())
+    assert state.io == {("RDO", 7): True, ("DOUT", 12): False, ("DIN", 3): True}
+    assert state.as_array().shape == (16,)
+    # the end-effector output by default
+    assert robot.get_state().io == {("RDO", 7): True}
+    assert len(sim.commands) == 3
+    robot.disconnect()
+
+
+def test_get_state_limits(sim):
+    robot = connect(sim)
+    with pytest.raises(ValueError):
+        robot.get_state(io=[("DOUT", k) for k in range(33)])
+    with pytest.raises(ValueError):
+        robot.get_state(io=[("AI", 1)])
+    robot.disconnect()
+
+
+def test_io_bits(sim):
+    robot = connect(sim)
+    vals = np.random.default_rng(0).random(300) < 0.5
+    robot.set_io_bits("DOUT", start=1, vals=vals)
+    assert [sim.get_io("DOUT", 1 + k) for k in range(300)] == vals.tolist()
+    np.testing.assert_array_equal(robot.get_io_bits("DO", 1, 300), vals)
+    # 128 signals per command
+    assert len(sim.commands) == 6
+
+    robot.set_io_bits("RDO", start=1, vals=0b1010, count=4)
+    assert robot.get_io_bits("RDO", 1, 4).tolist() == [False, True, False, True]
+    assert robot.get_io_bits("RDO", 1, 4, as_int=True) == 0b1010
+    with pytest.raises(ValueError):
+        robot.set_io_bits("DIN", start=1, vals=[True])
+    robot.disconnect()
+
+
+def test_io_list(sim):
+    robot = connect(sim)
+    signals = [("RDO", 7), ("DOUT", 12)] + [("DOUT", 100 + k) for k in range(40)]
+    vals = [k % 3 == 0 for k in range(len(signals))]
+    robot.set_io_list(signals, vals)
+    assert [sim.get_io(t, n) for t, n in signals] == vals
+    sim.set_io("DIN", 3, True)
+    assert robot.get_io_list(signals + [("DIN", 3)]).tolist() == vals + [True]
+    with pytest.raises(ValueError):
+        robot.set_io_list([("RDO", 7)], [True, False])
+    with pytest.raises(ValueError):
+        robot.set_io_list([("DIN", 3)], [True])
+    robot.disconnect()
+
+
+PATH = [
+    {"move_type": "joint", "vals": [0, 0, 0, 0, -90, 0], "velocity": 100},
+    {"move_type": "pose", "vals": [350, 0, 280, -15, -90, -160], "linear": True},
+]
+
+
+def uploads(sim):
+    return sum(cmd.startswith("pathpt") for cmd in sim.commands)
+
+
+def test_run_path(sim):
+    robot = connect(sim)
+    assert robot.run_path("approach", PATH) == (0, "2")
+    assert sim.joints == [0, 0, 0, 0, -90, 0]
+    assert sim.pose == [350, 0, 280, -15, -90, -160]
+    assert uploads(sim) == 2
+
+    # unchanged paths are not uploaded again
+    robot.run_path("approach", PATH)
+    robot.run_path("approach")
+    assert uploads(sim) == 2
+    assert robot.path_status() == (2, 2)
+
+    changed = [PATH[0], {**PATH[1], "vals": [300, 0, 280, -15, -90, -160]}]
+    robot.run_path("approach", changed)
+    assert uploads(sim) == 4
+    assert sim.pose == [300, 0, 280, -15, -90, -160]
+    robot.disconnect()
+
+
+def test_run_path_changed_on_controller(sim):
+    robot = connect(sim)
+    robot.run_path("approach", PATH)
+    # another client overwrites the path registers
+    other = connect(sim)
+    other.run_path("other", PATH[:1])
+    other.disconnect()
+    sim.pose = [0.0] * 6
+
+    assert robot.run_path("approach") == (0, "2")
+    assert uploads(sim) == 5
+    assert sim.pose == [350, 0, 280, -15, -90, -160]
+    robot.disconnect()
+
+
+def test_run_path_retry_uploads_stale_path(sim):
+    robot = connect(sim)
+    robot.upload_path("approach", PATH)
+    robot.upload_path("retract", PATH[:1])
+    slots = dict(robot._paths)
+    sim.registers[84] = 0
+
+    assert robot.run_path("approach") == (0, "2")
+    # only the stale path is uploaded again, in its old slots
+    assert uploads(sim) == 5
+    assert robot._paths == slots
+    assert robot.run_path("retract") == (0, "1")
+    assert uploads(sim) == 5
+    robot.disconnect()
+
+
+def test_remove_path_updates_signature(sim):
+    robot = connect(sim)
+    robot.upload_path("approach", PATH)
+    robot.upload_path("retract", PATH[:1])
+    sig = sim.registers[84]
+    robot.remove_path("approach")
+    assert sim.commands[-1].startswith("pathsig")
+    assert sim.registers[84] == robot._path_table_sig != sig
+    assert robot.run_path("retract") == (0, "1")
+    assert uploads(sim) == 3
+
+    # unknown paths do not touch the controller
+    n_commands = len(sim.commands)
+    robot.remove_path("approach")
+    assert len(sim.commands) == n_commands
+    with pytest.raises(ValueError):
+        robot.run_path("approach")
+    robot.disconnect()
+
+
+def test_path_slots(sim):
+    robot = connect(sim)
+    robot.upload_path("a", PATH * 20)
+    robot.upload_path("b", PATH * 5)
+    with pytest.raises(FanucError):
+        robot.upload_path("c", PATH)
+    robot.remove_path("a")
+    robot.upload_path("c", PATH)
+    assert robot._paths["c"].start == 0
+    with pytest.raises(ValueError):
+        robot.upload_path("d", PATH * 26)
+    with pytest.raises(ValueError):
+        robot.upload_path("unknown")
+    robot.disconnect()
+
+
+def test_path_old_driver():
+    with RobotSimulator(time_scale=0.0, protocol_version=2) as sim:
+        robot = connect(sim)
+        with pytest.raises(FanucError):
+            robot.run_path("approach", PATH)
+        robot.disconnect()
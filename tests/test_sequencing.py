@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from fanucpy.sequencing import SequenceOptimizer
+
+
+def targets(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, (n, 6)), rng.uniform(-90, 90, (n, 6))
+
+
+def check_order(order, n, capacity):
+    assert sorted(order) == sorted(
+        [(a, i) for a in ("pick", "place") for i in range(n)]
+    )
+    held = set()
+    for action, i in order:
+        if action == "pick":
+            held.add(i)
+            assert len(held) <= capacity
+        else:
+            assert i in held
+            held.remove(i)
+
+
+def route_cost(opt, picks, places, order, start):
+    nodes = [picks[i] if a == "pick" else places[i] for a, i in order]
+    q = np.array([start] + nodes)
+    return opt.model.joint_time(q[:-1], q[1:], opt.velocity, opt.acceleration)[0].sum()
+
+
+@pytest.mark.parametrize("capacity", [1, 2, 3])
+def test_feasible_and_better_than_index_order(capacity):
+    picks, places = targets(20)
+    start = np.zeros(6)
+    opt = SequenceOptimizer(capacity=capacity)
+    result = opt.optimize(picks, places, start=start, max_time=1.0)
+    check_order(result.order, 20, capacity)
+    assert result.cost == pytest.approx(
+        route_cost(opt, picks, places, result.order, start)
+    )
+    naive = [(a, i) for i in range(20) for a in ("pick", "place")]
+    assert result.cost < route_cost(opt, picks, places, naive, start)
+
+
+def test_cost_matrix_cached_apart_from_start():
+    picks, places = targets(30)
+    opt = SequenceOptimizer()
+    first = opt.optimize(picks, places, start=np.zeros(6))
+    second = opt.optimize(picks, places, start=places[0])
+    assert len(opt._cache) == 1
+    check_order(second.order, 30, 1)
+    assert second.cost != first.cost
+
+
+def nearest_neighbour(opt, picks, places, start, capacity):
+    nodes = [("pick", i) for i in range(len(picks))]
+    nodes += [("place", i) for i in range(len(places))]
+    C = opt.cost_matrix(np.vstack([picks, places]))
+    row, _ = opt.model.joint_time(
+        start, np.vstack([picks, places]), opt.velocity, opt.acceleration
+    )
+    order, held = [], set()
+    while len(order) < len(nodes):
+        cand = [
+            k
+            for k, (a, i) in enumerate(nodes)
+            if (a == "pick" and len(held) < capacity and ("pick", i) not in order)
+            or (a == "place" and i in held)
+        ]
+        k = min(cand, key=lambda k: row[k])
+        action, i = nodes[k]
+        if action == "pick":
+            held.add(i)
+        else:
+            held.remove(i)
+        order.append(nodes[k])
+        row = C[k]
+    return order
+
+
+def test_max_time():
+    picks, places = targets(50)
+    start = np.zeros(6)
+    opt = SequenceOptimizer(capacity=2)
+    # without a time budget the nearest neighbour route is not improved
+    result = opt.optimize(picks, places, start=start, max_time=0.0)
+    assert opt.n_iterations == 0
+    assert result.order == nearest_neighbour(opt, picks, places, start, 2)
+    assert result.cost == pytest.approx(
+        route_cost(opt, picks, places, result.order, start)
+    )
+
+    improved = opt.optimize(picks, places, start=start, max_time=1.0)
+    assert opt.n_iterations > 0
+    assert improved.cost < result.cost
+
+
+def test_empty():
+    result = SequenceOptimizer().optimize(np.zeros((0, 6)), np.zeros((0, 6)))
+    assert result.order == [] and result.cost == 0.0
@@ -0,0 +1,110 @@
+import socket
+import threading
+
+import pytest
+
+from fanucpy.motion import MotionModel
+from fanucpy.robot import FanucError
+from fanucpy.shared import SharedRobot
+from fanucpy.simulator import RobotSimulator
+
+
+def test_concurrent_commands():
+    with RobotSimulator(time_scale=0.0) as sim:
+        robot = SharedRobot(robot_model="Fanuc", host=sim.host, port=sim.port)
+        robot.connect()
+        errors = []
+
+        def worker(k):
+            try:
+                for _ in range(50):
+                    robot.set_rdo(k, True)
+                    assert robot.get_rdo(k) == 1
+                    assert len(robot.get_curjpos()) == 6
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(k,)) for k in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        robot.disconnect()
+    assert not errors
+    assert len(sim.commands) == 8 * 150
+
+
+def test_logger_answers_during_move():
+    model = MotionModel()
+    with RobotSimulator(motion_model=model, time_scale=1.0) as sim:
+        robot = SharedRobot(
+            robot_model="Fanuc", host=sim.host, port=sim.port, logger_port=sim.port
+        )
+        robot.connect()
+        move = robot.submit("movej:0010:0100:000:0:6" + ":+20.000000" * 6)
+        assert robot.get_curjpos() == [0.0] * 6
+        assert not move.done()
+        assert move.result(timeout=30) == (0, "success")
+        assert robot.get_curjpos() == [20.0] * 6
+        robot.disconnect()
+
+
+def test_timeout_breaks_channel():
+    with RobotSimulator(motion_model=MotionModel(), time_scale=1.0) as sim:
+        robot = SharedRobot(
+            robot_model="Fanuc", host=sim.host, port=sim.port, socket_timeout=0.2
+        )
+        robot.connect()
+        move = robot.submit("movej:0010:0100:000:0:6" + ":+20.000000" * 6)
+        queued = robot.submit("curjpos")
+        with pytest.raises(OSError):
+            move.result(timeout=5)
+        # the late reply must not be taken for the queued command's reply
+        with pytest.raises(FanucError):
+            queued.result(timeout=5)
+        with pytest.raises(FanucError):
+            robot.get_curjpos()
+        robot.disconnect()
+
+        robot.socket_timeout = 60
+        robot.connect()
+        assert len(robot.get_curjpos()) == 6
+        robot.disconnect()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def io_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("fanucpy-")]
+
+
+def test_failed_connect_closes_channels():
+    with RobotSimulator(time_scale=0.0) as sim:
+        robot = SharedRobot(
+            robot_model="Fanuc", host=sim.host, port=sim.port, logger_port=free_port()
+        )
+        with pytest.raises(OSError):
+            robot.connect()
+        assert robot._channel is None and robot._logger_channel is None
+        assert not io_threads()
+        with pytest.raises(FanucError):
+            robot.get_curpos()
+
+
+def test_reconnect_closes_channels():
+    with RobotSimulator(time_scale=0.0) as sim:
+        robot = SharedRobot(
+            robot_model="Fanuc", host=sim.host, port=sim.port, logger_port=sim.port
+        )
+        robot.connect()
+        first = robot._channel
+        robot.connect()
+        assert not first.thread.is_alive()
+        assert len(io_threads()) == 2
+        assert len(robot.get_curjpos()) == 6
+        robot.disconnect()
+        assert not io_threads()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from fanucpy.teach import PathRecorder, simplify_path, suggest_cnt
+
+
+def rdp(points, tol):
+    """Recursive reference on positions only."""
+    a, b = points[0], points[-1]
+    ab = b - a
+    t = np.clip((points - a) @ ab / max(ab @ ab, 1e-12), 0.0, 1.0)
+    d = np.linalg.norm(a + t[:, None] * ab - points, axis=1)
+    k = int(np.argmax(d))
+    if d[k] <= tol:
+        return [0, len(points) - 1]
+    left = rdp(points[: k + 1], tol)
+    right = rdp(points[k:], tol)
+    return left[:-1] + [k + i for i in right]
+
+
+def square(n=25, noise=0.0, seed=0):
+    corners = np.array([[0, 0, 0], [100, 0, 0], [100, 100, 0], [0, 100, 0], [0, 0, 0]])
+    u = np.linspace(0, 1, n, endpoint=False)[:, None]
+    pos = np.vstack([a + u * (b - a) for a, b in zip(corners[:-1], corners[1:])])
+    pos = np.vstack([pos, corners[-1]])
+    pos += np.random.default_rng(seed).normal(0, noise, pos.shape)
+    return np.hstack([pos, np.tile([180.0, 0.0, 0.0], (len(pos), 1))])
+
+
+def test_keeps_corners():
+    poses = square()
+    assert simplify_path(poses).tolist() == [0, 25, 50, 75, 100]
+
+
+def test_matches_recursive_reference():
+    poses = square(noise=0.5)
+    # a sine wave in z adds samples that must be kept
+    poses[:, 2] += 5 * np.sin(np.linspace(0, 6 * np.pi, len(poses)))
+    for tol in (0.5, 1.0, 2.0, 5.0):
+        expected = rdp(poses[:, :3], tol)
+        assert simplify_path(poses, pos_tol=tol, rot_tol=1e9).tolist() == expected
+
+
+def test_rotation_tolerance():
+    poses = np.zeros((50, 6))
+    poses[:, 3] = 180.0
+    poses[:, 5] = np.concatenate([np.zeros(25), np.linspace(0, 90, 25)])
+    assert len(simplify_path(poses, rot_tol=1e9)) == 2
+    # pure rotations are parametrized by sample index
+    assert simplify_path(poses, rot_tol=1.0).tolist() == [0, 25, 49]
+
+
+def test_suggest_cnt():
+    poses = square()[simplify_path(square())]
+    cnt = suggest_cnt(poses)
+    assert cnt[0] == cnt[-1] == 0
+    # right angles blend at half the maximum
+    assert cnt[1:-1].tolist() == [50, 50, 50]
+    assert suggest_cnt(poses, stops=[False, True, False, False, False])[1] == 0
+    straight = np.array(
+        [[0, 0, 0, 0, 0, 0], [100, 0, 0, 0, 0, 0], [200, 0, 0, 0, 0, 0]]
+    )
+    assert suggest_cnt(straight).tolist() == [0, 100, 0]
+
+
+def test_waypoints():
+    recorder = PathRecorder(robot=None)
+    poses = square()
+    recorder.poses = poses.tolist()
+    recorder.times = (np.arange(len(poses)) * 0.02).tolist()
+    moves = recorder.waypoints()
+    assert [m.vals for m in moves] == poses[[0, 25, 50, 75, 100]].tolist()
+    assert all(m.linear and m.move_type == "pose" for m in moves)
+    assert moves[-1].cnt_val == 0
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation, Slerp
+
+from fanucpy.transformations import (
+    arc_path,
+    circle_path,
+    interpolate_poses,
+    path_length,
+    quat_continuous,
+    quat_slerp,
+    quat_squad,
+    resample_path,
+    xyzrpw_to_pq,
+)
+
+
+def same_rotation(q0, q1, atol=1e-9):
+    dot = np.abs(np.sum(np.asarray(q0) * np.asarray(q1), axis=-1))
+    np.testing.assert_allclose(dot, 1.0, atol=atol)
+
+
+def test_slerp_matches_scipy():
+    keys = Rotation.random(50, random_state=0)
+    t = np.linspace(0, 1, 11)
+    for k in range(49):
+        expected = Slerp([0, 1], keys[k : k + 2])(t).as_quat()
+        q = quat_slerp(keys[k].as_quat(), keys[k + 1].as_quat(), t)
+        same_rotation(q, expected)
+
+
+def test_slerp_shortest_arc_and_small_angles():
+    q0 = Rotation.from_euler("z", 10, degrees=True).as_quat()
+    q1 = -Rotation.from_euler("z", 30, degrees=True).as_quat()
+    q = quat_slerp(q0, q1, 0.5)
+    same_rotation(q, Rotation.from_euler("z", 20, degrees=True).as_quat())
+    q = quat_slerp(q0, q0 + 1e-9, np.linspace(0, 1, 5))
+    np.testing.assert_allclose(np.linalg.norm(q, axis=-1), 1.0)
+    same_rotation(q, np.broadcast_to(q0, q.shape), atol=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_squad_passes_keys_continuously(seed):
+    keys = Rotation.random(6, random_state=seed).as_quat()
+    same_rotation(quat_squad(keys, np.arange(6.0)), keys)
+    q = quat_continuous(quat_squad(keys, np.linspace(0, 5, 500)))
+    np.testing.assert_allclose(np.linalg.norm(q, axis=-1), 1.0)
+    # no jumps between neighbouring samples
+    assert np.sum(q[1:] * q[:-1], axis=-1).min() > np.cos(np.radians(5))
+
+
+def test_interpolate_poses():
+    poses = [[0, 0, 0, 180, 0, 0], [100, 0, 0, 180, 0, 90], [100, 100, 0, 180, 0, 90]]
+    out = interpolate_poses(poses, [0.0, 0.5, 1.0, 1.5, 2.0])
+    np.testing.assert_allclose(
+        out[:, :3], [[0, 0, 0], [50, 0, 0], [100, 0, 0], [100, 50, 0], [100, 100, 0]]
+    )
+    _, q = xyzrpw_to_pq(out)
+    same_rotation(q[[0, 2, 4]], xyzrpw_to_pq(poses)[1])
+    same_rotation(
+        q[1], Rotation.from_euler("xyz", [180, 0, 45], degrees=True).as_quat()
+    )
+    with pytest.raises(ValueError):
+        interpolate_poses(poses, [0.0], orientation="linear")
+
+
+def test_resample_path():
+    poses = np.array(
+        [[0, 0, 0, 180, 0, 0], [100, 0, 0, 180, 0, 0], [100, 50, 0, 180, 0, 0]]
+    )
+    out = resample_path(poses, spacing=10.0)
+    assert len(out) == 16
+    np.testing.assert_allclose(np.diff(path_length(out)), 10.0)
+    np.testing.assert_allclose(out[-1], poses[-1], atol=1e-9)
+    # pure reorientation is only resampled with a rotation weight
+    turn = [[0, 0, 0, 180, 0, 0], [0, 0, 0, 180, 0, 90]]
+    assert len(resample_path(turn, spacing=10.0)) == 1
+    assert len(resample_path(turn, spacing=10.0, rot_weight=1.0)) == 10
+
+
+def test_arc_path():
+    start, via, end = (
+        [100, 0, 50, 180, 0, 0],
+        [0, 100, 50, 180, 0, 45],
+        [-100, 0, 50, 180, 0, 90],
+    )
+    out = arc_path(start, via, end, n=101)
+    np.testing.assert_allclose(np.linalg.norm(out[:, :2], axis=1), 100.0)
+    np.testing.assert_allclose(out[:, 2], 50.0)
+    np.testing.assert_allclose(out[[0, 50, 100]], [start, via, end], atol=1e-9)
+    spaced = arc_path(start, via, end, spacing=5.0)
+    assert len(spaced) == int(np.ceil(100 * np.pi / 5.0)) + 1
+    with pytest.raises(ValueError):
+        arc_path(start, [50, 0, 50, 180, 0, 0], end, n=10)
+
+
+def test_circle_path():
+    out = circle_path([10, 20, 30], 50.0, 37, normal=[1, 1, 0], pitch=5.0)
+    rel = out[:, :3] - [10, 20, 30]
+    axis = np.array([1, 1, 0]) / np.sqrt(2)
+    along = rel @ axis
+    np.testing.assert_allclose(along, np.linspace(0, 5, 37))
+    np.testing.assert_allclose(
+        np.linalg.norm(rel - along[:, None] * axis, axis=1), 50.0
+    )
+    np.testing.assert_allclose(out[:, 3:], np.tile([180.0, 0.0, 0.0], (37, 1)))
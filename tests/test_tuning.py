@@ -0,0 +1,201 @@
+import contextlib
+import time
+
+import numpy as np
+import pytest
+
+from fanucpy.motion import MotionModel
+from fanucpy.robot import Robot
+from fanucpy.robotapp import RobotApp
+from fanucpy.simulator import RobotSimulator
+from fanucpy.tuning import ParameterSpace, ParameterTuner, PowerSampler, pareto_front
+
+
+class FakeRobot:
+    """Moves take 0.2 / velocity seconds, power is constant."""
+
+    def __init__(self, power=100.0):
+        self.power = power
+        self.broken = False
+
+    def send_cmd(self, cmd, continue_on_error=False):
+        if self.broken:
+            raise OSError("connection lost")
+        name, *args = cmd.split(":")
+        if name == "movej":
+            time.sleep(0.2 / int(args[0]))
+        return 0, "success"
+
+    def move(self, move_type, vals, velocity=25):
+        return self.send_cmd(f"movej:{velocity}")
+
+    def get_ins_power(self):
+        self.send_cmd("ins_pwr")
+        return self.power
+
+
+class MoveApp(RobotApp):
+    def __init__(self, robot):
+        super().__init__()
+        self.robot = robot
+
+    def configure(self):
+        pass
+
+    def _main(self, tunable_params):
+        if tunable_params.get("gripper") == "broken":
+            raise RuntimeError("gripper failed")
+        for q in (20.0, 0.0):
+            with self.step("move"):
+                self.robot.move("joint", [q] * 6, velocity=tunable_params["velocity"])
+
+
+@pytest.fixture
+def pool():
+    return [FakeRobot(), FakeRobot()]
+
+
+def test_pareto_front():
+    pts = [[1, 5], [2, 2], [5, 1], [3, 3], [2, 4], [1, 5], [6, 6]]
+    # duplicates are not dominated, [3, 3], [2, 4] and [6, 6] are
+    assert pareto_front(pts).tolist() == [0, 1, 2, 5]
+    assert pareto_front([3.0, 1.0, 2.0]).tolist() == [1]
+    assert pareto_front([[1, 2, 3], [3, 2, 1], [2, 2, 2]]).tolist() == [0, 1, 2]
+
+
+def test_parameter_space():
+    space = ParameterSpace(
+        {"velocity": (10, 100), "cnt": (0.0, 1.0), "tool": ["a", "b", "c"]}
+    )
+    grid = space.grid(4)
+    assert len(grid) == 4 * 4 * 3
+    assert sorted({g["velocity"] for g in grid}) == [10, 40, 70, 100]
+    assert sorted({g["cnt"] for g in grid}) == pytest.approx([0, 1 / 3, 2 / 3, 1])
+    assert all(isinstance(g["velocity"], int) for g in grid)
+
+    samples = space.sample(500, np.random.default_rng(0))
+    vel = [s["velocity"] for s in samples]
+    cnt = [s["cnt"] for s in samples]
+    assert all(isinstance(v, int) for v in vel)
+    assert 10 <= min(vel) and max(vel) <= 100
+    assert 0.0 <= min(cnt) and max(cnt) <= 1.0
+    assert {s["tool"] for s in samples} == {"a", "b", "c"}
+    for s in samples[:20]:
+        assert space.decode(space.encode(s)) == s
+
+
+@pytest.mark.parametrize("strategy", ["grid", "random", "bayes"])
+def test_search(pool, strategy):
+    tuner = ParameterTuner(MoveApp, pool, {"velocity": (10, 100)})
+    result = tuner.search(strategy, n_trials=6, grid_points=3, n_init=2, seed=0)
+    assert len(result.trials) == (3 if strategy == "grid" else 6)
+    assert result.best is min(result.trials, key=lambda t: t["cycle_time"])
+    assert result.best["params"]["velocity"] >= 50
+    assert result.pareto == [result.best]
+    for t in result.trials:
+        assert len(t["report"].step_times["move"]) == 2
+        assert len(t["report"].command_times["movej"]) == 2
+    with pytest.raises(ValueError):
+        tuner.search("annealing")
+
+
+def test_repeated_search(pool):
+    tuner = ParameterTuner(MoveApp, pool, {"velocity": (10, 100)})
+    first = tuner.search("bayes", n_trials=4, n_init=2, seed=0)
+    second = tuner.search("bayes", n_trials=4, n_init=2, seed=1)
+    assert len(first.trials) == len(second.trials) == 4
+    assert not any(t in first.trials for t in second.trials)
+    assert len(tuner.trials) == 8
+
+
+def test_all_trials_fail(pool):
+    tuner = ParameterTuner(
+        MoveApp, pool, {"velocity": (10, 100), "gripper": ["broken"]}
+    )
+    result = tuner.search("bayes", n_trials=3, n_init=1, seed=0)
+    assert result.best is None
+    assert result.pareto == []
+    assert all(t["score"] == np.inf for t in result.trials)
+    assert "gripper failed" in result.trials[0]["report"].errors[0]
+
+
+def test_energy_objective(pool):
+    loggers = [FakeRobot(power=100.0), FakeRobot(power=100.0)]
+    tuner = ParameterTuner(
+        MoveApp,
+        pool,
+        {"velocity": [10, 40]},
+        objective="energy",
+        power_robots=loggers,
+        power_rate=500,
+    )
+    result = tuner.search("grid")
+    slow, fast = sorted(result.trials, key=lambda t: t["params"]["velocity"])
+    # energy is about power times cycle time
+    for t in (slow, fast):
+        assert t["energy"] == pytest.approx(100.0 * t["cycle_time"], rel=0.5)
+    assert result.best is fast
+    with pytest.raises(ValueError):
+        ParameterTuner(MoveApp, pool, {"velocity": [20]}, objective="energy")
+
+
+def test_power_sampler_error():
+    robot = FakeRobot(power=50.0)
+    with PowerSampler(robot, rate=100) as sampler:
+        time.sleep(0.05)
+    assert sampler.energy == pytest.approx(50.0 * 0.05, rel=0.5)
+    assert sampler.error is None
+
+    robot.broken = True
+    with pytest.raises(OSError):
+        with PowerSampler(robot, rate=100) as sampler:
+            pass
+    assert isinstance(sampler.error, OSError)
+    # errors of the body take precedence
+    with pytest.raises(RuntimeError):
+        with PowerSampler(robot, rate=100):
+            raise RuntimeError("app failed")
+
+
+@pytest.fixture
+def sims():
+    with contextlib.ExitStack() as stack:
+        yield [
+            stack.enter_context(
+                RobotSimulator(motion_model=MotionModel(), time_scale=0.05)
+            )
+            for _ in range(2)
+        ]
+
+
+def connect(sims):
+    robots = []
+    for sim in sims:
+        robots.append(Robot(robot_model="Fanuc", host=sim.host, port=sim.port))
+        robots[-1].connect()
+    return robots
+
+
+@pytest.mark.parametrize("strategy", ["grid", "random", "bayes"])
+def test_search_simulator(sims, strategy):
+    robots, loggers = connect(sims), connect(sims)
+    tuner = ParameterTuner(
+        MoveApp,
+        robots,
+        {"velocity": (5, 30)},
+        power_robots=loggers,
+        power_rate=500,
+    )
+    result = tuner.search(strategy, n_trials=4, grid_points=3, n_init=2, seed=0)
+    for robot in robots + loggers:
+        robot.disconnect()
+    assert len(result.trials) == (3 if strategy == "grid" else 4)
+    # moves are velocity limited in this range
+    slowest = min(result.trials, key=lambda t: t["params"]["velocity"])
+    assert max(result.trials, key=lambda t: t["cycle_time"]) is slowest
+    assert result.best is min(result.trials, key=lambda t: t["cycle_time"])
+    assert result.best in result.pareto
+    for t in result.trials:
+        assert t["energy"] > 0
+        assert len(t["report"].command_times["movej"]) == 2
+    assert all(sim.joints == [0.0] * 6 for sim in sims)